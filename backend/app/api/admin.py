@@ -1,15 +1,20 @@
 """
 Admin API endpoints
 """
-from typing import List
+from typing import List, Optional
 from fastapi import APIRouter, HTTPException, Depends
 from pydantic import BaseModel
 from datetime import datetime
 
 from app.services.user_service import UserService
 from app.services.board_service import BoardService
-from app.services.message_service import MessageService
+from app.services.message_service import MessageService, get_message_cache
+from app.services.cache_sync import notify_messages
+from app.utils.message_template import validate_template
 from app.protocols.telnet_server import TelnetServer
+from app.protocols.chat_hub import get_chat_hub
+from app.protocols.chat_monitor import get_chat_monitor
+from app.core.config import settings
 
 router = APIRouter()
 
@@ -74,6 +79,7 @@ class BoardResponse(BaseModel):
     is_active: bool
     enforced_news: bool
     operator_id: str | None
+    message_count: int = 0
 
     class Config:
         from_attributes = True
@@ -143,9 +149,11 @@ async def create_user(user_data: UserCreate):
 
 
 @router.get("/users", response_model=List[UserResponse])
-async def get_users(skip: int = 0, limit: int = 100):
-    """Get all users"""
+async def get_users(skip: int = 0, limit: int = 100, prefix: Optional[str] = None):
+    """Get all users, or users whose ID/handle starts with prefix"""
     user_service = UserService()
+    if prefix:
+        return await user_service.search_users(prefix, limit=limit)
     users = await user_service.get_users(skip=skip, limit=limit)
     return users
 
@@ -175,7 +183,7 @@ async def update_user(user_id: str, user_data: UserUpdate):
         if user_data.level is not None:
             update_dict['level'] = user_data.level
         if user_data.password is not None:
-            update_dict['password_hash'] = user_service.hash_password(user_data.password)
+            update_dict['password_hash'] = await user_service.hash_password(user_data.password)
         if user_data.is_active is not None:
             update_dict['is_active'] = user_data.is_active
         if user_data.must_change_password_on_next_login is not None:
@@ -305,11 +313,8 @@ async def get_stats():
     users = await user_service.get_users()
     boards = await board_service.get_boards()
 
-    # Count total messages
-    total_messages = 0
-    for board in boards:
-        messages = await board_service.get_all_messages(board.board_id)
-        total_messages += len(messages)
+    # Count total messages (denormalized per-board counters)
+    total_messages = sum(board.message_count for board in boards)
 
     # TODO: Get telnet connections from global server instance
     telnet_connections = 0
@@ -331,10 +336,46 @@ async def get_connections():
     return {"connections": []}
 
 
+# Chat rooms
+@router.get("/chat")
+async def get_chat():
+    """Get chat rooms with members, scrollback size and delivery latency
+
+    With telnet outside the API the rooms come from the bus (all workers) and
+    have no delivery latency, which each worker measures for itself.
+    """
+    if not settings.TELNET_EMBEDDED:
+        return get_chat_monitor().get_stats()
+    return get_chat_hub().get_stats()
+
+
+@router.get("/chat/{room}")
+async def get_chat_room(room: int):
+    """Get one chat room including its scrollback"""
+    if not settings.TELNET_EMBEDDED:
+        chat_room = get_chat_monitor().hub.get_room(room)
+        info = get_chat_monitor().room_info(room)
+    else:
+        chat_room = get_chat_hub().get_room(room)
+        info = chat_room.to_dict() if chat_room else None
+    if not chat_room:
+        raise HTTPException(status_code=404, detail="Chat room not found")
+    return {
+        **info,
+        "lines": [
+            {"at": at.isoformat(), "text": text} for at, text in chat_room.scrollback
+        ],
+    }
+
+
 # Message management
 @router.post("/messages", response_model=MessageResponse)
 async def create_message(message_data: MessageCreate):
     """Create new system message"""
+    problems = validate_template(message_data.content, message_data.variables)
+    if problems:
+        raise HTTPException(status_code=400, detail="; ".join(problems))
+
     message_service = MessageService()
     try:
         message = await message_service.create_message(message_data.model_dump())
@@ -374,6 +415,18 @@ async def update_message(message_key: str, message_data: MessageUpdate):
     # Filter out None values
     update_data = {k: v for k, v in message_data.model_dump().items() if v is not None}
 
+    # Validate template placeholders against declared variables
+    if "content" in update_data or "variables" in update_data:
+        existing = await message_service.get_message_by_key(message_key)
+        if not existing:
+            raise HTTPException(status_code=404, detail="Message not found")
+        problems = validate_template(
+            update_data.get("content", existing.content),
+            update_data.get("variables", existing.variables),
+        )
+        if problems:
+            raise HTTPException(status_code=400, detail="; ".join(problems))
+
     message = await message_service.update_message(message_key, update_data)
 
     if not message:
@@ -405,6 +458,15 @@ async def initialize_messages():
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/messages/cache/invalidate")
+async def invalidate_message_cache():
+    """Drop cached system messages in every server process (e.g. after editing
+    the database directly)"""
+    get_message_cache().invalidate()
+    notify_messages()
+    return {"message": "System message cache invalidated"}
+
+
 @router.post("/database/initialize")
 async def initialize_database():
     """Initialize database with test data"""
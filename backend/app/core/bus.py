@@ -0,0 +1,395 @@
+"""
+Message bus between server processes
+
+Chat lines, presence, kicks and telegrams are published on named channels and
+delivered to every process (including the publisher), so several telnet
+worker processes behave like one BBS. Backends:
+
+- ``auto`` (the default): ``local`` when telnet runs inside the API process,
+  otherwise a Unix socket next to the SQLite database (shared_socket_path),
+  so the API and the ``python -m app.telnet`` workers find each other
+- ``local``: in-process only (single server process)
+- ``unix:///path/to/bus.sock``: processes on one host. The first process to
+  take ``<path>.lock`` runs a small relay on the socket; the others connect to
+  it, and one of them takes over if that process exits.
+- ``redis``: Redis pub/sub at Settings.REDIS_URL (needs the ``redis`` package)
+"""
+import abc
+import asyncio
+import fcntl
+import hashlib
+import inspect
+import json
+import logging
+import os
+import socket
+import tempfile
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Union
+
+from sqlalchemy.engine import make_url
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Subscriber: callback(data, origin) where origin is the publishing node ID
+BusCallback = Callable[[dict, str], Union[None, Awaitable[None]]]
+
+FRAME_LIMIT = 1024 * 1024  # bytes per message
+PEER_BUFFER_LIMIT = 4 * 1024 * 1024  # relay drops peers that fall this far behind
+RECONNECT_DELAY = 0.5  # seconds
+PENDING_LIMIT = 1000  # frames kept while reconnecting
+SOCKET_PATH_LIMIT = 100  # bytes; AF_UNIX paths are limited to 104-108
+
+
+def node_id() -> str:
+    """Identifier of this process on the bus"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class MessageBus(abc.ABC):
+    """Base bus: subscriptions and local dispatch"""
+
+    backend: str
+
+    def __init__(self):
+        self.node_id = node_id()
+        self._subscribers: Dict[str, List[BusCallback]] = {}
+        self._tasks: Set[asyncio.Future] = set()  # subscriber coroutines and nowait publishes
+        self.published = 0
+        self.received = 0
+
+    def subscribe(self, channel: str, callback: BusCallback) -> None:
+        self._subscribers.setdefault(channel, []).append(callback)
+
+    def unsubscribe(self, channel: str, callback: BusCallback) -> None:
+        callbacks = self._subscribers.get(channel, [])
+        if callback in callbacks:
+            callbacks.remove(callback)
+
+    def _dispatch(self, channel: str, data: dict, origin: str) -> None:
+        """Run subscribers; coroutines are scheduled, never awaited here"""
+        self.received += 1
+        for callback in list(self._subscribers.get(channel, ())):
+            try:
+                result = callback(data, origin)
+                if inspect.isawaitable(result):
+                    self._track(asyncio.ensure_future(result), f"subscriber for '{channel}'")
+            except Exception as e:
+                logger.error(f"Bus subscriber for '{channel}' failed: {e}", exc_info=True)
+
+    def _track(self, task: asyncio.Future, what: str) -> None:
+        """Keep a reference until the task is done (the loop only holds weak ones)"""
+        self._tasks.add(task)
+
+        def done(task: asyncio.Future) -> None:
+            self._tasks.discard(task)
+            if not task.cancelled() and task.exception():
+                logger.error(f"Bus {what} failed: {task.exception()}", exc_info=task.exception())
+
+        task.add_done_callback(done)
+
+    def _encode(self, channel: str, data: dict) -> bytes:
+        return json.dumps(
+            {"ch": channel, "origin": self.node_id, "data": data}, ensure_ascii=False
+        ).encode("utf-8")
+
+    def _decode_and_dispatch(self, frame: bytes) -> None:
+        try:
+            message = json.loads(frame)
+            self._dispatch(message["ch"], message["data"], message["origin"])
+        except (ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Dropping malformed bus frame: {e}")
+
+    async def start(self) -> None:
+        """Connect; backends without a connection have nothing to do"""
+
+    async def close(self) -> None:
+        """Disconnect; backends without a connection have nothing to do"""
+
+    @abc.abstractmethod
+    async def publish(self, channel: str, data: dict) -> None:
+        """Send data to the channel's subscribers in every process"""
+
+    def publish_nowait(self, channel: str, data: dict) -> None:
+        """Publish without waiting (from sync code paths)"""
+        self._track(asyncio.ensure_future(self.publish(channel, data)), f"publish to '{channel}'")
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "backend": self.backend,
+            "node_id": self.node_id,
+            "published": self.published,
+            "received": self.received,
+        }
+
+
+class LocalBus(MessageBus):
+    """Single process: publish is a direct dispatch"""
+
+    backend = "local"
+
+    async def publish(self, channel: str, data: dict) -> None:
+        self.published += 1
+        self._dispatch(channel, data, self.node_id)
+
+
+class UnixSocketBus(MessageBus):
+    """Processes on one host, relayed through a Unix socket"""
+
+    backend = "unix"
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = path
+        self.is_relay = False
+        self._lock_fd: Optional[int] = None
+        self._relay: Optional[asyncio.AbstractServer] = None
+        self._peers: Set[asyncio.StreamWriter] = set()
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: List[bytes] = []
+        self._task: Optional[asyncio.Task] = None
+        self._connected = asyncio.Event()
+        self._closing = False
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        self._task = asyncio.create_task(self._run())
+        try:
+            await asyncio.wait_for(self._connected.wait(), timeout=10)
+        except asyncio.TimeoutError:
+            logger.warning(f"Bus not connected yet ({self.path}); messages are queued")
+
+    async def close(self) -> None:
+        self._closing = True
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._writer:
+            self._writer.close()
+        await self._stop_relay()
+
+    async def publish(self, channel: str, data: dict) -> None:
+        frame = self._encode(channel, data) + b"\n"
+        self.published += 1
+        if self._writer is None or self._writer.is_closing():
+            if len(self._pending) < PENDING_LIMIT:
+                self._pending.append(frame)
+            return
+        self._writer.write(frame)
+
+    # -- relay (one process per socket) --
+
+    def _try_become_relay(self) -> bool:
+        """Take the lock file; only its holder binds the socket"""
+        fd = os.open(self.path + ".lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    async def _start_relay(self) -> None:
+        try:
+            os.unlink(self.path)  # stale socket from a previous relay
+        except FileNotFoundError:
+            pass
+        self._relay = await asyncio.start_unix_server(
+            self._serve_peer, self.path, limit=FRAME_LIMIT
+        )
+        self.is_relay = True
+        logger.info(f"Bus relay listening on {self.path}")
+
+    async def _stop_relay(self) -> None:
+        if self._relay:
+            self._relay.close()
+            for peer in list(self._peers):
+                peer.close()
+            self._relay = None
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)  # releases the lock
+            self._lock_fd = None
+        self.is_relay = False
+
+    async def _serve_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._peers.add(writer)
+        try:
+            while True:
+                frame = await reader.readline()
+                if not frame:
+                    break
+                for peer in list(self._peers):
+                    if peer.transport.get_write_buffer_size() > PEER_BUFFER_LIMIT:
+                        logger.warning("Bus relay dropping a peer that stopped reading")
+                        self._peers.discard(peer)
+                        peer.close()
+                        continue
+                    peer.write(frame)
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Bus peer error: {e}")
+        finally:
+            self._peers.discard(writer)
+            writer.close()
+
+    # -- client side (every process, including the relay) --
+
+    async def _run(self) -> None:
+        while not self._closing:
+            if not self.is_relay and self._try_become_relay():
+                await self._start_relay()
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path, limit=FRAME_LIMIT)
+            except (FileNotFoundError, ConnectionRefusedError):
+                await asyncio.sleep(RECONNECT_DELAY)
+                continue
+
+            self._writer = writer
+            for frame in self._pending:
+                writer.write(frame)
+            self._pending.clear()
+            self._connected.set()
+            logger.info(f"Bus connected: {self.path} ({'relay' if self.is_relay else 'peer'})")
+
+            try:
+                while True:
+                    frame = await reader.readline()
+                    if not frame:
+                        break
+                    self._decode_and_dispatch(frame)
+            except (ConnectionError, ValueError) as e:
+                logger.warning(f"Bus connection lost: {e}")
+            finally:
+                self._writer = None
+                self._connected.clear()
+                writer.close()
+            if not self._closing:
+                logger.warning("Bus relay went away; reconnecting")
+                await asyncio.sleep(RECONNECT_DELAY)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            **super().get_stats(),
+            "path": self.path,
+            "relay": self.is_relay,
+            "peers": len(self._peers),
+            "connected": self._connected.is_set(),
+        }
+
+
+class RedisBus(MessageBus):
+    """Redis pub/sub (processes on any host)"""
+
+    backend = "redis"
+    PREFIX = "mtbbs:bus:"
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self._client = None
+        self._pubsub = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is not None:
+            return
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            raise RuntimeError("MESSAGE_BUS=redis requires the 'redis' package")
+
+        self._client = redis.from_url(self.url)
+        self._pubsub = self._client.pubsub()
+        await self._pubsub.psubscribe(self.PREFIX + "*")
+        self._task = asyncio.create_task(self._listen())
+        logger.info(f"Bus connected: {self.url}")
+
+    async def _listen(self) -> None:
+        async for message in self._pubsub.listen():
+            if message.get("type") == "pmessage":
+                self._decode_and_dispatch(message["data"])
+
+    async def close(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        if self._pubsub:
+            await self._pubsub.close()
+        if self._client:
+            await self._client.close()
+
+    async def publish(self, channel: str, data: dict) -> None:
+        self.published += 1
+        await self._client.publish(self.PREFIX + channel, self._encode(channel, data))
+
+
+def shared_socket_path() -> str:
+    """Unix socket that every process using the same database meets on
+
+    Next to the SQLite file when the path is short enough, otherwise in the
+    temp directory under a hash of the database location.
+    """
+    url = make_url(settings.DATABASE_URL)
+    if url.get_backend_name() == "sqlite" and url.database and url.database != ":memory:":
+        location = os.path.abspath(url.database)
+        path = location + ".bus.sock"
+        if len(path.encode()) <= SOCKET_PATH_LIMIT:
+            return path
+    else:
+        location = settings.DATABASE_URL
+    digest = hashlib.sha1(location.encode()).hexdigest()[:12]
+    return os.path.join(tempfile.gettempdir(), f"mtbbs-bus-{digest}.sock")
+
+
+def resolve_bus_spec(spec: str) -> str:
+    """Concrete MESSAGE_BUS setting for "auto" (see the module docstring)"""
+    if spec != "auto":
+        return spec
+    if settings.TELNET_EMBEDDED:
+        return "local"
+    return f"unix://{shared_socket_path()}"
+
+
+def create_bus(spec: str) -> MessageBus:
+    """Bus for a MESSAGE_BUS setting: "auto", "local", "unix:///path" or "redis" """
+    spec = resolve_bus_spec(spec)
+    if spec == "local":
+        return LocalBus()
+    if spec.startswith("unix://"):
+        return UnixSocketBus(spec[len("unix://"):])
+    if spec == "redis":
+        return RedisBus(settings.REDIS_URL)
+    if spec.startswith("redis://") or spec.startswith("rediss://"):
+        return RedisBus(spec)
+    raise ValueError(f"Unknown MESSAGE_BUS: {spec}")
+
+
+_bus: Optional[MessageBus] = None
+
+
+def get_bus() -> MessageBus:
+    """Get the global message bus (not started)"""
+    global _bus
+    if _bus is None:
+        _bus = create_bus(settings.MESSAGE_BUS)
+    return _bus
+
+
+async def close_bus() -> None:
+    """Close the global bus (safe to call more than once)"""
+    global _bus
+    if _bus is not None:
+        await _bus.close()
+        _bus = None
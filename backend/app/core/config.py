@@ -22,10 +22,67 @@ class Settings(BaseSettings):
     TELNET_PORT: int = 23
     TELNET_MAX_CONNECTIONS: int = 100
     TELNET_IDLE_TIMEOUT: int = 1800  # 30 minutes
+    TELNET_EMBEDDED: bool = True  # run telnet inside the API process (False with python -m app.telnet)
+    TELNET_WORKERS: int = 1  # worker processes for python -m app.telnet (share TELNET_MAX_CONNECTIONS)
+    TELNET_DRAIN_TIMEOUT: int = 60  # seconds sessions get to finish on SIGTERM
+    TELNET_READ_CHUNK_SIZE: int = 4096  # bytes per socket read
+    TELNET_OUTPUT_FLUSH_THRESHOLD: int = 8192  # flush session output at this size
+    TELNET_WRITE_HIGH_WATER: int = 65536  # transport buffer size where drain() blocks
+    TELNET_WRITE_LOW_WATER: int = 16384  # transport buffer size where writing resumes
+    CHAT_ROOM_COUNT: int = 10  # numbered chat channels (1 = lobby)
+    CHAT_SCROLLBACK: int = 20  # lines per room replayed to late joiners
+    CHAT_QUEUE_SIZE: int = 64  # chat lines buffered per participant
+    CHAT_SLOW_CONSUMER_POLICY: str = "coalesce"  # queue full: "coalesce" (skip oldest lines) or "drop" (leave chat)
 
     # Database
     DATABASE_URL: str = "sqlite+aiosqlite:///../data/mtbbs.db"
     DATABASE_PATH: str = "../data/mtbbs.db"
+    DATABASE_POOL_SIZE: int = 5  # pooled connections kept open
+    DATABASE_MAX_OVERFLOW: int = 10  # extra connections allowed under load
+    MAIL_DB_POOL_SIZE: int = 4  # worker threads (one connection each) for mail queries
+
+    # SQLite connection pragmas (applied to every SQLAlchemy and raw connection)
+    SQLITE_JOURNAL_MODE: str = "WAL"  # readers no longer block on writers
+    SQLITE_SYNCHRONOUS: str = "NORMAL"  # fsync at checkpoints only (safe with WAL)
+    SQLITE_MMAP_SIZE: int = 268435456  # bytes of the file read via mmap (0 = off)
+    SQLITE_CACHE_SIZE: int = -16000  # pages, or KiB when negative
+    SQLITE_TEMP_STORE: str = "MEMORY"
+    SQLITE_BUSY_TIMEOUT: int = 5000  # ms to wait for a lock before "database is locked"
+
+    # System message cache (seconds, 0 = cache until an admin edit)
+    SYSTEM_MESSAGE_CACHE_TTL: int = 0
+
+    # Board registry cache (seconds, 0 = kept in sync by writes only)
+    BOARD_REGISTRY_TTL: int = 0
+
+    # Rows fetched per query when streaming board messages
+    MESSAGE_BATCH_SIZE: int = 50
+
+    # Read position tracker flush interval (seconds)
+    READ_POSITION_FLUSH_INTERVAL: int = 30
+
+    # Password hashing (bcrypt runs off the event loop)
+    PASSWORD_HASH_EXECUTOR: str = "thread"  # "thread" or "process"
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENT: int = 0  # hashes in flight at once (0 = workers); the rest queue
+    BCRYPT_ROUNDS: int = 12  # cost for new hashes; older hashes are upgraded at next login
+    AUTH_CACHE_TTL: int = 300  # seconds a verified login skips bcrypt (0 = disabled)
+    AUTH_CACHE_SIZE: int = 1024  # cached logins (LRU)
+
+    # Access counter flush interval (seconds)
+    ACCESS_COUNTER_FLUSH_INTERVAL: int = 60
+
+    # Message bus between server processes (chat, presence, cache invalidation):
+    # "auto" (local when telnet is embedded, else a Unix socket next to the database),
+    # "local", "unix:///path/bus.sock" or "redis" (REDIS_URL)
+    MESSAGE_BUS: str = "auto"
+    PRESENCE_HEARTBEAT_INTERVAL: int = 15  # seconds; nodes silent for 3 intervals are dropped
+
+    # Event loop: "auto" (uvloop if installed), "uvloop" or "asyncio"
+    EVENT_LOOP: str = "auto"
+    LOOP_MONITOR_INTERVAL: float = 0.1  # seconds between loop-lag samples
+    LOOP_SLOW_CALLBACK_MS: int = 100  # stalls this long are reported with the running coroutine
+    LOOP_LAG_WARN_MS: int = 250  # health turns unhealthy when p99 loop lag exceeds this
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
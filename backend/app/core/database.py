@@ -2,17 +2,60 @@
 Database configuration and connection management
 """
 import sqlite3
+from typing import List
+from sqlalchemy import event
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base
 from app.core.config import settings
 
+# Keep connections open so per-connection pragmas (cache, mmap) stay useful.
+# In-memory databases are per-connection and keep SQLAlchemy's default pool.
+_pool_options = {}
+if ":memory:" not in settings.DATABASE_URL:
+    _pool_options = {
+        "poolclass": AsyncAdaptedQueuePool,
+        "pool_size": settings.DATABASE_POOL_SIZE,
+        "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    }
+
 # Create async engine
 engine = create_async_engine(
     settings.DATABASE_URL,
     echo=settings.DEBUG,
-    future=True
+    future=True,
+    **_pool_options
 )
 
+
+def sqlite_pragmas() -> List[str]:
+    """PRAGMA statements for the configured SQLite performance profile"""
+    return [
+        f"PRAGMA journal_mode = {settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous = {settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA mmap_size = {int(settings.SQLITE_MMAP_SIZE)}",
+        f"PRAGMA cache_size = {int(settings.SQLITE_CACHE_SIZE)}",
+        f"PRAGMA temp_store = {settings.SQLITE_TEMP_STORE}",
+        f"PRAGMA busy_timeout = {int(settings.SQLITE_BUSY_TIMEOUT)}",
+    ]
+
+
+def apply_sqlite_pragmas(dbapi_connection) -> None:
+    """Apply the pragmas to a DBAPI connection (sqlite3 or the aiosqlite adapter)"""
+    cursor = dbapi_connection.cursor()
+    try:
+        for statement in sqlite_pragmas():
+            cursor.execute(statement)
+    finally:
+        cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    @event.listens_for(engine.sync_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection)
+
+
 # Create async session factory
 async_session = async_sessionmaker(
     engine,
@@ -43,14 +86,21 @@ async def get_db() -> AsyncSession:
             await session.close()
 
 
-def get_connection(db_path: str) -> sqlite3.Connection:
+def get_connection(db_path: str, check_same_thread: bool = True) -> sqlite3.Connection:
     """
-    Get synchronous SQLite connection for mail service
+    Get synchronous SQLite connection for mail service and system monitor
 
     Args:
         db_path: Path to SQLite database file
+        check_same_thread: Passed to sqlite3.connect (False for pooled connections)
 
     Returns:
-        SQLite connection object
+        SQLite connection object with the configured pragmas applied
     """
-    return sqlite3.connect(db_path)
+    conn = sqlite3.connect(
+        db_path,
+        timeout=settings.SQLITE_BUSY_TIMEOUT / 1000,
+        check_same_thread=check_same_thread,
+    )
+    apply_sqlite_pragmas(conn)
+    return conn
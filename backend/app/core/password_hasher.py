@@ -0,0 +1,165 @@
+"""
+Password hashing off the event loop
+
+bcrypt deliberately burns 100-300 ms of CPU per call. Running it inline in an
+async handler stalls every telnet session, so hashing and verification go to
+a small executor instead, with a cap on concurrent jobs so a login storm
+queues up rather than starving the database threads.
+"""
+import asyncio
+import logging
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+import bcrypt
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Module-level so they can be pickled for a ProcessPoolExecutor
+
+def _hash(password: bytes, rounds: int) -> bytes:
+    return bcrypt.hashpw(password, bcrypt.gensalt(rounds))
+
+
+def _check(password: bytes, hashed: bytes) -> bool:
+    return bcrypt.checkpw(password, hashed)
+
+
+class PasswordHasher:
+    """bcrypt on a bounded executor"""
+
+    def __init__(self, mode: str = "thread", workers: int = 2, max_concurrent: int = 0,
+                 rounds: int = 12):
+        """
+        Args:
+            mode: "thread" (bcrypt releases the GIL) or "process"
+            workers: executor size
+            max_concurrent: jobs allowed in the executor at once (0 = workers)
+            rounds: bcrypt cost factor for new hashes
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown password hasher mode: {mode}")
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.max_concurrent = max_concurrent or self.workers
+        self.rounds = rounds
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Metrics
+        self.queued = 0  # waiting for a slot
+        self.running = 0
+        self.max_queued = 0
+        self.completed = 0
+        self.total_wait = 0.0
+        self.total_run = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _run(self, fn, *args):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        queued_at = time.perf_counter()
+        self.queued += 1
+        self.max_queued = max(self.max_queued, self.queued)
+        try:
+            await self._semaphore.acquire()
+        finally:
+            self.queued -= 1
+
+        started_at = time.perf_counter()
+        self.running += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self.running -= 1
+            self._semaphore.release()
+            self.completed += 1
+            self.total_wait += started_at - queued_at
+            self.total_run += time.perf_counter() - started_at
+
+    async def hash(self, password: str) -> str:
+        """Hash a password"""
+        hashed = await self._run(_hash, password.encode('utf-8'), self.rounds)
+        return hashed.decode('utf-8')
+
+    async def verify(self, password: str, hashed: str) -> bool:
+        """Check a password against a bcrypt hash"""
+        try:
+            return await self._run(_check, password.encode('utf-8'), hashed.encode('utf-8'))
+        except ValueError:
+            # Malformed or empty hash
+            return False
+
+    def needs_rehash(self, hashed: str) -> bool:
+        """True if the hash was made with a different cost than configured"""
+        # $2b$12$<salt+hash>
+        parts = hashed.split('$')
+        if len(parts) < 4 or not parts[2].isdigit():
+            return False
+        return int(parts[2]) != self.rounds
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth and timing metrics"""
+        completed = self.completed or 1
+        return {
+            'mode': self.mode,
+            'workers': self.workers,
+            'max_concurrent': self.max_concurrent,
+            'rounds': self.rounds,
+            'running': self.running,
+            'queued': self.queued,
+            'max_queued': self.max_queued,
+            'completed': self.completed,
+            'avg_wait_ms': round(self.total_wait / completed * 1000, 1),
+            'avg_run_ms': round(self.total_run / completed * 1000, 1),
+        }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self._semaphore = None
+
+
+_password_hasher: Optional[PasswordHasher] = None
+
+
+def get_password_hasher() -> PasswordHasher:
+    """Get the global password hasher"""
+    global _password_hasher
+    if _password_hasher is None:
+        _password_hasher = PasswordHasher(
+            mode=settings.PASSWORD_HASH_EXECUTOR,
+            workers=settings.PASSWORD_HASH_WORKERS,
+            max_concurrent=settings.PASSWORD_HASH_MAX_CONCURRENT,
+            rounds=settings.BCRYPT_ROUNDS,
+        )
+        logger.info(
+            f"Password hasher: {_password_hasher.mode} pool, "
+            f"{_password_hasher.workers} worker(s), "
+            f"{_password_hasher.max_concurrent} concurrent, cost {_password_hasher.rounds}"
+        )
+    return _password_hasher
+
+
+def shutdown_password_hasher() -> None:
+    """Stop the executor (server shutdown)"""
+    global _password_hasher
+    if _password_hasher is not None:
+        _password_hasher.shutdown()
+        _password_hasher = None
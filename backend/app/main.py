@@ -9,14 +9,16 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import init_db, engine
 from app.protocols.telnet_server import TelnetServer
 from app.api import admin, bbs
+from app.utils.loop_monitor import get_loop_monitor, resolve_event_loop
 
 # Import models to ensure tables are created
 from app.models.user import User
 from app.models.board import Board, Message
 from app.models.system_message import SystemMessage
+from app.models.counter import Counter
 
 # Configure logging
 logging.basicConfig(
@@ -36,6 +38,18 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting MTBBS Linux Server...")
 
+    # Measure event loop lag and report what blocks it
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
+    expected_loop = resolve_event_loop(settings.EVENT_LOOP)
+    if loop_monitor.implementation != expected_loop:
+        # Bare `uvicorn app.main:app` picks its own loop; EVENT_LOOP is only read by
+        # `python -m app.main` and `python -m app.telnet`
+        logger.warning(
+            f"EVENT_LOOP={settings.EVENT_LOOP} but running on {loop_monitor.implementation}; "
+            f"start with `python -m app.main` or pass `uvicorn --loop {expected_loop}`"
+        )
+
     # Initialize database
     await init_db()
     logger.info("Database initialized")
@@ -47,16 +61,46 @@ async def lifespan(app: FastAPI):
     if count > 0:
         logger.info(f"Initialized {count} default system messages")
 
-    # Start Telnet server
-    global telnet_server
-    telnet_server = TelnetServer(
-        host=settings.TELNET_HOST,
-        port=settings.TELNET_PORT
-    )
+    # Warm system message cache so menu redraws never hit the database
+    from app.services.message_service import get_message_cache
+    cached = await get_message_cache().load()
+    logger.info(f"Loaded {cached} system messages into cache")
+
+    from app.services.board_service import check_search_index, get_board_registry
+    board_count = await get_board_registry().load()
+    logger.info(f"Loaded {board_count} boards into registry")
+    await check_search_index()
 
-    # Run Telnet server in background
-    telnet_task = asyncio.create_task(telnet_server.start())
-    logger.info(f"Telnet server starting on {settings.TELNET_HOST}:{settings.TELNET_PORT}")
+    from app.services.user_service import get_user_directory
+    user_count = await get_user_directory().load()
+    logger.info(f"Loaded {user_count} users into directory")
+
+    # Hear cache invalidations from the telnet workers (and tell them about ours)
+    from app.services.cache_sync import start_cache_sync
+    await start_cache_sync()
+
+    from app.services.counter_service import get_access_counter
+    access_counter = get_access_counter()
+    await access_counter.load()
+    access_counter.start()
+
+    # Start Telnet server (unless it runs standalone: python -m app.telnet)
+    global telnet_server
+    telnet_task = None
+    if settings.TELNET_EMBEDDED:
+        telnet_server = TelnetServer(
+            host=settings.TELNET_HOST,
+            port=settings.TELNET_PORT
+        )
+
+        # Run Telnet server in background
+        telnet_task = asyncio.create_task(telnet_server.start())
+        logger.info(f"Telnet server starting on {settings.TELNET_HOST}:{settings.TELNET_PORT}")
+    else:
+        logger.info("Telnet server disabled (TELNET_EMBEDDED=false)")
+        # Follow chat rooms and members of the telnet processes for the admin API
+        from app.protocols.chat_monitor import get_chat_monitor
+        await get_chat_monitor().start()
 
     yield
 
@@ -65,11 +109,33 @@ async def lifespan(app: FastAPI):
     if telnet_server:
         await telnet_server.stop()
 
-    telnet_task.cancel()
+    if telnet_task:
+        telnet_task.cancel()
+        try:
+            await telnet_task
+        except asyncio.CancelledError:
+            pass
+    else:
+        from app.protocols.chat_monitor import get_chat_monitor
+        get_chat_monitor().stop()
+
     try:
-        await telnet_task
-    except asyncio.CancelledError:
-        pass
+        await access_counter.stop()
+    except Exception as e:
+        logger.error(f"Failed to save access counter: {e}")
+
+    from app.core.bus import close_bus
+    await close_bus()
+
+    # Close pooled database connections (checkpoints the WAL)
+    from app.services.mail_service import close_mail_databases
+    close_mail_databases()
+    await engine.dispose()
+
+    from app.core.password_hasher import shutdown_password_hasher
+    shutdown_password_hasher()
+
+    await loop_monitor.stop()
 
     logger.info("Shutdown complete")
 
@@ -113,8 +179,12 @@ async def root():
 
 @app.get("/health")
 async def health():
-    """Health check endpoint"""
-    return {"status": "healthy"}
+    """Health check endpoint (reports event loop lag of this process)"""
+    event_loop = get_loop_monitor().health(settings.LOOP_LAG_WARN_MS)
+    return {
+        "status": "healthy" if event_loop["healthy"] else "degraded",
+        "event_loop": event_loop,
+    }
 
 
 # Mount static files for admin UI
@@ -129,4 +199,5 @@ if __name__ == "__main__":
         host=settings.HOST,
         port=settings.PORT,
         reload=settings.DEBUG,
+        loop=resolve_event_loop(settings.EVENT_LOOP),
     )
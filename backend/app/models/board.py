@@ -1,8 +1,8 @@
 """
 Board and Message models
 """
-from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, UniqueConstraint
-from sqlalchemy.sql import func
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Boolean, UniqueConstraint, Index, DDL, event
+from sqlalchemy.sql import func, table, column
 from sqlalchemy.orm import relationship
 from app.core.database import Base
 
@@ -26,6 +26,10 @@ class Board(Base):
     enforced_news = Column(Boolean, default=False)  # Force display news on login
     operator_id = Column(String(8), ForeignKey("users.user_id"), nullable=True)  # Board operator
 
+    # Denormalized counters (maintained by BoardService message writes)
+    message_count = Column(Integer, default=0, nullable=False, server_default="0")  # Non-deleted messages
+    last_message_no = Column(Integer, default=0, nullable=False, server_default="0")  # Message number sequence
+
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
@@ -68,10 +72,73 @@ class Message(Base):
     responses = relationship("Message", back_populates="parent", remote_side=[id])
     parent = relationship("Message", back_populates="responses", remote_side=[parent_id])
 
+    # message_no is allocated from boards.last_message_no; the index rejects duplicates
+    __table_args__ = (
+        Index("uq_messages_board_message_no", "board_id", "message_no", unique=True),
+    )
+
     def __repr__(self):
         return f"<Message {self.message_no} on Board {self.board_id}: {self.title}>"
 
 
+# Full-text search index over non-deleted messages.
+# External-content FTS5 table (rows live in messages) with the trigram
+# tokenizer, so Japanese text is searchable by any 3+ character substring.
+# Triggers keep it in sync; soft-deleted rows are removed from the index.
+MESSAGE_SEARCH_DDL = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS messages_fts USING fts5(
+        title, body,
+        content='messages', content_rowid='id',
+        tokenize='trigram'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ai AFTER INSERT ON messages
+    WHEN new.deleted = 0
+    BEGIN
+        INSERT INTO messages_fts(rowid, title, body) VALUES (new.id, new.title, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_ad AFTER DELETE ON messages
+    WHEN old.deleted = 0
+    BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, title, body)
+        VALUES ('delete', old.id, old.title, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS messages_fts_au AFTER UPDATE OF title, body, deleted ON messages
+    BEGIN
+        INSERT INTO messages_fts(messages_fts, rowid, title, body)
+        SELECT 'delete', old.id, old.title, old.body WHERE old.deleted = 0;
+        INSERT INTO messages_fts(rowid, title, body)
+        SELECT new.id, new.title, new.body WHERE new.deleted = 0;
+    END
+    """,
+]
+
+# Re-populate the index from scratch (used by scripts/rebuild_search_index.py)
+MESSAGE_SEARCH_REBUILD = [
+    "INSERT INTO messages_fts(messages_fts) VALUES ('delete-all')",
+    "INSERT INTO messages_fts(rowid, title, body) SELECT id, title, body FROM messages WHERE deleted = 0",
+    "INSERT INTO messages_fts(messages_fts) VALUES ('optimize')",
+]
+
+# Minimum query term length the trigram tokenizer can match
+MESSAGE_SEARCH_MIN_TERM = 3
+
+# Lightweight table construct for querying the index
+messages_fts = table("messages_fts", column("rowid"), column("title"), column("body"))
+
+for _statement in MESSAGE_SEARCH_DDL:
+    event.listen(
+        Message.__table__, "after_create",
+        DDL(_statement).execute_if(dialect="sqlite"),
+    )
+
+
 class UserReadPosition(Base):
     """Track user's read position on each board"""
     __tablename__ = "user_read_positions"
@@ -0,0 +1,18 @@
+"""
+Counter model
+"""
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.core.database import Base
+
+
+class Counter(Base):
+    """Named persistent counter (e.g. telnet accesses)"""
+    __tablename__ = "counters"
+
+    name = Column(String(50), primary_key=True)
+    value = Column(Integer, default=0, nullable=False)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+    def __repr__(self):
+        return f"<Counter(name={self.name}, value={self.value})>"
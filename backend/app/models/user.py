@@ -1,7 +1,7 @@
 """
 User model
 """
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text
+from sqlalchemy import Column, Integer, String, Boolean, DateTime, Text, Index
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -41,5 +41,11 @@ class User(Base):
     is_banned = Column(Boolean, default=False)
     must_change_password_on_next_login = Column(Boolean, default=False)
 
+    # Case-insensitive indexes for recipient prefix search (LIKE 'abc%')
+    __table_args__ = (
+        Index("ix_users_user_id_nocase", user_id.collate("NOCASE")),
+        Index("ix_users_handle_name_nocase", handle_name.collate("NOCASE")),
+    )
+
     def __repr__(self):
         return f"<User {self.user_id} ({self.handle_name})>"
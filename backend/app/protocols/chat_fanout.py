@@ -0,0 +1,163 @@
+"""
+Chat Fan-out - Per-participant outbound queues for chat delivery
+
+A chat line is encoded to CP932 once (chat_item) and the same queue item is
+offered to every recipient. Each participant has a bounded queue drained by
+its own writer task, so the sender never waits and one stalled client (full
+TCP window) only delays itself. This module is only the delivery layer;
+ChatHub decides who is in which room and who gets a line.
+"""
+import asyncio
+import bisect
+import logging
+import time
+from collections import deque
+from typing import Deque, Optional, Tuple
+
+from app.protocols.telnet_output import encode_text
+
+logger = logging.getLogger(__name__)
+
+# Slow consumer policies (queue full)
+POLICY_COALESCE = "coalesce"  # discard the oldest lines, show "N lines skipped" instead
+POLICY_DROP = "drop"  # remove the participant from chat
+POLICIES = (POLICY_COALESCE, POLICY_DROP)
+
+SKIPPED_NOTICE = "\r\n*** {count} 件のメッセージを省略しました ***\r\n"
+DROPPED_NOTICE = "\r\n*** 受信が追いつかないためチャットから切断されました ***\r\n"
+
+
+class LatencyHistogram:
+    """Fixed-bucket histogram of delivery latency (enqueue to socket write)"""
+
+    BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKETS_MS) + 1)  # last bucket: over 5 s
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        ms = seconds * 1000
+        self.counts[bisect.bisect_left(self.BUCKETS_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Upper bound (ms) of the bucket containing the p-th percentile"""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for idx, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank:
+                return float(self.BUCKETS_MS[idx]) if idx < len(self.BUCKETS_MS) else self.max
+        return self.max
+
+    def to_dict(self) -> dict:
+        labels = [f"<={ms}ms" for ms in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 2) if self.count else 0.0,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "max_ms": round(self.max, 2),
+            "buckets": {label: n for label, n in zip(labels, self.counts) if n},
+        }
+
+
+# (encoded line, enqueue time, room histogram or None for untracked lines)
+QueueItem = Tuple[bytes, float, Optional[LatencyHistogram]]
+
+
+def encode_chat(text: str) -> bytes:
+    """Encode a chat line for the wire (bypasses encode_text's cache; chat
+    lines rarely repeat and would only evict menus from it)"""
+    return encode_text.__wrapped__(text)
+
+
+def chat_item(text: str, histogram: Optional[LatencyHistogram] = None) -> QueueItem:
+    """Queue item for one line, shared by all its recipients"""
+    return (encode_chat(text), time.perf_counter(), histogram)
+
+
+class ChatParticipant:
+    """One chat member: bounded outbound queue plus writer task"""
+
+    def __init__(self, client_id: str, handler, room: int, queue_size: int, policy: str):
+        self.client_id = client_id
+        self.handler = handler
+        self.room = room
+        self.queue_size = queue_size
+        self.policy = policy
+        self.queue: Deque[QueueItem] = deque()
+        self.skipped = 0  # lines discarded since the last delivery (coalesce)
+        self.delivered = 0
+        self.dropped = False  # removed for being too slow (drop policy)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        self.queue.clear()
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return self.handler.user_id
+
+    @property
+    def handle_name(self) -> Optional[str]:
+        return self.handler.handle_name
+
+    def offer(self, item: QueueItem) -> bool:
+        """Queue a line without waiting; False if the participant must be dropped"""
+        if len(self.queue) >= self.queue_size:
+            if self.policy == POLICY_DROP:
+                return False
+            self.queue.popleft()
+            self.skipped += 1
+        self.queue.append(item)
+        self._wakeup.set()
+        return True
+
+    async def _writer(self) -> None:
+        output = self.handler.output
+        try:
+            while True:
+                await self._wakeup.wait()
+                self._wakeup.clear()
+                while self.queue:
+                    items = list(self.queue)
+                    self.queue.clear()
+                    if self.skipped:
+                        await output.write(encode_text(SKIPPED_NOTICE.format(count=self.skipped)))
+                        self.skipped = 0
+                    for data, _, _ in items:
+                        await output.write(data)
+                    await output.flush()
+
+                    now = time.perf_counter()
+                    for _, enqueued_at, histogram in items:
+                        if histogram is not None:
+                            histogram.observe(now - enqueued_at)
+                    self.delivered += len(items)
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.debug(f"Chat writer for {self.client_id} stopped: {e}")
+
+    async def send_dropped_notice(self) -> None:
+        try:
+            await self.handler.output.write(encode_text(DROPPED_NOTICE))
+            await asyncio.wait_for(self.handler.output.flush(), timeout=1)
+        except Exception:
+            pass
@@ -0,0 +1,240 @@
+"""
+Chat Hub - Numbered chat channels, whispers and scrollback
+
+Rooms are fixed numbered channels (1..CHAT_ROOM_COUNT, like the original
+MTBBS). Membership is kept in dicts per room, so join, leave and room changes
+are O(1) and a broadcast only touches the members of its own room. Each room
+keeps the last CHAT_SCROLLBACK lines in a ring buffer that is shown to members
+as they join. The hub only knows this process's members; TelnetServer routes
+lines to it over the message bus and uses presence for the cross-process view.
+"""
+import asyncio
+import logging
+from collections import deque
+from datetime import datetime
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+
+from app.core.config import settings
+from app.protocols.chat_fanout import (
+    ChatParticipant,
+    LatencyHistogram,
+    POLICIES,
+    POLICY_COALESCE,
+    chat_item,
+    encode_chat,
+)
+
+logger = logging.getLogger(__name__)
+
+LOBBY = 1
+
+SCROLLBACK_HEADER = "\r\n--- 最近の発言 ---\r\n"
+SCROLLBACK_FOOTER = "------------------\r\n"
+
+
+class ChatRoom:
+    """One channel: members, scrollback ring buffer and delivery latency"""
+
+    def __init__(self, number: int, name: str, scrollback: int = 20):
+        self.number = number
+        self.name = name
+        self.members: Dict[str, ChatParticipant] = {}
+        self.scrollback: Deque[Tuple[datetime, str]] = deque(maxlen=scrollback)
+        self.latency = LatencyHistogram()
+        self.messages = 0
+
+    def record(self, text: str) -> None:
+        """Add a line to the scrollback"""
+        line = text.strip("\r\n")
+        if line:
+            self.scrollback.append((datetime.now(), line))
+
+    def replay(self) -> Optional[bytes]:
+        """Scrollback formatted for a late joiner (None if empty)"""
+        if not self.scrollback:
+            return None
+        lines = [SCROLLBACK_HEADER]
+        lines.extend(f"{at:%H:%M} {line}\r\n" for at, line in self.scrollback)
+        lines.append(SCROLLBACK_FOOTER)
+        return encode_chat("".join(lines))
+
+    def to_dict(self) -> dict:
+        return {
+            "number": self.number,
+            "name": self.name,
+            "members": [
+                {"user_id": p.user_id, "handle": p.handle_name}
+                for p in self.members.values()
+            ],
+            "messages": self.messages,
+            "scrollback": len(self.scrollback),
+            "latency": self.latency.to_dict(),
+        }
+
+
+class ChatHub:
+    """Chat membership, rooms and non-blocking delivery"""
+
+    def __init__(
+        self,
+        room_count: int = 10,
+        scrollback: int = 20,
+        queue_size: int = 64,
+        policy: str = POLICY_COALESCE,
+    ):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown chat slow consumer policy: {policy}")
+        self.queue_size = max(1, queue_size)
+        self.policy = policy
+        self.rooms: Dict[int, ChatRoom] = {
+            number: ChatRoom(number, "ロビー" if number == LOBBY else f"チャンネル{number}", scrollback)
+            for number in range(1, max(1, room_count) + 1)
+        }
+        self.participants: Dict[str, ChatParticipant] = {}
+        self.dropped_total = 0
+        self._tasks: Set[asyncio.Task] = set()  # drop notices still being sent
+        # Called after a slow consumer is dropped (the server announces it)
+        self.on_drop: Optional[Callable[[ChatParticipant], None]] = None
+
+    def get_room(self, number: int) -> Optional[ChatRoom]:
+        return self.rooms.get(number)
+
+    def room_of(self, client_id: str) -> Optional[ChatRoom]:
+        participant = self.participants.get(client_id)
+        return self.rooms.get(participant.room) if participant else None
+
+    def is_member(self, client_id: str) -> bool:
+        return client_id in self.participants
+
+    def join(self, client_id: str, handler, room: int = LOBBY) -> ChatRoom:
+        """Enter chat (or switch rooms); the caller shows room.replay()
+
+        Raises:
+            ValueError: unknown room number
+        """
+        target = self.rooms.get(room)
+        if target is None:
+            raise ValueError(f"No such chat room: {room}")
+
+        participant = self.participants.get(client_id)
+        if participant is None:
+            participant = ChatParticipant(client_id, handler, room, self.queue_size, self.policy)
+            self.participants[client_id] = participant
+            participant.start()
+        else:
+            self.rooms[participant.room].members.pop(client_id, None)
+            participant.room = room
+
+        target.members[client_id] = participant
+        return target
+
+    def leave(self, client_id: str) -> Optional[ChatParticipant]:
+        """Leave chat entirely"""
+        participant = self.participants.pop(client_id, None)
+        if participant is None:
+            return None
+        self.rooms[participant.room].members.pop(client_id, None)
+        participant.stop()
+        return participant
+
+    def broadcast(
+        self,
+        text: str,
+        room: int = LOBBY,
+        exclude_client_id: Optional[str] = None,
+        record: bool = True,
+    ) -> int:
+        """Queue a line for everyone in the room; never waits
+
+        Returns:
+            Number of recipients the line was queued for
+        """
+        target = self.rooms.get(room)
+        if target is None:
+            return 0
+        if record:
+            target.record(text)
+        target.messages += 1
+        if not target.members:
+            return 0
+
+        item = chat_item(text, target.latency)
+        queued = 0
+        too_slow: List[ChatParticipant] = []
+        for client_id, participant in target.members.items():
+            if client_id == exclude_client_id:
+                continue
+            if participant.offer(item):
+                queued += 1
+            else:
+                too_slow.append(participant)
+
+        for participant in too_slow:
+            self._drop(participant)
+        return queued
+
+    def deliver(self, client_id: str, text: str) -> bool:
+        """Queue a private line (whisper) for one member of this process"""
+        participant = self.participants.get(client_id)
+        if participant is None:
+            return False
+        if not participant.offer(chat_item(text)):
+            self._drop(participant)
+            return False
+        return True
+
+    def list_rooms(self) -> List[dict]:
+        """Room number, name and member count for every channel"""
+        return [
+            {"number": room.number, "name": room.name, "members": len(room.members)}
+            for room in self.rooms.values()
+        ]
+
+    def _drop(self, participant: ChatParticipant) -> None:
+        logger.warning(f"Dropping slow chat consumer {participant.client_id}")
+        self.leave(participant.client_id)
+        participant.dropped = True
+        self.dropped_total += 1
+        self._track(asyncio.create_task(participant.send_dropped_notice()))
+        if self.on_drop is not None:
+            try:
+                self.on_drop(participant)
+            except Exception as e:
+                logger.error(f"Chat drop callback failed: {e}", exc_info=True)
+
+    def _track(self, task: asyncio.Task) -> None:
+        """Keep a reference until the task is done (the loop only holds weak ones)"""
+        self._tasks.add(task)
+
+        def done(task: asyncio.Task) -> None:
+            self._tasks.discard(task)
+            if not task.cancelled() and task.exception():
+                logger.error(f"Chat drop notice failed: {task.exception()}", exc_info=task.exception())
+
+        task.add_done_callback(done)
+
+    def get_stats(self) -> dict:
+        return {
+            "policy": self.policy,
+            "queue_size": self.queue_size,
+            "participants": len(self.participants),
+            "dropped": self.dropped_total,
+            "rooms": [room.to_dict() for room in self.rooms.values()],
+        }
+
+
+# グローバルチャットハブ
+_chat_hub: Optional[ChatHub] = None
+
+
+def get_chat_hub() -> ChatHub:
+    """Get the global chat hub"""
+    global _chat_hub
+    if _chat_hub is None:
+        _chat_hub = ChatHub(
+            room_count=settings.CHAT_ROOM_COUNT,
+            scrollback=settings.CHAT_SCROLLBACK,
+            queue_size=settings.CHAT_QUEUE_SIZE,
+            policy=settings.CHAT_SLOW_CONSUMER_POLICY,
+        )
+    return _chat_hub
@@ -0,0 +1,89 @@
+"""
+Chat Monitor - Chat rooms as seen from a process without telnet sessions
+
+When telnet runs outside the API (TELNET_EMBEDDED=false, python -m app.telnet)
+the API's own ChatHub never has members. The monitor follows the "presence"
+and "chat" bus channels instead: members come from the workers' presence
+snapshots and every line is recorded into the room scrollback, so the admin
+chat endpoints cover all workers.
+"""
+import logging
+from typing import List, Optional
+
+from app.core.bus import get_bus
+from app.core.config import settings
+from app.protocols.chat_hub import ChatHub
+from app.protocols.presence import PresenceRegistry
+
+logger = logging.getLogger(__name__)
+
+
+class ChatMonitor:
+    """Read-only chat view fed by the message bus"""
+
+    def __init__(self):
+        # A hub without participants: room names and scrollback only
+        self.hub = ChatHub(
+            room_count=settings.CHAT_ROOM_COUNT,
+            scrollback=settings.CHAT_SCROLLBACK,
+            queue_size=settings.CHAT_QUEUE_SIZE,
+            policy=settings.CHAT_SLOW_CONSUMER_POLICY,
+        )
+        self.presence = PresenceRegistry(expire_after=settings.PRESENCE_HEARTBEAT_INTERVAL * 3)
+
+    async def start(self) -> None:
+        """Subscribe and ask the telnet processes for their sessions"""
+        bus = get_bus()
+        bus.subscribe("presence", self._on_presence)
+        bus.subscribe("chat", self._on_chat)
+        await bus.start()
+        await bus.publish("presence", {"op": "hello"})
+
+    def stop(self) -> None:
+        bus = get_bus()
+        bus.unsubscribe("presence", self._on_presence)
+        bus.unsubscribe("chat", self._on_chat)
+
+    def _on_presence(self, data: dict, origin: str) -> None:
+        if data.get("op") != "hello":
+            self.presence.apply(data, origin)
+
+    def _on_chat(self, data: dict, origin: str) -> None:
+        self.hub.broadcast(data["text"], room=data["room"])
+
+    def _members(self, room: Optional[int] = None) -> List[dict]:
+        self.presence.expire()
+        return [
+            {"user_id": s.get("user_id"), "handle": s.get("handle"), "node": s.get("node")}
+            for s in self.presence.chat_members(room)
+        ]
+
+    def room_info(self, number: int) -> Optional[dict]:
+        """One room with members from presence (None if there is no such room)"""
+        room = self.hub.get_room(number)
+        if room is None:
+            return None
+        return {**room.to_dict(), "members": self._members(number)}
+
+    def get_stats(self) -> dict:
+        stats = self.hub.get_stats()
+        rooms = [self.room_info(number) for number in self.hub.rooms]
+        return {
+            **stats,
+            "source": "bus",
+            "participants": sum(len(room["members"]) for room in rooms),
+            "dropped": None,  # counted by each worker
+            "rooms": rooms,
+        }
+
+
+# グローバルチャットモニター
+_chat_monitor: Optional[ChatMonitor] = None
+
+
+def get_chat_monitor() -> ChatMonitor:
+    """Get the global chat monitor"""
+    global _chat_monitor
+    if _chat_monitor is None:
+        _chat_monitor = ChatMonitor()
+    return _chat_monitor
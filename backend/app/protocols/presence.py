@@ -0,0 +1,84 @@
+"""
+Presence - Who is online across all server processes
+
+Each process announces its sessions on the "presence" bus channel (join,
+update, leave) and publishes a full snapshot every heartbeat. Every process
+keeps the merged view, so Who, chat room lists and whisper/telegram lookups
+see sessions on other workers. Sessions of a node that stops sending
+heartbeats are dropped after a few missed intervals.
+"""
+import time
+from typing import Dict, List, Optional
+
+
+class PresenceRegistry:
+    """Sessions per node, fed by presence messages"""
+
+    def __init__(self, expire_after: float = 45.0):
+        self.expire_after = expire_after
+        self._nodes: Dict[str, Dict[str, dict]] = {}  # node -> client_id -> session
+        self._seen: Dict[str, float] = {}  # node -> last message time
+
+    def apply(self, data: dict, origin: str) -> None:
+        """Apply a presence message ({"op": join|update|leave|snapshot, ...})"""
+        self._seen[origin] = time.monotonic()
+        sessions = self._nodes.setdefault(origin, {})
+        op = data.get("op")
+        if op == "snapshot":
+            self._nodes[origin] = {s["client_id"]: {**s, "node": origin} for s in data["sessions"]}
+        elif op == "leave":
+            sessions.pop(data["client_id"], None)
+        elif op in ("join", "update"):
+            session = sessions.setdefault(data["client_id"], {"client_id": data["client_id"]})
+            session.update(data["session"])
+            session["node"] = origin
+        elif op == "down":
+            self.forget(origin)
+
+    def forget(self, node: str) -> None:
+        self._nodes.pop(node, None)
+        self._seen.pop(node, None)
+
+    def expire(self) -> List[str]:
+        """Drop nodes that stopped sending heartbeats; returns their IDs"""
+        deadline = time.monotonic() - self.expire_after
+        stale = [node for node, seen in self._seen.items() if seen < deadline]
+        for node in stale:
+            self.forget(node)
+        return stale
+
+    def sessions(self) -> List[dict]:
+        """All sessions on all nodes, oldest connection first"""
+        result = [session for sessions in self._nodes.values() for session in sessions.values()]
+        result.sort(key=lambda s: s.get("connected_at") or "")
+        return result
+
+    def get(self, client_id: str) -> Optional[dict]:
+        for sessions in self._nodes.values():
+            if client_id in sessions:
+                return sessions[client_id]
+        return None
+
+    def find_user(self, name: str, in_chat: bool = False) -> Optional[dict]:
+        """Session by user ID (case-insensitive) or exact handle"""
+        key = name.lower()
+        fallback = None
+        for session in (s for sessions in self._nodes.values() for s in sessions.values()):
+            if in_chat and session.get("room") is None:
+                continue
+            if (session.get("user_id") or "").lower() == key:
+                return session
+            if fallback is None and session.get("handle") == name:
+                fallback = session
+        return fallback
+
+    def chat_members(self, room: Optional[int] = None) -> List[dict]:
+        """Sessions in chat (optionally one room)"""
+        return [
+            s for s in self.sessions()
+            if s.get("room") is not None and (room is None or s["room"] == room)
+        ]
+
+    def nodes(self) -> Dict[str, int]:
+        """Session count per node"""
+        return {node: len(sessions) for node, sessions in self._nodes.items()}
@@ -5,12 +5,17 @@ import asyncio
 import logging
 import os
 from datetime import datetime
-from typing import Optional
+from functools import partial
+from typing import Callable, Optional, Tuple
 from app.resources.messages_ja import MTBBS_VERSION
+from app.protocols import telnet_protocol
+from app.protocols.telnet_input import TelnetLineReader
+from app.protocols.telnet_output import TelnetOutputBuffer, encode_text
 from app.services.user_service import UserService
-from app.services.board_service import BoardService
+from app.services.counter_service import get_access_counter
+from app.services.board_service import BoardService, ReadPositionTracker, get_board_registry
 from app.services.message_service import MessageService
-from app.services.mail_service import MailService
+from app.services.mail_service import MailService, MailSummary
 from app.core.config import settings
 from app.utils.rate_limiter import get_rate_limiter, RateLimitExceeded
 from app.utils.input_sanitizer import (
@@ -42,6 +47,9 @@ class TelnetHandler:
         self.user_service = UserService()
         self.board_service = BoardService()
         self.message_service = MessageService()
+        self.read_tracker = ReadPositionTracker(
+            self.board_service, flush_interval=settings.READ_POSITION_FLUSH_INTERVAL
+        )
 
         # Get absolute path to database
         # __file__ is backend/app/protocols/telnet_handler.py
@@ -55,26 +63,33 @@ class TelnetHandler:
 
         # Input buffer
         self.input_buffer = ""
+        self.line_reader = TelnetLineReader(
+            reader, writer,
+            chunk_size=settings.TELNET_READ_CHUNK_SIZE,
+            on_event=self.handle_telnet_event,
+        )
+
+        # Output buffer (flushed at each prompt)
+        self.output = TelnetOutputBuffer(
+            writer,
+            flush_threshold=settings.TELNET_OUTPUT_FLUSH_THRESHOLD,
+            high_water=settings.TELNET_WRITE_HIGH_WATER,
+            low_water=settings.TELNET_WRITE_LOW_WATER,
+        )
 
         # Command line for continuous execution (e.g., "n@", "r0@")
         self.command_line = ""
 
-        # Terminal size
+        # Terminal size and type (updated by NAWS / TTYPE negotiation)
         self.terminal_width = 80
         self.terminal_height = 24
+        self.terminal_type: Optional[str] = None
 
     async def handle(self):
         """Main session handler"""
         try:
-            # Send Telnet options to indicate Shift-JIS encoding and request terminal size
-            # IAC WILL BINARY
-            self.writer.write(bytes([255, 251, 0]))
-            # IAC DO NAWS (Negotiate About Window Size)
-            self.writer.write(bytes([255, 253, 31]))
-            # IAC WILL ECHO (server handles echo)
-            self.writer.write(bytes([255, 251, 1]))
-            # IAC WILL SUPPRESS-GO-AHEAD
-            self.writer.write(bytes([255, 251, 3]))
+            # Offer BINARY/ECHO/SGA and request window size (NAWS) and terminal type
+            self.writer.write(telnet_protocol.INITIAL_NEGOTIATION)
             await self.writer.drain()
 
             await self.send_opening_message()
@@ -90,114 +105,96 @@ class TelnetHandler:
         finally:
             await self.disconnect()
 
+    def handle_telnet_event(self, event):
+        """Apply negotiated Telnet options (called from the line reader)"""
+        if isinstance(event, telnet_protocol.SubnegotiationEvent):
+            if event.option == telnet_protocol.OPT_NAWS:
+                size = telnet_protocol.parse_naws(event.data)
+                if size:
+                    width, height = size
+                    # 0 means "unknown" per RFC 1073
+                    if width:
+                        self.terminal_width = width
+                    if height:
+                        self.terminal_height = height
+                    logger.debug(f"NAWS {self.client_id}: {width}x{height}")
+            elif event.option == telnet_protocol.OPT_TTYPE:
+                terminal_type = telnet_protocol.parse_ttype(event.data)
+                if terminal_type:
+                    self.terminal_type = terminal_type
+                    logger.debug(f"TTYPE {self.client_id}: {terminal_type}")
+        elif isinstance(event, telnet_protocol.CommandEvent):
+            if event.command == telnet_protocol.WILL and event.option == telnet_protocol.OPT_TTYPE:
+                self.writer.write(telnet_protocol.TTYPE_SEND_REQUEST)
+
+    @property
+    def page_size(self) -> int:
+        """Number of list lines that fit on one screen (leaves room for prompts)"""
+        return max(self.terminal_height - 4, 5)
+
     async def send(self, text: str):
-        """Send text to client (Shift-JIS encoding with CR+LF line endings)"""
+        """Send text to client (Shift-JIS encoding with CR+LF line endings)
+
+        Output is buffered and written on the next flush (before each input
+        prompt, or when the buffer passes TELNET_OUTPUT_FLUSH_THRESHOLD).
+        """
         try:
-            # Convert LF to CR+LF for proper telnet line endings
-            text = text.replace("\r\n", "\n").replace("\n", "\r\n")
-            self.writer.write(text.encode("cp932", errors="replace"))
-            await self.writer.drain()
+            await self.output.write(encode_text(text))
         except Exception as e:
             logger.error(f"Send error: {e}")
             raise
 
+    async def flush(self):
+        """Write buffered output to the client"""
+        try:
+            await self.output.flush()
+        except Exception as e:
+            logger.error(f"Flush error: {e}")
+            raise
+
+    async def send_system_message(self, message_key: str, **kwargs):
+        """Send a system message (pre-encoded bytes are reused when possible)"""
+        data = await self.message_service.get_message_bytes(message_key, **kwargs)
+        await self.output.write(data)
+
     async def send_line(self, text: str = ""):
         """Send text with newline (CR+LF)"""
         await self.send(text + "\r\n")
 
-    async def receive_line(self, echo: bool = True) -> str:
+    async def receive_line(self, echo: bool = True, allow_empty: bool = False) -> str:
         """Receive line of input from client with Telnet IAC filtering and CP932 multi-byte support"""
-        raw_bytes = bytearray()
         try:
-            while True:
-                data = await self.reader.read(1)
-                if not data:
-                    raise ConnectionError("Connection closed")
-
-                byte_val = data[0]
-
-                # Handle Telnet IAC (Interpret As Command) sequences
-                if byte_val == 0xFF:  # IAC
-                    # Read command byte
-                    cmd_data = await self.reader.read(1)
-                    if not cmd_data:
-                        break
-                    cmd = cmd_data[0]
-
-                    # Commands that take an option byte (WILL, WONT, DO, DONT, SB)
-                    if cmd in [0xFB, 0xFC, 0xFD, 0xFE, 0xFA]:
-                        opt_data = await self.reader.read(1)
-                        if cmd == 0xFA:  # SB (subnegotiation) - read until SE
-                            while True:
-                                sb_data = await self.reader.read(1)
-                                if not sb_data:
-                                    break
-                                if sb_data[0] == 0xFF:
-                                    se_data = await self.reader.read(1)
-                                    if se_data and se_data[0] == 0xF0:  # SE
-                                        break
-                    # Skip IAC sequence and continue
-                    continue
-
-                # Check for line endings
-                if byte_val == 0x0D or byte_val == 0x0A:  # CR or LF
-                    if raw_bytes:
-                        if echo:
-                            await self.send("\r\n")
-                        # Decode the complete byte sequence as CP932
-                        try:
-                            line = raw_bytes.decode("cp932", errors="replace")
-                        except Exception as e:
-                            logger.error(f"Decode error: {e}")
-                            line = raw_bytes.decode("utf-8", errors="replace")
-
-                        # Debug: log received input with byte representation
-                        logger.info(f"Input received (raw): {line!r}")
-                        logger.info(f"Input bytes (hex): {raw_bytes.hex()}")
-                        # Strip leading/trailing whitespace including full-width spaces
-                        cleaned = line.strip().replace('\u3000', '')
-                        logger.info(f"Input cleaned: {cleaned!r}")
-                        return cleaned
-                    continue  # Skip empty lines (just CR/LF)
-
-                # Handle backspace
-                elif byte_val == 0x08 or byte_val == 0x7F:  # Backspace or DEL
-                    if raw_bytes:
-                        # Remove last character (may be 1 or 2 bytes for CP932)
-                        if len(raw_bytes) >= 2 and raw_bytes[-2] >= 0x81:
-                            # Last char was 2-byte (Shift-JIS lead byte)
-                            raw_bytes = raw_bytes[:-2]
-                        else:
-                            # Last char was 1-byte (ASCII)
-                            raw_bytes = raw_bytes[:-1]
-                        if echo:
-                            await self.send("\x08 \x08")
-                else:
-                    # Skip NULL bytes (0x00) which some telnet clients send
-                    if byte_val == 0x00:
-                        logger.info(f"Skipping NULL byte (0x00)")
-                        continue
-                    # Accumulate bytes
-                    raw_bytes.append(byte_val)
-                    # Echo back raw byte (terminal will handle display)
-                    if echo:
-                        self.writer.write(bytes([byte_val]))
-                        await self.writer.drain()
+            await self.flush()
+            raw_bytes = await self.line_reader.read_line(echo=echo, allow_empty=allow_empty)
         except Exception as e:
             logger.error(f"Receive error: {e}")
             raise
 
+        # Decode the complete byte sequence as CP932
+        try:
+            line = raw_bytes.decode("cp932", errors="replace")
+        except Exception as e:
+            logger.error(f"Decode error: {e}")
+            line = raw_bytes.decode("utf-8", errors="replace")
+
+        # Debug: log received input with byte representation
+        logger.info(f"Input received (raw): {line!r}")
+        logger.info(f"Input bytes (hex): {raw_bytes.hex()}")
+        # Strip leading/trailing whitespace including full-width spaces
+        cleaned = line.strip().replace('\u3000', '')
+        logger.info(f"Input cleaned: {cleaned!r}")
+        return cleaned
+
     async def send_opening_message(self):
         """Send welcome message"""
-        access_count = await self.user_service.get_access_count()
+        access_count = get_access_counter().increment()
 
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "OPENING_MESSAGE",
             date=datetime.now().strftime("%Y/%m/%d"),
             weekday=["月", "火", "水", "木", "金", "土", "日"][datetime.now().weekday()],
             access_count=access_count,
         )
-        await self.send(msg)
 
     async def login(self):
         """Login process with rate limiting"""
@@ -240,6 +237,7 @@ class TelnetHandler:
             if user_id.lower() == "guest":
                 self.user_id = "guest"
                 self.handle_name = "Guest"
+                self.read_tracker.user_id = self.user_id
                 self.user_level = 0
                 self.authenticated = True
                 await self.send_login_message()
@@ -259,6 +257,7 @@ class TelnetHandler:
             if user:
                 self.user_id = user.user_id
                 self.handle_name = user.handle_name
+                self.read_tracker.user_id = self.user_id
                 self.user_level = user.level
                 self.authenticated = True
                 await self.send_login_message()
@@ -290,20 +289,22 @@ class TelnetHandler:
         else:
             greeting = "こんばんは"
 
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "LOGIN_MESSAGE",
             handle=self.handle_name,
             greeting=greeting
         )
-        await self.send(msg)
 
     async def display_enforced_news(self):
         """Display enforced news boards on login"""
-        enforced_boards = await self.board_service.get_enforced_news_boards()
-
-        if not enforced_boards:
+        boards = await get_board_registry().get_all()
+        if not any(board.enforced_news and board.is_active for board in boards):
             return
 
+        summary = await self.board_service.get_unread_summary(
+            self.user_id, self.user_level, enforced_only=True
+        )
+
         # Get customizable header from system messages
         header = await self.message_service.get_message_content(
             "ENFORCED_NEWS_HEADER",
@@ -314,39 +315,18 @@ class TelnetHandler:
         await self.send_line(header)
         await self.send_line("=" * 70)
 
-        for board in enforced_boards:
-            if board.read_level > self.user_level:
-                continue
-
-            # Get new messages
-            new_count = await self.board_service.get_new_message_count(
-                board.board_id,
-                self.user_id
-            )
-
-            if new_count > 0:
-                await self.send_line(f"\r\nBoard: {board.name}")
-                await self.send_line(f"{new_count} new message(s)\r\n")
-
-                # Display all new messages
-                last_read = await self.board_service.get_read_position(
-                    self.user_id,
-                    board.board_id
-                )
-
-                messages = await self.board_service.get_all_messages(board.board_id)
-                new_messages = [m for m in messages if m.message_no > last_read]
+        for board_id, name, new_count in summary:
+            await self.send_line(f"\r\nBoard: {name}")
+            await self.send_line(f"{new_count} new message(s)\r\n")
 
-                for msg in new_messages:
-                    await self.display_message(msg)
-                    # Update read position
-                    await self.board_service.update_read_position(
-                        self.user_id,
-                        board.board_id,
-                        msg.message_no
-                    )
+            # Display all new messages
+            async for msg in self.board_service.iter_unread_messages(board_id, self.user_id):
+                await self.display_message(msg)
+                # Update read position
+                await self.read_tracker.mark(board_id, msg.message_no)
 
         await self.send_line("=" * 70)
+        await self.flush_read_positions()
         # Note: Original MTBBS does not wait for user input here
         # Just display the enforced news and continue to main menu
 
@@ -417,46 +397,40 @@ class TelnetHandler:
             finally:
                 # Clear command_line after execution
                 self.command_line = ""
+                await self.flush_read_positions()
+                await self.flush()
+                stats = self.output.reset_command_stats()
+                logger.debug(
+                    f"Command '{cmd}' output: {stats['bytes']} bytes in {stats['flushes']} flush(es)"
+                )
 
     async def show_main_menu(self):
         """Display main menu"""
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "MAIN_MENU",
             version=MTBBS_VERSION,
             time=datetime.now().strftime("%H:%M"),
             user_id=self.user_id,
             handle=self.handle_name,
         )
-        await self.send(msg)
 
     async def news(self):
         """Show new messages with auto-read support (n@)"""
         auto_read = "@" in self.command_line
 
         await self.send_line("\r\n=== New Messages ===")
-        boards = await self.board_service.get_boards()
+        summary = await self.board_service.get_unread_summary(self.user_id, self.user_level)
 
-        has_new = False
-        for board in boards:
-            if board.read_level > self.user_level:
-                continue
+        has_new = bool(summary)
+        for board_id, name, new_count in summary:
+            await self.send_line(f"Board {board_id}: {name} ({new_count} new)")
 
-            new_count = await self.board_service.get_new_message_count(board.board_id, self.user_id)
-            if new_count > 0:
-                has_new = True
-                await self.send_line(f"Board {board.board_id}: {board.name} ({new_count} new)")
-
-                if auto_read:
-                    # Auto-read mode: display all unread messages
-                    unread_messages = await self.board_service.get_unread_messages(board.board_id, self.user_id)
-                    for msg in unread_messages:
-                        await self.display_message(msg)
-                        # Update read position after each message
-                        await self.board_service.update_read_position(
-                            self.user_id,
-                            board.board_id,
-                            msg.message_no
-                        )
+            if auto_read:
+                # Auto-read mode: display all unread messages
+                async for msg in self.board_service.iter_unread_messages(board_id, self.user_id):
+                    await self.display_message(msg)
+                    # Update read position after each message
+                    await self.read_tracker.mark(board_id, msg.message_no)
 
         if not has_new:
             await self.send_line("新着メッセージはありません。")
@@ -477,8 +451,7 @@ class TelnetHandler:
             await self.send_line("\r\n=== Message Boards ===")
             for board in boards:
                 if board.read_level <= self.user_level:
-                    msg_count = len(await self.board_service.get_all_messages(board.board_id))
-                    await self.send_line(f"[{board.board_id}] {board.name:20s} ({msg_count} messages) - {board.description or ''}")
+                    await self.send_line(f"[{board.board_id}] {board.name:20s} ({board.message_count} messages) - {board.description or ''}")
 
             await self.send("\r\nBoard number (0 to cancel): ")
             board_no_str = await self.receive_line()
@@ -500,19 +473,14 @@ class TelnetHandler:
 
             # Auto-read mode (r0@): Display all messages automatically
             if auto_read:
-                messages = await self.board_service.get_all_messages(board_id)
                 await self.send_line(f"\r\n=== Board {board_id}: {board.name} ===")
-                if not messages:
-                    await self.send_line("No messages in this board.")
-                    return
-
-                for msg in messages:
+                shown = 0
+                async for msg in self.board_service.iter_messages(board_id):
                     await self.display_message(msg)
-                    await self.board_service.update_read_position(
-                        self.user_id,
-                        board_id,
-                        msg.message_no
-                    )
+                    await self.read_tracker.mark(board_id, msg.message_no)
+                    shown += 1
+                if not shown:
+                    await self.send_line("No messages in this board.")
                 return
 
             # Interactive mode: Show Read submenu
@@ -528,12 +496,12 @@ class TelnetHandler:
         """Read board submenu (R/I/S/L/Q)"""
         while True:
             # Get message count and unread count
-            all_messages = await self.board_service.get_all_messages(board_id)
-            unread_messages = await self.board_service.get_unread_messages(board_id, self.user_id)
+            total_count = await self.board_service.get_message_count(board_id)
+            unread_count = await self.board_service.get_new_message_count(board_id, self.user_id)
             last_read = await self.board_service.get_read_position(self.user_id, board_id)
 
             await self.send_line(f"\r\n=== Board {board_id}: {board.name} ===")
-            await self.send_line(f"Total: {len(all_messages)} messages | Unread: {len(unread_messages)} messages | Last read: #{last_read}")
+            await self.send_line(f"Total: {total_count} messages | Unread: {unread_count} messages | Last read: #{last_read}")
             await self.send_line("\r\nR) Read sequential  I) Individual select  S) Search  L) List  Q) Quit")
             await self.send("READ> ")
 
@@ -565,28 +533,29 @@ class TelnetHandler:
             else:
                 await self.send_line("Invalid command.")
 
+            # Persist positions so the counts shown next are current
+            await self.flush_read_positions()
+
     async def read_sequential(self, board_id: int, board):
         """Sequential read from last read position"""
-        unread_messages = await self.board_service.get_unread_messages(board_id, self.user_id)
+        unread_count = await self.board_service.get_new_message_count(board_id, self.user_id)
 
-        if not unread_messages:
+        if not unread_count:
             await self.send_line("\r\nNo unread messages.")
             return
 
-        await self.send_line(f"\r\n{len(unread_messages)} unread message(s). Reading sequentially...")
+        await self.send_line(f"\r\n{unread_count} unread message(s). Reading sequentially...")
 
-        for msg in unread_messages:
+        shown = 0
+        async for msg in self.board_service.iter_unread_messages(board_id, self.user_id):
             await self.display_message(msg)
-            await self.board_service.update_read_position(
-                self.user_id,
-                board_id,
-                msg.message_no
-            )
+            await self.read_tracker.mark(board_id, msg.message_no)
+            shown += 1
 
             # Prompt to continue or stop
-            if msg != unread_messages[-1]:
+            if shown < unread_count:
                 await self.send("\r\nPress Enter to continue, Q to quit: ")
-                choice = await self.receive_line()
+                choice = await self.receive_line(allow_empty=True)
                 if choice and choice.upper() == 'Q':
                     break
 
@@ -616,11 +585,7 @@ class TelnetHandler:
             message = await self.board_service.get_message(board_id, msg_no)
             if message:
                 await self.display_message(message)
-                await self.board_service.update_read_position(
-                    self.user_id,
-                    board_id,
-                    message.message_no
-                )
+                await self.read_tracker.mark(board_id, message.message_no)
             else:
                 await self.send_line("Message not found.")
         except ValueError:
@@ -658,11 +623,7 @@ class TelnetHandler:
             message = await self.board_service.get_message(board_id, msg_no)
             if message:
                 await self.display_message(message)
-                await self.board_service.update_read_position(
-                    self.user_id,
-                    board_id,
-                    message.message_no
-                )
+                await self.read_tracker.mark(board_id, message.message_no)
             else:
                 await self.send_line("Message not found.")
         except ValueError:
@@ -670,17 +631,25 @@ class TelnetHandler:
 
     async def read_list(self, board_id: int, board):
         """List all messages"""
-        messages = await self.board_service.get_all_messages(board_id)
+        total = await self.board_service.get_message_count(board_id)
 
-        if not messages:
+        if not total:
             await self.send_line("\r\nNo messages in this board.")
             return
 
-        await self.send_line(f"\r\n=== All Messages ({len(messages)} total) ===")
-        for msg in messages:
+        await self.send_line(f"\r\n=== All Messages ({total} total) ===")
+        idx = 0
+        async for msg in self.board_service.iter_messages(
+            board_id, batch_size=self.page_size, headers_only=True
+        ):
+            idx += 1
             await self.send_line(
                 f"[{msg.message_no}] {msg.title} - {msg.handle_name} ({msg.created_at.strftime('%Y/%m/%d %H:%M')})"
             )
+            # Pause at each screenful (sized from NAWS)
+            if idx % self.page_size == 0 and idx < total:
+                if not await self.more_prompt():
+                    break
 
         # Allow selecting from list
         await self.send("\r\nMessage number to read (0 to cancel): ")
@@ -694,11 +663,7 @@ class TelnetHandler:
             message = await self.board_service.get_message(board_id, msg_no)
             if message:
                 await self.display_message(message)
-                await self.board_service.update_read_position(
-                    self.user_id,
-                    board_id,
-                    message.message_no
-                )
+                await self.read_tracker.mark(board_id, message.message_no)
             else:
                 await self.send_line("Message not found.")
         except ValueError:
@@ -842,45 +807,89 @@ class TelnetHandler:
             else:
                 await self.send_line("\r\nInvalid command.")
 
-    async def mail_read_inbox(self):
-        """Read inbox"""
-        mails = await self.mail_service.get_inbox(self.user_id, include_read=True)
+    async def mail_pick(
+        self,
+        title: str,
+        header: str,
+        format_row: Callable[[int, MailSummary], str],
+        fetch_page: Callable,
+        empty_message: str,
+    ) -> Optional[MailSummary]:
+        """Paged mail listing with N)ext / P)rev; returns the picked mail or None"""
+        # Listing header (5 lines) and prompt (2 lines) share the screen with the rows
+        rows = max(self.page_size - 4, 5)
+        mails = await fetch_page(rows)
 
         if not mails:
-            await self.send_line("\r\nNo mail in inbox.")
-            return
+            await self.send_line(empty_message)
+            return None
 
-        # Display mail list
-        await self.send_line("\r\n" + "=" * 70)
-        await self.send_line("Inbox")
-        await self.send_line("=" * 70)
-        await self.send_line(f"{'#':<4} {'Status':<6} {'From':<15} {'Subject':<30} {'Date':<15}")
-        await self.send_line("-" * 70)
+        offset = 0  # number of rows on earlier pages
+        while True:
+            await self.send_line("\r\n" + "=" * 70)
+            await self.send_line(title)
+            await self.send_line("=" * 70)
+            await self.send_line(header)
+            await self.send_line("-" * 70)
+            for idx, mail in enumerate(mails, offset + 1):
+                await self.send_line(format_row(idx, mail))
 
-        for idx, mail in enumerate(mails, 1):
-            status = "Read" if mail.is_read else "NEW"
-            subject = mail.subject[:28] + ".." if len(mail.subject) > 30 else mail.subject
-            date_str = mail.sent_at.strftime("%Y-%m-%d %H:%M")
-            await self.send_line(
-                f"{idx:<4} {status:<6} {mail.sender_id:<15} {subject:<30} {date_str:<15}"
-            )
+            await self.send_line("")
+            await self.send("Mail number, N)ext / P)rev page (or Q to quit): ")
+
+            selection = await self.receive_line()
+            if not selection or selection.upper() == 'Q':
+                return None
+
+            choice = selection.upper().strip()
+            if choice == 'N':
+                page = await fetch_page(rows, older_than=mails[-1].cursor)
+                if page:
+                    offset += len(mails)
+                    mails = page
+                else:
+                    await self.send_line("\r\nNo more mail.")
+                continue
+            if choice == 'P':
+                page = await fetch_page(rows, newer_than=mails[0].cursor) if offset else []
+                if page:
+                    offset = max(offset - len(page), 0)
+                    mails = page
+                else:
+                    await self.send_line("\r\nAlready at the first page.")
+                continue
 
-        # Select mail to read
-        await self.send_line("")
-        await self.send("Read mail number (or Q to quit): ")
+            try:
+                mail_num = int(choice)
+            except ValueError:
+                await self.send_line("\r\nInvalid input.")
+                continue
+            if offset < mail_num <= offset + len(mails):
+                return mails[mail_num - offset - 1]
+            await self.send_line("\r\nInvalid mail number.")
 
-        selection = await self.receive_line()
-        if not selection or selection.upper() == 'Q':
+    async def mail_read_inbox(self):
+        """Read inbox"""
+        def format_row(idx: int, mail: MailSummary) -> str:
+            status = "Read" if mail.is_read else "NEW"
+            subject = mail.subject[:28] + ".." if len(mail.subject) > 30 else mail.subject
+            return f"{idx:<4} {status:<6} {mail.sender_id:<15} {subject:<30} {mail.date_str:<15}"
+
+        summary = await self.mail_pick(
+            "Inbox",
+            f"{'#':<4} {'Status':<6} {'From':<15} {'Subject':<30} {'Date':<15}",
+            format_row,
+            partial(self.mail_service.get_inbox_page, self.user_id),
+            "\r\nNo mail in inbox.",
+        )
+        if not summary:
             return
 
-        try:
-            mail_num = int(selection)
-            if 1 <= mail_num <= len(mails):
-                await self.mail_display(mails[mail_num - 1])
-            else:
-                await self.send_line("\r\nInvalid mail number.")
-        except ValueError:
-            await self.send_line("\r\nInvalid input.")
+        mail = await self.mail_service.get_mail_by_id(summary.mail_id, self.user_id)
+        if mail:
+            await self.mail_display(mail)
+        else:
+            await self.send_line("\r\nMail not found.")
 
     async def mail_display(self, mail):
         """Display a mail message"""
@@ -966,38 +975,53 @@ class TelnetHandler:
         except Exception as e:
             await self.send_line(f"\r\nFailed to send reply: {e}")
 
-    async def mail_send(self):
-        """Send a new mail"""
-        await self.send_line("\r\n--- Send Mail ---")
+    async def mail_pick_recipient(self) -> Optional[Tuple[str, str]]:
+        """Ask for a recipient ID or prefix until one user is chosen
 
-        # Select recipient
-        users = await self.mail_service.get_all_users_for_mail()
+        Returns:
+            (user_id, handle_name), or None if cancelled
+        """
+        limit = max(self.page_size - 4, 5)
 
-        if not users:
-            await self.send_line("\r\nNo users available.")
-            return
+        while True:
+            await self.send("\r\nRecipient ID or prefix (Q to cancel): ")
+            prefix = (await self.receive_line()).strip()
+            if not prefix or prefix.upper() == 'Q':
+                return None
+
+            # One extra to tell whether the list was cut off
+            matches = await self.user_service.find_recipients(prefix, limit + 1)
+            if not matches:
+                await self.send_line("\r\nNo matching users.")
+                continue
 
-        await self.send_line("\r\nAvailable users:")
-        for idx, (user_id, handle_name) in enumerate(users, 1):
-            await self.send_line(f"{idx}. {user_id} ({handle_name})")
+            if len(matches) == 1 or matches[0][0].lower() == prefix.lower():
+                user_id, handle_name = matches[0]
+                await self.send_line(f"\r\nTo: {user_id} ({handle_name})")
+                return matches[0]
 
-        await self.send("")
-        await self.send("Select recipient number (or Q to cancel): ")
+            await self.send_line("")
+            for idx, (user_id, handle_name) in enumerate(matches[:limit], 1):
+                await self.send_line(f"{idx}. {user_id} ({handle_name})")
+            if len(matches) > limit:
+                await self.send_line("... more users match; type a longer prefix to narrow down.")
+
+            await self.send("Select number (Enter to search again): ")
+            selection = (await self.receive_line()).strip()
+            if selection.isdigit() and 1 <= int(selection) <= min(len(matches), limit):
+                return matches[int(selection) - 1]
+            if selection:
+                await self.send_line("\r\nInvalid user number.")
 
-        selection = await self.receive_line()
-        if not selection or selection.upper() == 'Q':
-            return
+    async def mail_send(self):
+        """Send a new mail"""
+        await self.send_line("\r\n--- Send Mail ---")
 
-        try:
-            user_num = int(selection)
-            if 1 <= user_num <= len(users):
-                recipient_id, recipient_handle = users[user_num - 1]
-            else:
-                await self.send_line("\r\nInvalid user number.")
-                return
-        except ValueError:
-            await self.send_line("\r\nInvalid input.")
+        # Select recipient
+        recipient = await self.mail_pick_recipient()
+        if not recipient:
             return
+        recipient_id, recipient_handle = recipient
 
         # Subject
         await self.send("Subject: ")
@@ -1059,64 +1083,52 @@ class TelnetHandler:
 
     async def mail_sent_box(self):
         """View sent mail"""
-        mails = await self.mail_service.get_sent_mail(self.user_id)
+        def format_row(idx: int, mail: MailSummary) -> str:
+            subject = mail.subject[:33] + ".." if len(mail.subject) > 35 else mail.subject
+            return f"{idx:<4} {mail.recipient_id:<15} {subject:<35} {mail.date_str:<15}"
+
+        summary = await self.mail_pick(
+            "Sent Mail",
+            f"{'#':<4} {'To':<15} {'Subject':<35} {'Date':<15}",
+            format_row,
+            partial(self.mail_service.get_sent_page, self.user_id),
+            "\r\nNo sent mail.",
+        )
+        if not summary:
+            return
 
-        if not mails:
-            await self.send_line("\r\nNo sent mail.")
+        mail = await self.mail_service.get_mail_by_id(summary.mail_id, self.user_id)
+        if not mail:
+            await self.send_line("\r\nMail not found.")
             return
 
-        # Display mail list
+        # Display mail
         await self.send_line("\r\n" + "=" * 70)
-        await self.send_line("Sent Mail")
+        await self.send_line(f"To: {mail.recipient_id}")
+        await self.send_line(f"Date: {mail.sent_at.strftime('%Y-%m-%d %H:%M:%S')}")
+        await self.send_line(f"Subject: {mail.subject}")
+        await self.send_line(f"Status: {'Read' if mail.is_read else 'Unread'}")
+        await self.send_line("=" * 70)
+        await self.send_line(mail.body)
         await self.send_line("=" * 70)
-        await self.send_line(f"{'#':<4} {'To':<15} {'Subject':<35} {'Date':<15}")
-        await self.send_line("-" * 70)
-
-        for idx, mail in enumerate(mails, 1):
-            subject = mail.subject[:33] + ".." if len(mail.subject) > 35 else mail.subject
-            date_str = mail.sent_at.strftime("%Y-%m-%d %H:%M")
-            await self.send_line(
-                f"{idx:<4} {mail.recipient_id:<15} {subject:<35} {date_str:<15}"
-            )
 
-        # Select mail to view
+        # Actions
         await self.send_line("")
-        await self.send("View mail number (or Q to quit): ")
+        await self.send_line("D) Delete  Q) Back")
+        await self.send("Action: ")
 
-        selection = await self.receive_line()
-        if not selection or selection.upper() == 'Q':
-            return
+        action = await self.receive_line()
+        if action and action.upper() == 'D':
+            confirm = await self.confirm_action("Delete this mail?")
+            if confirm:
+                await self.mail_service.delete_mail(mail.mail_id, self.user_id)
+                await self.send_line("\r\nMail deleted.")
 
-        try:
-            mail_num = int(selection)
-            if 1 <= mail_num <= len(mails):
-                mail = mails[mail_num - 1]
-
-                # Display mail
-                await self.send_line("\r\n" + "=" * 70)
-                await self.send_line(f"To: {mail.recipient_id}")
-                await self.send_line(f"Date: {mail.sent_at.strftime('%Y-%m-%d %H:%M:%S')}")
-                await self.send_line(f"Subject: {mail.subject}")
-                await self.send_line(f"Status: {'Read' if mail.is_read else 'Unread'}")
-                await self.send_line("=" * 70)
-                await self.send_line(mail.body)
-                await self.send_line("=" * 70)
-
-                # Actions
-                await self.send_line("")
-                await self.send_line("D) Delete  Q) Back")
-                await self.send("Action: ")
-
-                action = await self.receive_line()
-                if action and action.upper() == 'D':
-                    confirm = await self.confirm_action("Delete this mail?")
-                    if confirm:
-                        await self.mail_service.delete_mail(mail.mail_id, self.user_id)
-                        await self.send_line("\r\nMail deleted.")
-            else:
-                await self.send_line("\r\nInvalid mail number.")
-        except ValueError:
-            await self.send_line("\r\nInvalid input.")
+    async def more_prompt(self) -> bool:
+        """Pause a long listing; returns False if the user chose to stop"""
+        await self.send("-- More -- (Enter to continue, Q to stop): ")
+        choice = await self.receive_line(allow_empty=True)
+        return not (choice and choice.upper() == 'Q')
 
     async def confirm_action(self, message: str) -> bool:
         """Ask for confirmation"""
@@ -1223,7 +1235,7 @@ class TelnetHandler:
 
         # Create user
         try:
-            user = await self.user_service.create_user(
+            await self.user_service.create_user(
                 user_id=user_id,
                 password=password,
                 handle_name=handle_name,
@@ -1319,7 +1331,7 @@ class TelnetHandler:
 
         # Update password
         try:
-            hashed = self.user_service.hash_password(new_password)
+            hashed = await self.user_service.hash_password(new_password)
             await self.user_service.update_user(self.user_id, password_hash=hashed)
             await self.send_line("\r\nPassword changed successfully.")
             logger.info(f"Password changed for user: {self.user_id}")
@@ -1469,8 +1481,7 @@ class TelnetHandler:
 
     async def show_help(self):
         """Show help"""
-        msg = await self.message_service.get_message_content("HELP_MESSAGE")
-        await self.send(msg)
+        await self.send_system_message("HELP_MESSAGE")
 
     async def show_users(self):
         """Show user list"""
@@ -1501,8 +1512,8 @@ class TelnetHandler:
         await self.send_line("-" * 70)
 
         for conn in connections:
-            handle = conn.get('handle', 'Unknown')
-            user_id = conn.get('user_id', 'guest')
+            handle = conn.get('handle') or 'Unknown'
+            user_id = conn.get('user_id') or 'guest'
             connected_at = conn.get('connected_at', '')
 
             # Format connected time
@@ -1708,7 +1719,7 @@ class TelnetHandler:
             return
 
         await self.send_line(f"\r\nEditing: {board.name}")
-        await self.send_line(f"Current settings:")
+        await self.send_line("Current settings:")
         await self.send_line(f"  Read Level: {board.read_level}")
         await self.send_line(f"  Write Level: {board.write_level}")
         await self.send_line(f"  Enforced News: {'Yes' if board.is_enforced_news else 'No'}")
@@ -1791,9 +1802,13 @@ class TelnetHandler:
                 health = await self.server.get_health_status()
                 db_healthy = health.get('database', {}).get('healthy', False)
                 disk_free = health.get('disk_space', {}).get('free_gb', 'N/A')
-                await self.send_line(f"\r\nSystem Health:")
+                loop_lag = health.get('event_loop', {}).get('lag_ms', {})
+                await self.send_line("\r\nSystem Health:")
                 await self.send_line(f"  Database: {'OK' if db_healthy else 'WARNING'}")
                 await self.send_line(f"  Disk Free: {disk_free} GB")
+                await self.send_line(
+                    f"  Event Loop Lag: p99 {loop_lag.get('p99', 'N/A')} ms, max {loop_lag.get('max', 'N/A')} ms"
+                )
             except:
                 pass
 
@@ -1817,8 +1832,8 @@ class TelnetHandler:
 
         await self.send_line("\r\nOnline users:")
         for idx, conn in enumerate(connections, 1):
-            handle = conn.get('handle', 'Unknown')
-            user_id = conn.get('user_id', 'guest')
+            handle = conn.get('handle') or 'Unknown'
+            user_id = conn.get('user_id') or 'guest'
             await self.send_line(f"{idx}. {handle} ({user_id})")
 
         await self.send("\r\nSelect user number to kick (or Q to cancel): ")
@@ -1841,11 +1856,8 @@ class TelnetHandler:
 
                 confirm = await self.confirm_action(f"Kick user {target_conn.get('handle')}?")
                 if confirm:
-                    # Find and disconnect the handler
-                    if target_client_id in self.server.handlers:
-                        handler = self.server.handlers[target_client_id]
-                        await handler.send_line("\r\n\r\nYou have been disconnected by SYSOP.")
-                        await handler.disconnect()
+                    # Disconnect the session (on whichever process holds it)
+                    if await self.server.kick(target_client_id, by=self.user_id):
                         await self.send_line(f"\r\nUser kicked: {target_conn.get('handle')}")
                         logger.warning(f"SYSOP {self.user_id} kicked user {target_user_id}")
                     else:
@@ -1857,23 +1869,21 @@ class TelnetHandler:
 
     async def system_info(self):
         """Show system information"""
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "SYSINFO_MESSAGE",
             version=MTBBS_VERSION
         )
-        await self.send(msg)
 
     async def version(self):
         """Show version"""
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "HOST_VERSION",
             version=MTBBS_VERSION
         )
-        await self.send(msg)
 
     async def status(self):
         """Show user status"""
-        await self.send_line(f"\r\n=== Status ===")
+        await self.send_line("\r\n=== Status ===")
         await self.send_line(f"User ID: {self.user_id}")
         await self.send_line(f"Handle: {self.handle_name}")
         await self.send_line(f"Level: {self.user_level}")
@@ -1886,17 +1896,17 @@ class TelnetHandler:
             return
 
         # Show chat room opening message
-        msg = await self.message_service.get_message_content("CHAT_ROOM_OPENING")
-        await self.send(msg)
+        await self.send_system_message("CHAT_ROOM_OPENING")
 
-        # Join chat room
-        self.server.join_chat(self.client_id, self)
+        # Join the lobby
+        room = self.server.join_chat(self.client_id, self)
+        await self.chat_show_room(room)
 
         # Announce join to other users
         join_msg = f"\r\n>>> {self.handle_name} さんが入室しました\r\n"
-        await self.server.broadcast_chat(join_msg, exclude_client_id=self.client_id)
+        await self.server.broadcast_chat(join_msg, exclude_client_id=self.client_id, room=room.number)
 
-        await self.send_line("メッセージを入力してください。終了は // または ^^ です。")
+        await self.send_line("メッセージを入力してください。終了は // または ^^ 、コマンド一覧は /? です。")
         await self.send_line("")
 
         try:
@@ -1907,41 +1917,136 @@ class TelnetHandler:
                 # Receive message
                 msg_text = await self.receive_line()
 
-                # Check exit commands
-                if msg_text in ["//", "^^"]:
+                # Check exit commands (or dropped for not keeping up)
+                if msg_text in ["//", "^^"] or not self.server.in_chat(self.client_id):
                     break
 
                 # Empty message
                 if not msg_text:
                     continue
 
-                # Broadcast message to all users in chat (excluding self)
+                if msg_text.startswith("/"):
+                    await self.chat_command(msg_text)
+                    continue
+
+                # Broadcast message to everyone in the room (excluding self)
+                room = self.server.chat.room_of(self.client_id)
                 chat_msg = f"\r\n{self.handle_name}> {msg_text}\r\n"
-                await self.server.broadcast_chat(chat_msg, exclude_client_id=self.client_id)
+                await self.server.broadcast_chat(chat_msg, exclude_client_id=self.client_id, room=room.number)
 
         except Exception as e:
             logger.error(f"Chat error: {e}")
         finally:
             # Leave chat room
+            room = self.server.chat.room_of(self.client_id)
             self.server.leave_chat(self.client_id)
 
             # Announce leave to other users
-            leave_msg = f"\r\n<<< {self.handle_name} さんが退室しました\r\n"
-            await self.server.broadcast_chat(leave_msg)
+            if room:
+                leave_msg = f"\r\n<<< {self.handle_name} さんが退室しました\r\n"
+                await self.server.broadcast_chat(leave_msg, room=room.number)
 
             await self.send_line("\r\nチャットルームを退出しました。")
 
+    async def chat_show_room(self, room):
+        """Room banner plus its recent lines for a member who just joined"""
+        await self.send_line(f"[{room.number}] {room.name} に入室しました")
+        history = room.replay()
+        if history:
+            await self.output.write(history)
+
+    async def chat_command(self, line: str):
+        """In-chat commands: /j channel, /l rooms, /w whisper, /t telegram, /who, /?"""
+        hub = self.server.chat
+        command, _, arg = line[1:].partition(" ")
+        command = command.lower()
+        arg = arg.strip()
+
+        if command in ("j", "join"):
+            if not arg.isdigit() or hub.get_room(int(arg)) is None:
+                await self.send_line(f"チャンネルは 1-{len(hub.rooms)} です。")
+                return
+            old_room = hub.room_of(self.client_id)
+            if old_room.number == int(arg):
+                return
+            await self.server.broadcast_chat(
+                f"\r\n<<< {self.handle_name} さんがチャンネル{arg}へ移動しました\r\n",
+                exclude_client_id=self.client_id, room=old_room.number,
+            )
+            room = self.server.join_chat(self.client_id, self, int(arg))
+            await self.chat_show_room(room)
+            await self.server.broadcast_chat(
+                f"\r\n>>> {self.handle_name} さんが入室しました\r\n",
+                exclude_client_id=self.client_id, room=room.number,
+            )
+
+        elif command in ("l", "list"):
+            current = hub.room_of(self.client_id)
+            await self.send_line("")
+            for info in self.server.list_chat_rooms():
+                mark = "*" if info["number"] == current.number else " "
+                await self.send_line(f"{mark}{info['number']:>3} {info['members']:>3}人  {info['name']}")
+
+        elif command == "who":
+            room = hub.room_of(self.client_id)
+            await self.send_line(f"\r\n[{room.number}] {room.name}:")
+            for member in self.server.chat_room_members(room.number):
+                await self.send_line(f"  {member['user_id']} ({member['handle']})")
+
+        elif command in ("w", "whisper"):
+            target, _, text = arg.partition(" ")
+            if not target or not text.strip():
+                await self.send_line("使い方: /w ユーザID メッセージ")
+                return
+            recipient = await self.server.whisper_chat(
+                self.client_id, target,
+                f"\r\n({self.handle_name} からのささやき) {text.strip()}\r\n",
+            )
+            if recipient:
+                await self.send_line(f"({recipient['handle']} へささやきました)")
+            else:
+                await self.send_line(f"{target} さんはチャットにいません。")
+
+        elif command in ("t", "telegram"):
+            target, _, text = arg.partition(" ")
+            if not target or not text.strip():
+                await self.send_line("使い方: /t ユーザID メッセージ")
+                return
+            recipient = await self.server.send_telegram(self.handle_name, target, text.strip())
+            if recipient:
+                await self.send_line(f"({recipient['handle']} へ電報を送りました)")
+            else:
+                await self.send_line(f"{target} さんはログインしていません。")
+
+        else:
+            await self.send_line("/j 番号  チャンネル移動    /l  チャンネル一覧")
+            await self.send_line("/w ID 文 ささやき          /who 在室者")
+            await self.send_line("/t ID 文 電報")
+            await self.send_line("//, ^^   終了")
+
     async def logout(self):
         """Logout"""
-        msg = await self.message_service.get_message_content(
+        await self.send_system_message(
             "LOGOUT_MESSAGE",
             handle=self.handle_name
         )
-        await self.send(msg)
+        await self.flush_read_positions()
         await self.user_service.record_logout(self.user_id)
 
+    async def flush_read_positions(self):
+        """Persist read positions recorded during the current command"""
+        try:
+            await self.read_tracker.flush()
+        except Exception as e:
+            logger.error(f"Failed to save read positions for {self.user_id}: {e}")
+
     async def disconnect(self):
         """Disconnect client"""
+        await self.flush_read_positions()
+        try:
+            await self.output.flush()
+        except Exception:
+            pass
         try:
             self.writer.close()
             await self.writer.wait_closed()
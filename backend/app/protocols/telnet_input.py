@@ -0,0 +1,140 @@
+"""
+Telnet Input - Chunked line reader with incremental IAC filtering
+"""
+import asyncio
+import logging
+from typing import Callable, Optional
+
+from app.protocols.telnet_protocol import TelnetParser, DataEvent, TelnetEvent
+
+logger = logging.getLogger(__name__)
+
+# Echo sequences
+_ECHO_NEWLINE = b"\r\n"
+_ECHO_BACKSPACE = b"\x08 \x08"
+
+
+class TelnetLineReader:
+    """Reads whole input lines from a Telnet stream
+
+    Data is pulled from the StreamReader in large chunks and fed to a
+    TelnetParser whose state survives across chunk boundaries. Data events
+    are line-edited in memory; command and subnegotiation events are passed
+    to ``on_event``. Echo for a whole chunk is written with a single
+    write + drain.
+    """
+
+    def __init__(
+        self,
+        reader: asyncio.StreamReader,
+        writer: asyncio.StreamWriter,
+        chunk_size: int = 4096,
+        on_event: Optional[Callable[[TelnetEvent], None]] = None,
+    ):
+        self.reader = reader
+        self.writer = writer
+        self.chunk_size = chunk_size
+        self.on_event = on_event
+        self.parser = TelnetParser()
+
+        # Filtered (IAC-free) bytes not yet consumed by read_line
+        self._pending = bytearray()
+        # Previous line ended with CR, so a following LF belongs to it
+        self._after_cr = False
+
+        # Statistics
+        self.bytes_received = 0
+        self.chunks_received = 0
+
+    def _dispatch(self, chunk: bytes) -> None:
+        """Route parsed events: data to the pending buffer, the rest to on_event"""
+        for event in self.parser.feed(chunk):
+            if type(event) is DataEvent:
+                self._pending += event.data
+            elif self.on_event is not None:
+                try:
+                    self.on_event(event)
+                except Exception as e:
+                    logger.warning(f"Telnet event handler error: {e}")
+
+    async def _fill(self) -> None:
+        """Read the next chunk from the stream"""
+        data = await self.reader.read(self.chunk_size)
+        if not data:
+            raise ConnectionError("Connection closed")
+        self.bytes_received += len(data)
+        self.chunks_received += 1
+        self._dispatch(data)
+
+    async def _flush_echo(self, echo_buf: bytearray) -> None:
+        """Write batched echo bytes"""
+        if echo_buf:
+            self.writer.write(bytes(echo_buf))
+            echo_buf.clear()
+            await self.writer.drain()
+
+    async def read_line(self, echo: bool = True, allow_empty: bool = False) -> bytes:
+        """Read one line (without terminator) as raw CP932 bytes
+
+        Empty lines are skipped unless ``allow_empty`` is set; the LF of a
+        CR+LF pair never counts as a line of its own. Backspace/DEL removes
+        the last character, treating it as two bytes when the byte before it
+        is a Shift-JIS lead byte.
+        """
+        raw_bytes = bytearray()
+        echo_buf = bytearray()
+
+        while True:
+            if not self._pending:
+                await self._flush_echo(echo_buf)
+                await self._fill()
+                continue
+
+            pending = self._pending
+            pos = 0
+            end = len(pending)
+            line_done = False
+
+            while pos < end:
+                byte_val = pending[pos]
+                pos += 1
+
+                if byte_val == 0x0A and self._after_cr:
+                    self._after_cr = False
+                    continue
+                self._after_cr = False
+
+                if byte_val == 0x0D or byte_val == 0x0A:  # CR or LF
+                    if raw_bytes or allow_empty:
+                        if echo:
+                            echo_buf += _ECHO_NEWLINE
+                        self._after_cr = byte_val == 0x0D
+                        line_done = True
+                        break
+                    continue  # Skip empty lines (just CR/LF)
+
+                if byte_val == 0x08 or byte_val == 0x7F:  # Backspace or DEL
+                    if raw_bytes:
+                        # Remove last character (may be 1 or 2 bytes for CP932)
+                        if len(raw_bytes) >= 2 and raw_bytes[-2] >= 0x81:
+                            del raw_bytes[-2:]
+                        else:
+                            del raw_bytes[-1:]
+                        if echo:
+                            echo_buf += _ECHO_BACKSPACE
+                    continue
+
+                # Skip NULL bytes (0x00) which some telnet clients send
+                if byte_val == 0x00:
+                    continue
+
+                raw_bytes.append(byte_val)
+                if echo:
+                    echo_buf.append(byte_val)
+
+            # Keep unconsumed bytes (type-ahead) for the next call
+            del pending[:pos]
+
+            if line_done:
+                await self._flush_echo(echo_buf)
+                return bytes(raw_bytes)
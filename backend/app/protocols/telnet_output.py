@@ -0,0 +1,91 @@
+"""
+Telnet Output - Coalesced, CP932-encoded session output
+"""
+import asyncio
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=512)
+def encode_text(text: str) -> bytes:
+    """Convert line endings to CR+LF and encode as CP932
+
+    Cached because most output (menus, separators, prompts) repeats verbatim.
+    """
+    if "\n" in text:
+        text = text.replace("\r\n", "\n").replace("\n", "\r\n")
+    return text.encode("cp932", errors="replace")
+
+
+class TelnetOutputBuffer:
+    """Collects session output and writes it to the transport in batches
+
+    ``write()`` only appends to an in-memory buffer; the buffer is handed to
+    the transport on ``flush()`` (called before every input prompt) or once
+    it grows past ``flush_threshold``. ``drain()`` is awaited per flush, so a
+    session only blocks when the transport's high-water mark is exceeded.
+    """
+
+    def __init__(
+        self,
+        writer: asyncio.StreamWriter,
+        flush_threshold: int = 8192,
+        high_water: int = 65536,
+        low_water: int = 16384,
+    ):
+        self.writer = writer
+        self.flush_threshold = flush_threshold
+        self._buffer = bytearray()
+
+        try:
+            writer.transport.set_write_buffer_limits(high=high_water, low=low_water)
+        except Exception as e:
+            logger.debug(f"Could not set write buffer limits: {e}")
+
+        # Totals for the whole session
+        self.bytes_written = 0
+        self.flushes = 0
+        # Counters since the last reset_command_stats()
+        self.command_bytes = 0
+        self.command_flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._buffer)
+
+    async def write(self, data: bytes) -> None:
+        """Queue bytes, flushing if the threshold is reached"""
+        self._buffer += data
+        if len(self._buffer) >= self.flush_threshold:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write buffered bytes to the transport and apply backpressure"""
+        if not self._buffer:
+            return
+        size = len(self._buffer)
+        self.writer.write(bytes(self._buffer))
+        self._buffer.clear()
+
+        self.bytes_written += size
+        self.flushes += 1
+        self.command_bytes += size
+        self.command_flushes += 1
+
+        await self.writer.drain()
+
+    def reset_command_stats(self) -> dict:
+        """Return and reset the per-command counters"""
+        stats = {"bytes": self.command_bytes, "flushes": self.command_flushes}
+        self.command_bytes = 0
+        self.command_flushes = 0
+        return stats
+
+    def get_stats(self) -> dict:
+        """Session totals"""
+        return {
+            "bytes_written": self.bytes_written,
+            "flushes": self.flushes,
+            "buffered": len(self._buffer),
+        }
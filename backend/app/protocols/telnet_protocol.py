@@ -0,0 +1,204 @@
+"""
+Telnet Protocol - Incremental IAC/SB parser (RFC 854) with typed events
+"""
+from typing import List, Optional, Union
+
+# Telnet command bytes
+IAC = 0xFF
+DONT = 0xFE
+DO = 0xFD
+WONT = 0xFC
+WILL = 0xFB
+SB = 0xFA
+SE = 0xF0
+
+# Telnet options
+OPT_BINARY = 0
+OPT_ECHO = 1
+OPT_SGA = 3
+OPT_TTYPE = 24
+OPT_NAWS = 31
+
+# TTYPE subnegotiation codes (RFC 1091)
+TTYPE_IS = 0
+TTYPE_SEND = 1
+
+NEGOTIATION_COMMANDS = (WILL, WONT, DO, DONT)
+
+# Parser states
+_STATE_DATA = 0
+_STATE_IAC = 1
+_STATE_OPTION = 2
+_STATE_SB = 3
+_STATE_SB_OPTION = 4
+_STATE_SB_IAC = 5
+
+# Upper bound for buffered subnegotiation payload (guards against a missing SE)
+MAX_SB_LENGTH = 1024
+
+_IAC_BYTE = b"\xff"
+
+
+class DataEvent:
+    """Application data. ``data`` is a memoryview slice of the fed chunk."""
+    __slots__ = ("data",)
+
+    def __init__(self, data: memoryview):
+        self.data = data
+
+    def __repr__(self):
+        return f"<DataEvent {bytes(self.data)!r}>"
+
+
+class CommandEvent:
+    """Telnet command. ``option`` is set for WILL/WONT/DO/DONT."""
+    __slots__ = ("command", "option")
+
+    def __init__(self, command: int, option: Optional[int] = None):
+        self.command = command
+        self.option = option
+
+    def __repr__(self):
+        return f"<CommandEvent cmd={self.command} opt={self.option}>"
+
+
+class SubnegotiationEvent:
+    """Completed IAC SB <option> ... IAC SE block (IAC IAC unescaped)"""
+    __slots__ = ("option", "data")
+
+    def __init__(self, option: int, data: bytes):
+        self.option = option
+        self.data = data
+
+    def __repr__(self):
+        return f"<SubnegotiationEvent opt={self.option} data={self.data!r}>"
+
+
+TelnetEvent = Union[DataEvent, CommandEvent, SubnegotiationEvent]
+
+
+class TelnetParser:
+    """Incremental Telnet stream parser
+
+    ``feed()`` may be called with arbitrary chunk boundaries; partial command
+    and subnegotiation sequences are carried over to the next call. Runs of
+    plain data are located with ``bytes.find`` and returned as memoryview
+    slices, so data bytes are neither copied nor inspected one by one.
+    """
+
+    def __init__(self):
+        self._state = _STATE_DATA
+        self._command = 0
+        self._sb_option = 0
+        self._sb_data = bytearray()
+
+    def feed(self, chunk: bytes) -> List[TelnetEvent]:
+        """Parse a chunk and return the events it completes"""
+        events: List[TelnetEvent] = []
+        view = memoryview(chunk)
+        length = len(chunk)
+        pos = 0
+
+        while pos < length:
+            state = self._state
+
+            if state == _STATE_DATA:
+                idx = chunk.find(_IAC_BYTE, pos)
+                if idx < 0:
+                    events.append(DataEvent(view[pos:]))
+                    break
+                if idx > pos:
+                    events.append(DataEvent(view[pos:idx]))
+                self._state = _STATE_IAC
+                pos = idx + 1
+                continue
+
+            byte_val = chunk[pos]
+
+            if state == _STATE_IAC:
+                if byte_val == IAC:
+                    # Escaped 0xFF data byte
+                    events.append(DataEvent(view[pos:pos + 1]))
+                    self._state = _STATE_DATA
+                elif byte_val in NEGOTIATION_COMMANDS:
+                    self._command = byte_val
+                    self._state = _STATE_OPTION
+                elif byte_val == SB:
+                    self._state = _STATE_SB_OPTION
+                else:
+                    events.append(CommandEvent(byte_val))
+                    self._state = _STATE_DATA
+
+            elif state == _STATE_OPTION:
+                events.append(CommandEvent(self._command, byte_val))
+                self._state = _STATE_DATA
+
+            elif state == _STATE_SB_OPTION:
+                self._sb_option = byte_val
+                self._sb_data.clear()
+                self._state = _STATE_SB
+
+            elif state == _STATE_SB:
+                idx = chunk.find(_IAC_BYTE, pos)
+                end = length if idx < 0 else idx
+                if len(self._sb_data) < MAX_SB_LENGTH:
+                    self._sb_data += view[pos:end]
+                if idx < 0:
+                    break
+                self._state = _STATE_SB_IAC
+                pos = idx + 1
+                continue
+
+            elif state == _STATE_SB_IAC:
+                if byte_val == SE:
+                    events.append(
+                        SubnegotiationEvent(self._sb_option, bytes(self._sb_data[:MAX_SB_LENGTH]))
+                    )
+                    self._sb_data.clear()
+                    self._state = _STATE_DATA
+                else:
+                    if byte_val == IAC and len(self._sb_data) < MAX_SB_LENGTH:
+                        self._sb_data.append(IAC)
+                    self._state = _STATE_SB
+
+            pos += 1
+
+        return events
+
+
+def command(cmd: int, option: int) -> bytes:
+    """Build an IAC <cmd> <option> sequence"""
+    return bytes([IAC, cmd, option])
+
+
+def subnegotiation(option: int, payload: bytes) -> bytes:
+    """Build an IAC SB <option> <payload> IAC SE sequence (IAC doubled)"""
+    return bytes([IAC, SB, option]) + payload.replace(_IAC_BYTE, b"\xff\xff") + bytes([IAC, SE])
+
+
+def parse_naws(data: bytes) -> Optional[tuple]:
+    """Parse NAWS payload into (width, height), None if malformed"""
+    if len(data) != 4:
+        return None
+    width = (data[0] << 8) | data[1]
+    height = (data[2] << 8) | data[3]
+    return width, height
+
+
+def parse_ttype(data: bytes) -> Optional[str]:
+    """Parse TTYPE IS payload into the terminal name, None if not an IS reply"""
+    if not data or data[0] != TTYPE_IS:
+        return None
+    return data[1:].decode("ascii", errors="replace").strip()
+
+
+# Options offered to every client on connect
+INITIAL_NEGOTIATION = b"".join([
+    command(WILL, OPT_BINARY),   # Shift-JIS data is 8-bit
+    command(DO, OPT_NAWS),       # Request window size
+    command(WILL, OPT_ECHO),     # Server handles echo
+    command(WILL, OPT_SGA),      # Suppress go-ahead
+    command(DO, OPT_TTYPE),      # Request terminal type
+])
+
+TTYPE_SEND_REQUEST = subnegotiation(OPT_TTYPE, bytes([TTYPE_SEND]))
@@ -3,9 +3,12 @@ Telnet Server Implementation
 """
 import asyncio
 import logging
-from typing import Dict, Optional
+from typing import Dict, List, Optional
 from datetime import datetime
 from app.protocols.telnet_handler import TelnetHandler
+from app.protocols.chat_hub import ChatRoom, LOBBY, get_chat_hub
+from app.protocols.presence import PresenceRegistry
+from app.core.bus import close_bus, get_bus
 from app.core.config import settings
 from app.utils.monitor import (
     initialize_monitor,
@@ -20,14 +23,20 @@ logger = logging.getLogger(__name__)
 class TelnetServer:
     """Async Telnet Server for BBS"""
 
-    def __init__(self, host: str = "0.0.0.0", port: int = 23):
+    def __init__(self, host: str = "0.0.0.0", port: int = 23,
+                 max_connections: Optional[int] = None, reuse_port: bool = False):
         self.host = host
         self.port = port
+        self.reuse_port = reuse_port  # share the port with other worker processes
         self.server: Optional[asyncio.Server] = None
         self.handlers: Dict[str, TelnetHandler] = {}
         self.connection_count = 0
-        self.max_connections = settings.TELNET_MAX_CONNECTIONS
-        self.chat_users: Dict[str, TelnetHandler] = {}  # Users in chat room
+        self.max_connections = max_connections or settings.TELNET_MAX_CONNECTIONS
+        self.draining = False
+        self.chat = get_chat_hub()  # Chat rooms and members (this process)
+        self.chat.on_drop = self._on_chat_drop
+        self.bus = get_bus()  # Chat, presence, kicks and telegrams between processes
+        self.presence = PresenceRegistry(expire_after=settings.PRESENCE_HEARTBEAT_INTERVAL * 3)
         self.monitor_tasks: list[asyncio.Task] = []  # Background monitoring tasks
 
         # Initialize monitor
@@ -53,6 +62,10 @@ class TelnetServer:
         addr = writer.get_extra_info("peername")
         client_id = f"{addr[0]}:{addr[1]}"
 
+        if self.draining:
+            await self._send_and_close(writer, "Server is shutting down. Please try again later.\r\n")
+            return
+
         # Check max connections
         if len(self.handlers) >= self.max_connections:
             logger.warning(f"Max connections reached, rejecting {client_id}")
@@ -64,6 +77,7 @@ class TelnetServer:
 
         handler = TelnetHandler(reader, writer, client_id, server=self)
         self.handlers[client_id] = handler
+        self._announce("join", handler)
 
         # Register session with monitor
         try:
@@ -86,6 +100,7 @@ class TelnetServer:
 
             if client_id in self.handlers:
                 del self.handlers[client_id]
+            self.bus.publish_nowait("presence", {"op": "leave", "client_id": client_id})
 
             try:
                 writer.close()
@@ -109,12 +124,14 @@ class TelnetServer:
         """Start Telnet server"""
         try:
             self.server = await asyncio.start_server(
-                self.handle_client, self.host, self.port
+                self.handle_client, self.host, self.port, reuse_port=self.reuse_port
             )
 
             addr = self.server.sockets[0].getsockname()
             logger.info(f"Telnet server started on {addr[0]}:{addr[1]}")
 
+            await self._start_bus()
+
             # Start monitoring background tasks
             try:
                 health_check_task = asyncio.create_task(
@@ -139,6 +156,12 @@ class TelnetServer:
         if self.server:
             logger.info("Stopping Telnet server...")
 
+            # Tell other processes our sessions are gone
+            try:
+                await self.bus.publish("presence", {"op": "down"})
+            except Exception as e:
+                logger.warning(f"Failed to publish presence shutdown: {e}")
+
             # Cancel monitoring tasks
             for task in self.monitor_tasks:
                 task.cancel()
@@ -156,56 +179,230 @@ class TelnetServer:
 
             self.server.close()
             await self.server.wait_closed()
+            await close_bus()
             logger.info("Telnet server stopped")
 
+    async def drain(self, timeout: float):
+        """Stop accepting, let sessions finish for up to timeout seconds, then stop
+
+        Sessions are told the server is going down; whoever is still connected
+        when the timeout runs out is disconnected by stop().
+        """
+        if not self.server:
+            return
+        self.draining = True
+        self.server.close()  # stops accepting; open sessions keep running
+        logger.info(f"Draining {len(self.handlers)} telnet session(s) (up to {timeout}s)")
+
+        for handler in list(self.handlers.values()):
+            try:
+                await handler.send(
+                    f"\r\n\a*** まもなくサーバーを停止します。{int(timeout)}秒以内にログアウトしてください ***\r\n"
+                )
+                await handler.flush()
+            except Exception as e:
+                logger.debug(f"Drain notice to {handler.client_id}: {e}")
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while self.handlers and loop.time() < deadline:
+            await asyncio.sleep(0.5)
+
+        if self.handlers:
+            logger.warning(f"Drain timed out; disconnecting {len(self.handlers)} session(s)")
+        await self.stop()
+
+    # -- Message bus --
+
+    async def _start_bus(self):
+        """Connect to the bus, subscribe and start presence heartbeats"""
+        self.bus.subscribe("chat", self._on_chat)
+        self.bus.subscribe("chat.whisper", self._on_whisper)
+        self.bus.subscribe("presence", self._on_presence)
+        self.bus.subscribe("kick", self._on_kick)
+        self.bus.subscribe("telegram", self._on_telegram)
+        await self.bus.start()
+
+        # Ask the other processes for their sessions
+        await self.bus.publish("presence", {"op": "hello"})
+        self.monitor_tasks.append(asyncio.create_task(self._presence_heartbeat()))
+        logger.info(f"Message bus started: {self.bus.backend} (node {self.bus.node_id})")
+
+    def _session_info(self, handler: TelnetHandler) -> dict:
+        participant = self.chat.participants.get(handler.client_id)
+        return {
+            "client_id": handler.client_id,
+            "user_id": handler.user_id,
+            "handle": handler.handle_name,
+            "connected_at": handler.connected_at.isoformat() if handler.connected_at else None,
+            "room": participant.room if participant else None,
+        }
+
+    def _announce(self, op: str, handler: TelnetHandler):
+        self.bus.publish_nowait("presence", {
+            "op": op, "client_id": handler.client_id, "session": self._session_info(handler),
+        })
+
+    def _snapshot(self) -> dict:
+        return {"op": "snapshot", "sessions": [self._session_info(h) for h in self.handlers.values()]}
+
+    async def _presence_heartbeat(self):
+        while True:
+            await asyncio.sleep(settings.PRESENCE_HEARTBEAT_INTERVAL)
+            try:
+                await self.bus.publish("presence", self._snapshot())
+                for node in self.presence.expire():
+                    logger.warning(f"Presence: node {node} stopped responding")
+            except Exception as e:
+                logger.warning(f"Presence heartbeat failed: {e}")
+
+    def _on_presence(self, data: dict, origin: str):
+        if data.get("op") == "hello":
+            if origin != self.bus.node_id:
+                self.bus.publish_nowait("presence", self._snapshot())
+            return
+        self.presence.apply(data, origin)
+
+    def _on_chat(self, data: dict, origin: str):
+        self.chat.broadcast(data["text"], room=data["room"], exclude_client_id=data.get("exclude"))
+
+    def _on_whisper(self, data: dict, origin: str):
+        self.chat.deliver(data["client_id"], data["text"])
+
+    async def _on_kick(self, data: dict, origin: str):
+        handler = self.handlers.get(data["client_id"])
+        if handler:
+            logger.warning(f"Kicking {data['client_id']} (requested by {data.get('by')})")
+            try:
+                await handler.send_line("\r\n\r\nYou have been disconnected by SYSOP.")
+                await handler.disconnect()
+            except Exception as e:
+                logger.debug(f"Kick of {data['client_id']}: {e}")
+
+    async def _on_telegram(self, data: dict, origin: str):
+        handler = self.handlers.get(data["client_id"])
+        if handler:
+            try:
+                await handler.send(f"\r\n\a*** 電報 from {data['from']}: {data['text']}\r\n")
+                await handler.flush()
+            except Exception as e:
+                logger.debug(f"Telegram to {data['client_id']}: {e}")
+
     def get_active_connections(self) -> int:
         """Get number of active connections"""
         return len(self.handlers)
 
     def get_connection_info(self) -> list:
-        """Get information about active connections"""
-        return [
+        """Get information about active connections (all processes)"""
+        local = [
             {
                 "client_id": client_id,
                 "user_id": handler.user_id,
                 "handle": handler.handle_name,
                 "connected_at": handler.connected_at.isoformat() if handler.connected_at else None,
+                "node": self.bus.node_id,
+                **handler.output.get_stats(),
             }
             for client_id, handler in self.handlers.items()
         ]
+        remote = [s for s in self.presence.sessions() if s.get("node") != self.bus.node_id]
+        return local + remote
+
+    async def kick(self, client_id: str, by: Optional[str] = None) -> bool:
+        """Disconnect a session on any process; False if it isn't online"""
+        if client_id not in self.handlers and not self.presence.get(client_id):
+            return False
+        await self.bus.publish("kick", {"client_id": client_id, "by": by})
+        return True
+
+    async def send_telegram(self, from_handle: str, target: str, text: str) -> Optional[dict]:
+        """Send a telegram to an online user (any process)
+
+        Returns:
+            The recipient's session, or None if they aren't online
+        """
+        session = self.presence.find_user(target)
+        if not session:
+            return None
+        await self.bus.publish("telegram", {
+            "client_id": session["client_id"], "from": from_handle, "text": text,
+        })
+        return session
+
+    async def broadcast_chat(self, message: str, exclude_client_id: Optional[str] = None,
+                             room: int = LOBBY):
+        """Broadcast chat message to all users in a chat room
+
+        Only queues the message; each member's writer task delivers it.
+        """
+        await self.bus.publish("chat", {
+            "room": room, "text": message, "exclude": exclude_client_id,
+        })
+
+    def join_chat(self, client_id: str, handler: TelnetHandler, room: int = LOBBY) -> ChatRoom:
+        """Add user to a chat room (or move them to another one)"""
+        chat_room = self.chat.join(client_id, handler, room)
+        self._announce("update", handler)
+        logger.info(f"User {handler.handle_name} joined chat room {room}")
+        return chat_room
+
+    def _on_chat_drop(self, participant):
+        """A slow consumer was dropped from chat; update its presence everywhere"""
+        handler = self.handlers.get(participant.client_id)
+        if handler:
+            self._announce("update", handler)
 
-    async def broadcast_chat(self, message: str, exclude_client_id: Optional[str] = None):
-        """Broadcast chat message to all users in chat room"""
-        for client_id, handler in list(self.chat_users.items()):
-            if exclude_client_id and client_id == exclude_client_id:
-                continue
-            try:
-                await handler.send(message)
-            except Exception as e:
-                logger.error(f"Error broadcasting to {client_id}: {e}")
+    def leave_chat(self, client_id: str):
+        """Remove user from chat"""
+        participant = self.chat.leave(client_id)
+        if participant:
+            if client_id in self.handlers:
+                self._announce("update", self.handlers[client_id])
+            logger.info(f"User {participant.handle_name} left chat room {participant.room}")
+
+    async def whisper_chat(self, from_client_id: str, target: str, text: str) -> Optional[dict]:
+        """Whisper to a chat member on any process
+
+        Returns:
+            The recipient's session, or None if they aren't in chat
+        """
+        session = self.presence.find_user(target, in_chat=True)
+        if not session or session["client_id"] == from_client_id:
+            return None
+        if session.get("node") == self.bus.node_id and not self.chat.is_member(session["client_id"]):
+            return None  # left or dropped here; the presence update is still on its way
+        await self.bus.publish("chat.whisper", {"client_id": session["client_id"], "text": text})
+        return session
+
+    def list_chat_rooms(self) -> List[dict]:
+        """Every channel with its member count across all processes"""
+        counts: Dict[int, int] = {}
+        for session in self.presence.chat_members():
+            counts[session["room"]] = counts.get(session["room"], 0) + 1
+        return [
+            {"number": room.number, "name": room.name, "members": counts.get(room.number, 0)}
+            for room in self.chat.rooms.values()
+        ]
 
-    def join_chat(self, client_id: str, handler: TelnetHandler):
-        """Add user to chat room"""
-        self.chat_users[client_id] = handler
-        logger.info(f"User {handler.handle_name} joined chat room")
+    def chat_room_members(self, room: int) -> List[dict]:
+        """Members of one channel across all processes"""
+        return self.presence.chat_members(room)
 
-    def leave_chat(self, client_id: str):
-        """Remove user from chat room"""
-        if client_id in self.chat_users:
-            handler = self.chat_users[client_id]
-            del self.chat_users[client_id]
-            logger.info(f"User {handler.handle_name} left chat room")
+    def in_chat(self, client_id: str) -> bool:
+        """False once a member has left or was dropped as a slow consumer"""
+        return self.chat.is_member(client_id)
 
     def get_chat_users(self) -> list:
-        """Get list of users in chat room"""
+        """Get list of users in chat (all processes)"""
         return [
-            {
-                "user_id": handler.user_id,
-                "handle": handler.handle_name,
-            }
-            for handler in self.chat_users.values()
+            {"user_id": s.get("user_id"), "handle": s.get("handle"), "room": s["room"]}
+            for s in self.presence.chat_members()
         ]
 
+    def get_chat_stats(self) -> dict:
+        """Chat queue settings and per-room delivery latency"""
+        return self.chat.get_stats()
+
     async def get_health_status(self) -> dict:
         """Get system health status"""
         try:
@@ -225,3 +422,6 @@ class TelnetServer:
             monitor.update_session_state(client_id, user_id=user_id, state="logged_in")
         except Exception as e:
             logger.warning(f"Failed to update session login state: {e}")
+
+        if client_id in self.handlers:
+            self._announce("update", self.handlers[client_id])
@@ -1,14 +1,260 @@
 """
 Board Service - Business logic for message boards
 """
-from typing import List, Optional
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, List, Optional
 from datetime import datetime
-from sqlalchemy import select, func, and_, or_
+from sqlalchemy import select, update, func, and_, or_, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.board import Board, Message, UserReadPosition
-from app.core.database import async_session
+from app.models.board import (
+    Board, Message, UserReadPosition, messages_fts, MESSAGE_SEARCH_MIN_TERM,
+)
+from app.core.config import settings
+from app.core.database import async_session, engine
+from app.services.cache_sync import notify_board
+
+logger = logging.getLogger(__name__)
+
+
+class BoardInfo:
+    """Cached board metadata used to resolve public board_id to internal id"""
+    __slots__ = (
+        "id", "board_id", "name", "read_level", "write_level",
+        "enforced_news", "is_active", "message_count", "last_message_no",
+    )
+
+    def __init__(self, board: Board):
+        self.update_from(board)
+
+    def update_from(self, board: Board) -> None:
+        """Copy metadata and counter columns from a Board row"""
+        self.id = board.id
+        self.board_id = board.board_id
+        self.name = board.name
+        self.read_level = board.read_level
+        self.write_level = board.write_level
+        self.enforced_news = bool(board.enforced_news)
+        self.is_active = bool(board.is_active)
+        self.message_count = board.message_count or 0
+        self.last_message_no = board.last_message_no or 0
+
+    def __repr__(self):
+        return f"<BoardInfo {self.board_id}: id={self.id} messages={self.message_count}>"
+
+
+class BoardRegistry:
+    """Process-wide registry of boards keyed by public board_id
+
+    Loaded with one query (message counters are columns on boards), then
+    kept in sync by BoardService writes; writes in other processes arrive
+    through refresh() (cache_sync). Unknown board_ids fall back to a
+    single-row lookup so boards created by another process are picked up.
+    """
+
+    def __init__(self, ttl: int = 0):
+        self.ttl = ttl
+        self._boards: Dict[int, BoardInfo] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def is_valid(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        if self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl:
+            return False
+        return True
+
+    def invalidate(self) -> None:
+        """Drop cached boards; the next lookup reloads them"""
+        self._loaded_at = None
+
+    async def load(self) -> int:
+        """(Re)load all boards and their message counters"""
+        async with async_session() as session:
+            boards = (await session.execute(select(Board))).scalars().all()
+
+        self._boards = {board.board_id: BoardInfo(board) for board in boards}
+        self._loaded_at = time.monotonic()
+        return len(self._boards)
+
+    async def _ensure_loaded(self) -> None:
+        if not self.is_valid:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                if not self.is_valid:
+                    count = await self.load()
+                    logger.debug(f"Board registry loaded: {count} board(s)")
+
+    async def get(self, board_id: int) -> Optional[BoardInfo]:
+        """Get board metadata (active or not) by public board_id"""
+        await self._ensure_loaded()
+        info = self._boards.get(board_id)
+        if info is None:
+            info = await self._load_one(board_id)
+        return info
+
+    async def get_all(self) -> List[BoardInfo]:
+        """All known boards ordered by board_id"""
+        await self._ensure_loaded()
+        return [self._boards[k] for k in sorted(self._boards)]
+
+    async def _load_one(self, board_id: int) -> Optional[BoardInfo]:
+        async with async_session() as session:
+            board = (await session.execute(
+                select(Board).where(Board.board_id == board_id)
+            )).scalar_one_or_none()
+        if not board:
+            return None
+        info = BoardInfo(board)
+        self._boards[board_id] = info
+        return info
+
+    async def refresh(self, board_id: int) -> None:
+        """Re-read one board and its counters after another process changed it"""
+        if not self.is_valid:
+            return  # the next lookup reloads everything
+        async with async_session() as session:
+            board = (await session.execute(
+                select(Board).where(Board.board_id == board_id)
+            )).scalar_one_or_none()
+        if board is None:
+            self._boards.pop(board_id, None)
+        else:
+            self.put(board)
+
+    def put(self, board: Board) -> None:
+        """Insert or refresh a board after a write, keeping its counters"""
+        info = self._boards.get(board.board_id)
+        if info is None:
+            self._boards[board.board_id] = BoardInfo(board)
+        else:
+            info.update_from(board)
+
+    def message_added(self, board_id: int, message_no: int) -> None:
+        info = self._boards.get(board_id)
+        if info is not None:
+            info.message_count += 1
+            info.last_message_no = max(info.last_message_no, message_no)
+
+    def message_removed(self, board_id: int) -> None:
+        info = self._boards.get(board_id)
+        if info is not None and info.message_count > 0:
+            info.message_count -= 1
+
+    def message_restored(self, board_id: int) -> None:
+        info = self._boards.get(board_id)
+        if info is not None:
+            info.message_count += 1
+
+
+class ReadPositionTracker:
+    """Per-session read position high-water marks
+
+    Displayed messages are recorded in memory with mark() and written in one
+    UPSERT by flush(): at the end of each command, at logout and disconnect,
+    and from mark() once flush_interval seconds have passed since the last
+    write.
+    """
+
+    def __init__(self, board_service: "BoardService", user_id: Optional[str] = None,
+                 flush_interval: int = 30):
+        self.board_service = board_service
+        self.user_id = user_id
+        self.flush_interval = flush_interval
+        self._pending: Dict[int, int] = {}
+        self._last_flush = time.monotonic()
+
+    @property
+    def pending(self) -> int:
+        return len(self._pending)
+
+    async def mark(self, board_id: int, message_no: int) -> None:
+        """Record that message_no on board_id has been read"""
+        if message_no > self._pending.get(board_id, 0):
+            self._pending[board_id] = message_no
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def flush(self) -> None:
+        """Write pending positions; they are kept for retry if the write fails"""
+        self._last_flush = time.monotonic()
+        if not self._pending or not self.user_id:
+            return
+        positions = self._pending
+        self._pending = {}
+        try:
+            await self.board_service.update_read_positions(self.user_id, positions)
+        except Exception:
+            # Merge back so a later flush can retry
+            for board_id, message_no in positions.items():
+                if message_no > self._pending.get(board_id, 0):
+                    self._pending[board_id] = message_no
+            raise
+
+
+# グローバルボードレジストリ
+_board_registry = BoardRegistry(ttl=settings.BOARD_REGISTRY_TTL)
+
+
+def get_board_registry() -> BoardRegistry:
+    """Get the global board registry"""
+    return _board_registry
+
+
+# When the messages_fts table was last found missing (database not migrated);
+# searches use LIKE until SEARCH_INDEX_RETRY seconds later, then try it again
+SEARCH_INDEX_RETRY = 60
+_search_index_missing_at: Optional[float] = None
+
+
+def _search_index_usable() -> bool:
+    return (
+        _search_index_missing_at is None
+        or time.monotonic() - _search_index_missing_at >= SEARCH_INDEX_RETRY
+    )
+
+
+def _search_index_missing() -> None:
+    global _search_index_missing_at
+    if _search_index_missing_at is None:
+        logger.warning(
+            "Search index missing, falling back to LIKE search. "
+            "Run scripts/rebuild_search_index.py to create it."
+        )
+    _search_index_missing_at = time.monotonic()
+
+
+async def check_search_index() -> bool:
+    """Check at startup that messages_fts exists; logs how to create it if not
+
+    Tables created by init_db get the index, but databases created before it
+    was added need scripts/rebuild_search_index.py.
+    """
+    global _search_index_missing_at
+    if engine.dialect.name != "sqlite":
+        return False
+    async with async_session() as session:
+        found = await session.scalar(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'messages_fts'")
+        )
+    if found:
+        _search_index_missing_at = None
+        return True
+    _search_index_missing()
+    return False
+
+
+def _fts_query(terms: List[str]) -> str:
+    """Build an FTS5 MATCH expression: each term as a quoted phrase, ANDed"""
+    return " AND ".join('"' + term.replace('"', '""') + '"' for term in terms)
 
 
 class BoardService:
@@ -38,6 +284,8 @@ class BoardService:
             session.add(board)
             await session.commit()
             await session.refresh(board)
+            _board_registry.put(board)
+            notify_board(board_id)
             return board
 
     async def get_board(self, board_id: int) -> Optional[Board]:
@@ -93,6 +341,8 @@ class BoardService:
                 board.updated_at = datetime.now()
                 await session.commit()
                 await session.refresh(board)
+                _board_registry.put(board)
+                notify_board(board_id)
 
             return board
 
@@ -111,24 +361,27 @@ class BoardService:
         parent_id: Optional[int] = None,
     ) -> Message:
         """Create new message"""
-        async with async_session() as session:
-            # Get board
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
-
-            if not board:
-                raise ValueError(f"Board {board_id} not found")
+        board = await _board_registry.get(board_id)
+        if not board:
+            raise ValueError(f"Board {board_id} not found")
 
-            # Get next message number
-            max_no_result = await session.execute(
-                select(func.max(Message.message_no)).where(Message.board_id == board.id)
+        async with async_session() as session:
+            # Allocate the next number from the board's sequence counter. The
+            # UPDATE takes the write lock first, so concurrent posts serialize
+            # here instead of both reading the same max(message_no).
+            result = await session.execute(
+                update(Board)
+                .where(Board.id == board.id)
+                .values(
+                    message_count=Board.message_count + 1,
+                    last_message_no=Board.last_message_no + 1,
+                )
+                .returning(Board.last_message_no)
             )
-            max_no = max_no_result.scalar() or 0
+            message_no = result.scalar_one()
 
             message = Message(
-                message_no=max_no + 1,
+                message_no=message_no,
                 board_id=board.id,
                 user_id=user_id,
                 handle_name=handle_name,
@@ -141,17 +394,21 @@ class BoardService:
             await session.commit()
             await session.refresh(message)
 
-            return message
+        _board_registry.message_added(board_id, message.message_no)
+        notify_board(board_id)
+        return message
 
     async def get_message(self, board_id: int, message_no: int) -> Optional[Message]:
         """Get message by board_id and message_no"""
+        board = await _board_registry.get(board_id)
+        if not board:
+            return None
+
         async with async_session() as session:
             result = await session.execute(
-                select(Message)
-                .join(Board)
-                .where(
+                select(Message).where(
                     and_(
-                        Board.board_id == board_id,
+                        Message.board_id == board.id,
                         Message.message_no == message_no
                     )
                 )
@@ -162,15 +419,11 @@ class BoardService:
         self, board_id: int, limit: int = 20, skip: int = 0
     ) -> List[Message]:
         """Get recent messages from board (excludes deleted)"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
-
-            if not board:
-                return []
+        board = await _board_registry.get(board_id)
+        if not board:
+            return []
 
+        async with async_session() as session:
             result = await session.execute(
                 select(Message)
                 .where(
@@ -187,15 +440,11 @@ class BoardService:
 
     async def get_all_messages(self, board_id: int) -> List[Message]:
         """Get all messages from board (excludes deleted)"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
-
-            if not board:
-                return []
+        board = await _board_registry.get(board_id)
+        if not board:
+            return []
 
+        async with async_session() as session:
             result = await session.execute(
                 select(Message)
                 .where(
@@ -208,19 +457,94 @@ class BoardService:
             )
             return list(result.scalars().all())
 
+    # Columns fetched for list views (no body)
+    HEADER_COLUMNS = (
+        Message.id, Message.message_no, Message.user_id, Message.handle_name,
+        Message.title, Message.created_at,
+    )
+
+    async def iter_messages(
+        self,
+        board_id: int,
+        after_message_no: int = 0,
+        batch_size: Optional[int] = None,
+        headers_only: bool = False,
+    ) -> AsyncIterator:
+        """Stream non-deleted messages in message_no order
+
+        Messages are fetched in batches with keyset pagination
+        (message_no > last seen), each batch in its own short session, so no
+        read transaction stays open while the caller waits on the user.
+
+        Args:
+            board_id: Public board ID
+            after_message_no: Start after this message number
+            batch_size: Rows per query (default MESSAGE_BATCH_SIZE)
+            headers_only: Yield rows with header columns only (no body)
+
+        Yields:
+            Message objects, or header rows when headers_only is set
+        """
+        board = await _board_registry.get(board_id)
+        if not board:
+            return
+
+        batch_size = batch_size or settings.MESSAGE_BATCH_SIZE
+        columns = self.HEADER_COLUMNS if headers_only else (Message,)
+        last_no = after_message_no
+
+        while True:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(*columns)
+                    .where(
+                        and_(
+                            Message.board_id == board.id,
+                            Message.message_no > last_no,
+                            Message.deleted == False
+                        )
+                    )
+                    .order_by(Message.message_no)
+                    .limit(batch_size)
+                )
+                batch = result.all() if headers_only else result.scalars().all()
+
+            for item in batch:
+                yield item
+
+            if len(batch) < batch_size:
+                return
+            last_no = batch[-1].message_no
+
+    async def iter_unread_messages(
+        self,
+        board_id: int,
+        user_id: str,
+        batch_size: Optional[int] = None,
+        headers_only: bool = False,
+    ) -> AsyncIterator:
+        """Stream messages after the user's stored read position"""
+        last_read = await self.get_read_position(user_id, board_id)
+        async for item in self.iter_messages(
+            board_id, after_message_no=last_read,
+            batch_size=batch_size, headers_only=headers_only,
+        ):
+            yield item
+
+    async def get_message_count(self, board_id: int) -> int:
+        """Number of non-deleted messages on a board (boards.message_count via the registry)"""
+        board = await _board_registry.get(board_id)
+        return board.message_count if board else 0
+
     async def get_unread_messages(self, board_id: int, user_id: str) -> List[Message]:
         """Get unread messages from board for user"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
-
-            if not board:
-                return []
+        board = await _board_registry.get(board_id)
+        if not board:
+            return []
 
+        async with async_session() as session:
             # Get user's last read position
-            last_read = await self.get_read_position(user_id, board_id)
+            last_read = await self._read_position(session, user_id, board.id)
 
             # Get messages after last read position (excluding deleted)
             result = await session.execute(
@@ -238,13 +562,15 @@ class BoardService:
 
     async def delete_message(self, board_id: int, message_no: int, deleted_by: str) -> bool:
         """Soft delete message"""
+        board = await _board_registry.get(board_id)
+        if not board:
+            return False
+
         async with async_session() as session:
             result = await session.execute(
-                select(Message)
-                .join(Board)
-                .where(
+                select(Message).where(
                     and_(
-                        Board.board_id == board_id,
+                        Message.board_id == board.id,
                         Message.message_no == message_no
                     )
                 )
@@ -252,27 +578,33 @@ class BoardService:
             message = result.scalar_one_or_none()
 
             if message:
+                was_deleted = message.deleted
                 message.deleted = True
                 message.deleted_at = datetime.now()
                 message.deleted_by = deleted_by
+                if not was_deleted:
+                    await session.execute(
+                        update(Board)
+                        .where(Board.id == board.id)
+                        .values(message_count=Board.message_count - 1)
+                    )
                 await session.commit()
+                if not was_deleted:
+                    _board_registry.message_removed(board_id)
+                    notify_board(board_id)
                 return True
 
             return False
 
     async def get_new_message_count(self, board_id: int, user_id: str) -> int:
         """Get count of new messages since user's last read"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
-
-            if not board:
-                return 0
+        board = await _board_registry.get(board_id)
+        if not board:
+            return 0
 
+        async with async_session() as session:
             # Get user's last read position
-            last_read = await self.get_read_position(user_id, board_id)
+            last_read = await self._read_position(session, user_id, board.id)
 
             # Count messages after last read position (excluding deleted)
             result = await session.execute(
@@ -286,28 +618,105 @@ class BoardService:
             )
             return result.scalar() or 0
 
+    async def get_unread_summary(
+        self, user_id: str, user_level: int, enforced_only: bool = False
+    ) -> List[tuple]:
+        """Get unread counts for every readable board in one grouped query
+
+        Args:
+            user_id: User ID
+            user_level: User level (boards with a higher read_level are skipped)
+            enforced_only: Only include enforced news boards
+
+        Returns:
+            List of (board_id, name, unread_count) tuples for boards with
+            unread messages, ordered by board_id
+        """
+        conditions = [
+            Board.is_active == True,
+            Board.read_level <= user_level,
+            Message.deleted == False,
+            Message.message_no > func.coalesce(UserReadPosition.last_read_message_no, 0),
+        ]
+        if enforced_only:
+            conditions.append(Board.enforced_news == True)
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(Board.board_id, Board.name, func.count(Message.id))
+                .join(Message, Message.board_id == Board.id)
+                .outerjoin(
+                    UserReadPosition,
+                    and_(
+                        UserReadPosition.board_id == Board.id,
+                        UserReadPosition.user_id == user_id
+                    )
+                )
+                .where(and_(*conditions))
+                .group_by(Board.id)
+                .order_by(Board.board_id)
+            )
+            return [tuple(row) for row in result.all()]
+
     async def search_messages(
         self, board_id: int, keyword: str, limit: int = 50
     ) -> List[Message]:
-        """Search messages by keyword"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
+        """Search non-deleted messages by keyword
+
+        Whitespace-separated terms must all match (title or body). Uses the
+        messages_fts trigram index ranked by bm25 when every term is at least
+        three characters long; shorter terms fall back to a LIKE scan.
+        """
+        global _search_index_missing_at
 
-            if not board:
-                return []
+        board = await _board_registry.get(board_id)
+        if not board:
+            return []
+
+        terms = keyword.split()
+        if not terms:
+            return []
+
+        use_index = _search_index_usable() and all(
+            len(term) >= MESSAGE_SEARCH_MIN_TERM for term in terms
+        )
+
+        async with async_session() as session:
+            if use_index:
+                try:
+                    result = await session.execute(
+                        select(Message)
+                        .join(messages_fts, messages_fts.c.rowid == Message.id)
+                        .where(
+                            and_(
+                                Message.board_id == board.id,
+                                Message.deleted == False,
+                                text("messages_fts MATCH :query").bindparams(
+                                    query=_fts_query(terms)
+                                ),
+                            )
+                        )
+                        # Title hits weigh more than body hits
+                        .order_by(text("bm25(messages_fts, 10.0, 1.0)"), Message.created_at.desc())
+                        .limit(limit)
+                    )
+                    _search_index_missing_at = None
+                    return list(result.scalars().all())
+                except OperationalError as e:
+                    if "messages_fts" not in str(e):
+                        raise
+                    _search_index_missing()
 
             result = await session.execute(
                 select(Message)
                 .where(
                     and_(
                         Message.board_id == board.id,
-                        or_(
-                            Message.title.contains(keyword),
-                            Message.body.contains(keyword)
-                        )
+                        Message.deleted == False,
+                        *[
+                            or_(Message.title.contains(term), Message.body.contains(term))
+                            for term in terms
+                        ],
                     )
                 )
                 .order_by(Message.created_at.desc())
@@ -317,13 +726,15 @@ class BoardService:
 
     async def restore_message(self, board_id: int, message_no: int) -> bool:
         """Restore soft-deleted message"""
+        board = await _board_registry.get(board_id)
+        if not board:
+            return False
+
         async with async_session() as session:
             result = await session.execute(
-                select(Message)
-                .join(Board)
-                .where(
+                select(Message).where(
                     and_(
-                        Board.board_id == board_id,
+                        Message.board_id == board.id,
                         Message.message_no == message_no,
                         Message.deleted == True
                     )
@@ -335,7 +746,14 @@ class BoardService:
                 message.deleted = False
                 message.deleted_at = None
                 message.deleted_by = None
+                await session.execute(
+                    update(Board)
+                    .where(Board.id == board.id)
+                    .values(message_count=Board.message_count + 1)
+                )
                 await session.commit()
+                _board_registry.message_restored(board_id)
+                notify_board(board_id)
                 return True
 
             return False
@@ -347,43 +765,51 @@ class BoardService:
         message_no: int
     ) -> None:
         """Update user's read position on a board"""
-        async with async_session() as session:
-            # Get board internal ID
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
+        await self.update_read_positions(user_id, {board_id: message_no})
 
-            if not board:
-                return
+    async def update_read_positions(self, user_id: str, positions: Dict[int, int]) -> int:
+        """Advance several read positions in one UPSERT
 
-            # Check if position exists
-            result = await session.execute(
-                select(UserReadPosition).where(
-                    and_(
-                        UserReadPosition.user_id == user_id,
-                        UserReadPosition.board_id == board.id
-                    )
-                )
-            )
-            position = result.scalar_one_or_none()
-
-            if position:
-                # Update existing
-                if message_no > position.last_read_message_no:
-                    position.last_read_message_no = message_no
-                    position.last_read_at = datetime.now()
-            else:
-                # Create new
-                position = UserReadPosition(
-                    user_id=user_id,
-                    board_id=board.id,
-                    last_read_message_no=message_no,
-                    last_read_at=datetime.now()
-                )
-                session.add(position)
+        Positions only move forward: an existing row is updated only when
+        the new message number is greater than the stored one.
 
+        Args:
+            user_id: User ID
+            positions: {board_id: last read message_no}
+
+        Returns:
+            Number of boards included in the statement
+        """
+        now = datetime.now()
+        rows = []
+        for board_id, message_no in positions.items():
+            board = await _board_registry.get(board_id)
+            if board:
+                rows.append({
+                    "user_id": user_id,
+                    "board_id": board.id,
+                    "last_read_message_no": message_no,
+                    "last_read_at": now,
+                })
+
+        if not rows:
+            return 0
+
+        stmt = sqlite_insert(UserReadPosition).values(rows)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UserReadPosition.user_id, UserReadPosition.board_id],
+            set_={
+                "last_read_message_no": stmt.excluded.last_read_message_no,
+                "last_read_at": stmt.excluded.last_read_at,
+                "updated_at": now,
+            },
+            where=stmt.excluded.last_read_message_no > UserReadPosition.last_read_message_no,
+        )
+
+        async with async_session() as session:
+            await session.execute(stmt)
             await session.commit()
+        return len(rows)
 
     async def get_read_position(
         self,
@@ -391,26 +817,25 @@ class BoardService:
         board_id: int
     ) -> int:
         """Get user's last read message number"""
-        async with async_session() as session:
-            board_result = await session.execute(
-                select(Board).where(Board.board_id == board_id)
-            )
-            board = board_result.scalar_one_or_none()
+        board = await _board_registry.get(board_id)
+        if not board:
+            return 0
 
-            if not board:
-                return 0
-
-            result = await session.execute(
-                select(UserReadPosition).where(
-                    and_(
-                        UserReadPosition.user_id == user_id,
-                        UserReadPosition.board_id == board.id
-                    )
+        async with async_session() as session:
+            return await self._read_position(session, user_id, board.id)
+
+    @staticmethod
+    async def _read_position(session: AsyncSession, user_id: str, internal_board_id: int) -> int:
+        """Read position lookup by internal board id within an open session"""
+        result = await session.execute(
+            select(UserReadPosition.last_read_message_no).where(
+                and_(
+                    UserReadPosition.user_id == user_id,
+                    UserReadPosition.board_id == internal_board_id
                 )
             )
-            position = result.scalar_one_or_none()
-
-            return position.last_read_message_no if position else 0
+        )
+        return result.scalar_one_or_none() or 0
 
     async def get_enforced_news_boards(self) -> List[Board]:
         """Get all boards with enforced_news flag"""
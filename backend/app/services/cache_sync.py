@@ -0,0 +1,77 @@
+"""
+Cache Sync - Invalidate per-process caches across server processes
+
+The system message cache, board registry, user directory and login cache live
+in each process. A write updates the local copy itself, then calls one of the
+notify_*() functions, which publishes on the "cache.invalidate" bus channel.
+Every process runs start_cache_sync(), so the others drop or re-read the
+entry from the database:
+
+- {"user_id": ...}: login cache entries dropped, directory entry re-read
+- {"board_id": ...}: board row and message counters re-read
+- {"messages": true}: system message cache reloaded on next use
+
+When the bus cannot reach the other processes (MESSAGE_BUS=local with telnet
+outside the API), the caches expire after FALLBACK_TTL seconds instead.
+"""
+import logging
+
+from app.core.bus import get_bus
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "cache.invalidate"
+FALLBACK_TTL = 30  # seconds, when writes in other processes can't be heard
+
+
+def notify_user(user_id: str) -> None:
+    """A user was created, updated or deleted"""
+    get_bus().publish_nowait(CHANNEL, {"user_id": user_id})
+
+
+def notify_board(board_id: int) -> None:
+    """A board or its message counters changed"""
+    get_bus().publish_nowait(CHANNEL, {"board_id": board_id})
+
+
+def notify_messages() -> None:
+    """System messages were edited"""
+    get_bus().publish_nowait(CHANNEL, {"messages": True})
+
+
+async def _on_invalidate(data: dict, origin: str) -> None:
+    if origin == get_bus().node_id:
+        return  # the writer already updated its own caches
+
+    from app.services.board_service import get_board_registry
+    from app.services.message_service import get_message_cache
+    from app.services.user_service import get_auth_cache, get_user_directory
+
+    if "user_id" in data:
+        get_auth_cache().invalidate(data["user_id"])
+        await get_user_directory().refresh(data["user_id"])
+    if "board_id" in data:
+        await get_board_registry().refresh(data["board_id"])
+    if data.get("messages"):
+        get_message_cache().invalidate()
+
+
+async def start_cache_sync() -> None:
+    """Start the bus and subscribe this process to cache invalidations"""
+    from app.services.board_service import get_board_registry
+    from app.services.message_service import get_message_cache
+    from app.services.user_service import get_user_directory
+
+    bus = get_bus()
+    bus.subscribe(CHANNEL, _on_invalidate)
+    await bus.start()
+
+    if bus.backend == "local" and not settings.TELNET_EMBEDDED:
+        logger.warning(
+            f"MESSAGE_BUS=local but telnet runs in separate processes; caches are "
+            f"not shared and are reloaded every {FALLBACK_TTL}s instead"
+        )
+        for cache in (get_message_cache(), get_board_registry(), get_user_directory()):
+            if cache.ttl <= 0 or cache.ttl > FALLBACK_TTL:
+                cache.ttl = FALLBACK_TTL
@@ -0,0 +1,131 @@
+"""
+Access counter service
+"""
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects.sqlite import insert
+
+from app.core.config import settings
+from app.core.database import async_session
+from app.models.counter import Counter
+from app.models.user import User
+
+logger = logging.getLogger(__name__)
+
+ACCESS_COUNTER = "telnet_access"
+
+
+class AccessCounter:
+    """Persistent telnet access counter, counted in memory
+
+    increment() is a plain in-memory add, so the opening banner of an
+    unauthenticated connection never waits on the database. The accumulated
+    delta is added to the ``counters`` row by flush(), which runs every
+    flush_interval seconds and at shutdown. Adding a delta (rather than
+    writing the value) keeps the row correct when several processes count.
+    """
+
+    def __init__(self, name: str = ACCESS_COUNTER, flush_interval: int = 60):
+        self.name = name
+        self.flush_interval = flush_interval
+        self._base = 0  # value in the database at the last load/flush
+        self._pending = 0  # increments not written yet
+        self._loaded = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def value(self) -> int:
+        return self._base + self._pending
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def load(self) -> int:
+        """Read the counter, creating the row on first start"""
+        async with async_session() as session:
+            value = (await session.execute(
+                select(Counter.value).where(Counter.name == self.name)
+            )).scalar_one_or_none()
+
+            if value is None:
+                # Continue from the number the old banner showed (user count)
+                value = (await session.execute(
+                    select(func.count()).select_from(User)
+                )).scalar() or 0
+                await session.execute(
+                    insert(Counter)
+                    .values(name=self.name, value=value)
+                    .on_conflict_do_nothing(index_elements=[Counter.name])
+                )
+                await session.commit()
+
+        self._base = value
+        self._loaded = True
+        return self.value
+
+    def increment(self) -> int:
+        """Count one access and return the new value"""
+        self._pending += 1
+        return self.value
+
+    async def flush(self) -> None:
+        """Add pending increments to the database row"""
+        if not self._loaded or not self._pending:
+            return
+        delta = self._pending
+        self._pending = 0
+        try:
+            async with async_session() as session:
+                result = await session.execute(
+                    update(Counter)
+                    .where(Counter.name == self.name)
+                    .values(value=Counter.value + delta)
+                    .returning(Counter.value)
+                )
+                value = result.scalar_one_or_none()
+                await session.commit()
+        except Exception:
+            self._pending += delta  # retry on the next flush
+            raise
+
+        if value is not None:
+            # Picks up increments flushed by other processes too
+            self._base = value
+        else:
+            logger.warning(f"Counter row '{self.name}' is missing; {delta} access(es) not saved")
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            try:
+                await self.flush()
+            except Exception as e:
+                logger.error(f"Access counter flush failed: {e}")
+
+    def start(self) -> None:
+        """Start periodic flushing"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        """Stop periodic flushing and write what is left"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+
+
+_access_counter = AccessCounter(flush_interval=settings.ACCESS_COUNTER_FLUSH_INTERVAL)
+
+
+def get_access_counter() -> AccessCounter:
+    """Get the global access counter"""
+    return _access_counter
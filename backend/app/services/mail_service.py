@@ -1,21 +1,148 @@
 """
 Mail Service
 """
+import asyncio
 import sqlite3
 import logging
-from typing import List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 from datetime import datetime
 from app.models.mail import Mail, MailCreate
+from app.core.config import settings
 from app.core.database import get_connection
 
 logger = logging.getLogger(__name__)
 
+MAIL_COLUMNS = """
+    mail_id, sender_id, sender_handle, recipient_id,
+    subject, body, sent_at, read_at, is_read,
+    is_deleted_by_sender, is_deleted_by_recipient
+"""
+
+# Columns for list views (no body, timestamps left as ISO strings)
+SUMMARY_COLUMNS = "mail_id, sender_id, recipient_id, subject, sent_at, is_read"
+
+# Keyset position in a listing: (sent_at, mail_id)
+MailCursor = Tuple[str, int]
+
+
+class MailSummary(NamedTuple):
+    """One line of an inbox / sent mail listing
+
+    Built straight from the row tuple; open the mail with
+    MailService.get_mail_by_id to load the body.
+    """
+    mail_id: int
+    sender_id: str
+    recipient_id: str
+    subject: str
+    sent_at: str  # ISO 8601 as stored
+    is_read: int
+
+    @property
+    def date_str(self) -> str:
+        """sent_at as YYYY-MM-DD HH:MM without parsing the timestamp"""
+        return self.sent_at[:16].replace("T", " ")
+
+    @property
+    def cursor(self) -> MailCursor:
+        return (self.sent_at, self.mail_id)
+
+
+class MailDatabase:
+    """Runs mail queries off the event loop
+
+    Queries execute on a small dedicated thread pool. Each worker thread
+    keeps one open SQLite connection (with the configured pragmas), so a
+    slow query only occupies a worker while every telnet session keeps
+    running on the event loop.
+    """
+
+    def __init__(self, db_path: str, pool_size: int = 4):
+        self.db_path = db_path
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(1, pool_size), thread_name_prefix="mail-db"
+        )
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Connection owned by the current worker thread"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = get_connection(self.db_path, check_same_thread=False)
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    def _call(self, fn: Callable[..., Any], args: tuple) -> Any:
+        conn = self._connection()
+        try:
+            return fn(conn, *args)
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+
+    async def run(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(conn, *args) on a worker thread and await the result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._call, fn, args)
+
+    def close(self) -> None:
+        """Stop the workers and close their connections"""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+# Shared per database file (MailService is created per telnet session)
+_mail_databases: Dict[str, MailDatabase] = {}
+
+
+def get_mail_database(db_path: str) -> MailDatabase:
+    """Get (or create) the shared MailDatabase for a database file"""
+    database = _mail_databases.get(db_path)
+    if database is None:
+        database = MailDatabase(db_path, pool_size=settings.MAIL_DB_POOL_SIZE)
+        _mail_databases[db_path] = database
+    return database
+
+
+def close_mail_databases() -> None:
+    """Close all mail database pools (application shutdown)"""
+    for database in _mail_databases.values():
+        database.close()
+    _mail_databases.clear()
+
+
+def _row_to_mail(row: tuple) -> Mail:
+    return Mail(
+        mail_id=row[0],
+        sender_id=row[1],
+        sender_handle=row[2],
+        recipient_id=row[3],
+        subject=row[4],
+        body=row[5],
+        sent_at=datetime.fromisoformat(row[6]),
+        read_at=datetime.fromisoformat(row[7]) if row[7] else None,
+        is_read=bool(row[8]),
+        is_deleted_by_sender=bool(row[9]),
+        is_deleted_by_recipient=bool(row[10])
+    )
+
 
 class MailService:
     """Mail service for managing user mail"""
 
     def __init__(self, db_path: str):
         self.db_path = db_path
+        self.db = get_mail_database(db_path)
 
     async def send_mail(self, mail_data: MailCreate) -> int:
         """
@@ -30,50 +157,50 @@ class MailService:
         Raises:
             ValueError: If recipient doesn't exist
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            # Check if recipient exists
-            cursor.execute(
-                "SELECT user_id FROM users WHERE user_id = ?",
-                (mail_data.recipient_id,)
-            )
-            if not cursor.fetchone():
-                raise ValueError(f"Recipient '{mail_data.recipient_id}' not found")
+            mail_id = await self.db.run(self._send_mail, mail_data)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to send mail: {e}")
+            raise
 
-            # Insert mail
-            cursor.execute(
-                """
-                INSERT INTO mail (
-                    sender_id, sender_handle, recipient_id,
-                    subject, body, sent_at, is_read,
-                    is_deleted_by_sender, is_deleted_by_recipient
-                )
-                VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0)
-                """,
-                (
-                    mail_data.sender_id,
-                    mail_data.sender_handle,
-                    mail_data.recipient_id,
-                    mail_data.subject,
-                    mail_data.body,
-                    datetime.now().isoformat()
-                )
-            )
+        logger.info(f"Mail sent: {mail_data.sender_id} -> {mail_data.recipient_id}, mail_id={mail_id}")
+        return mail_id
 
-            mail_id = cursor.lastrowid
-            conn.commit()
+    @staticmethod
+    def _send_mail(conn: sqlite3.Connection, mail_data: MailCreate) -> int:
+        cursor = conn.cursor()
 
-            logger.info(f"Mail sent: {mail_data.sender_id} -> {mail_data.recipient_id}, mail_id={mail_id}")
-            return mail_id
+        # Check if recipient exists
+        cursor.execute(
+            "SELECT user_id FROM users WHERE user_id = ?",
+            (mail_data.recipient_id,)
+        )
+        if not cursor.fetchone():
+            raise ValueError(f"Recipient '{mail_data.recipient_id}' not found")
 
-        except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Failed to send mail: {e}")
-            raise
-        finally:
-            conn.close()
+        # Insert mail
+        cursor.execute(
+            """
+            INSERT INTO mail (
+                sender_id, sender_handle, recipient_id,
+                subject, body, sent_at, is_read,
+                is_deleted_by_sender, is_deleted_by_recipient
+            )
+            VALUES (?, ?, ?, ?, ?, ?, 0, 0, 0)
+            """,
+            (
+                mail_data.sender_id,
+                mail_data.sender_handle,
+                mail_data.recipient_id,
+                mail_data.subject,
+                mail_data.body,
+                datetime.now().isoformat()
+            )
+        )
+
+        mail_id = cursor.lastrowid
+        conn.commit()
+        return mail_id
 
     async def get_inbox(self, user_id: str, include_read: bool = True) -> List[Mail]:
         """
@@ -86,51 +213,20 @@ class MailService:
         Returns:
             List of mail messages
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
+        query = f"""
+            SELECT {MAIL_COLUMNS}
+            FROM mail
+            WHERE recipient_id = ? AND is_deleted_by_recipient = 0
+        """
+        if not include_read:
+            query += " AND is_read = 0"
+        query += " ORDER BY sent_at DESC"
 
         try:
-            query = """
-                SELECT mail_id, sender_id, sender_handle, recipient_id,
-                       subject, body, sent_at, read_at, is_read,
-                       is_deleted_by_sender, is_deleted_by_recipient
-                FROM mail
-                WHERE recipient_id = ? AND is_deleted_by_recipient = 0
-            """
-            params = [user_id]
-
-            if not include_read:
-                query += " AND is_read = 0"
-
-            query += " ORDER BY sent_at DESC"
-
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-
-            mails = []
-            for row in rows:
-                mail = Mail(
-                    mail_id=row[0],
-                    sender_id=row[1],
-                    sender_handle=row[2],
-                    recipient_id=row[3],
-                    subject=row[4],
-                    body=row[5],
-                    sent_at=datetime.fromisoformat(row[6]),
-                    read_at=datetime.fromisoformat(row[7]) if row[7] else None,
-                    is_read=bool(row[8]),
-                    is_deleted_by_sender=bool(row[9]),
-                    is_deleted_by_recipient=bool(row[10])
-                )
-                mails.append(mail)
-
-            return mails
-
+            return await self.db.run(self._fetch_mails, query, (user_id,))
         except sqlite3.Error as e:
             logger.error(f"Failed to get inbox for {user_id}: {e}")
             raise
-        finally:
-            conn.close()
 
     async def get_sent_mail(self, user_id: str) -> List[Mail]:
         """
@@ -142,47 +238,120 @@ class MailService:
         Returns:
             List of sent mail messages
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
+        query = f"""
+            SELECT {MAIL_COLUMNS}
+            FROM mail
+            WHERE sender_id = ? AND is_deleted_by_sender = 0
+            ORDER BY sent_at DESC
+        """
 
         try:
-            cursor.execute(
-                """
-                SELECT mail_id, sender_id, sender_handle, recipient_id,
-                       subject, body, sent_at, read_at, is_read,
-                       is_deleted_by_sender, is_deleted_by_recipient
-                FROM mail
-                WHERE sender_id = ? AND is_deleted_by_sender = 0
-                ORDER BY sent_at DESC
-                """,
-                (user_id,)
+            return await self.db.run(self._fetch_mails, query, (user_id,))
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get sent mail for {user_id}: {e}")
+            raise
+
+    async def get_inbox_page(
+        self,
+        user_id: str,
+        limit: int,
+        older_than: Optional[MailCursor] = None,
+        newer_than: Optional[MailCursor] = None,
+        include_read: bool = True,
+    ) -> List[MailSummary]:
+        """
+        Get one page of the inbox listing, newest first
+
+        Args:
+            user_id: User ID
+            limit: Page size
+            older_than: Cursor of the last row of the current page (next page)
+            newer_than: Cursor of the first row of the current page (previous page)
+            include_read: Include already read messages
+
+        Returns:
+            Up to ``limit`` mail summaries
+        """
+        where = "recipient_id = ? AND is_deleted_by_recipient = 0"
+        if not include_read:
+            where += " AND is_read = 0"
+
+        try:
+            return await self.db.run(
+                self._fetch_page, where, (user_id,), limit, older_than, newer_than
             )
-            rows = cursor.fetchall()
-
-            mails = []
-            for row in rows:
-                mail = Mail(
-                    mail_id=row[0],
-                    sender_id=row[1],
-                    sender_handle=row[2],
-                    recipient_id=row[3],
-                    subject=row[4],
-                    body=row[5],
-                    sent_at=datetime.fromisoformat(row[6]),
-                    read_at=datetime.fromisoformat(row[7]) if row[7] else None,
-                    is_read=bool(row[8]),
-                    is_deleted_by_sender=bool(row[9]),
-                    is_deleted_by_recipient=bool(row[10])
-                )
-                mails.append(mail)
-
-            return mails
+        except sqlite3.Error as e:
+            logger.error(f"Failed to get inbox for {user_id}: {e}")
+            raise
 
+    async def get_sent_page(
+        self,
+        user_id: str,
+        limit: int,
+        older_than: Optional[MailCursor] = None,
+        newer_than: Optional[MailCursor] = None,
+    ) -> List[MailSummary]:
+        """
+        Get one page of the sent mail listing, newest first
+
+        Args:
+            user_id: User ID
+            limit: Page size
+            older_than: Cursor of the last row of the current page (next page)
+            newer_than: Cursor of the first row of the current page (previous page)
+
+        Returns:
+            Up to ``limit`` mail summaries
+        """
+        where = "sender_id = ? AND is_deleted_by_sender = 0"
+
+        try:
+            return await self.db.run(
+                self._fetch_page, where, (user_id,), limit, older_than, newer_than
+            )
         except sqlite3.Error as e:
             logger.error(f"Failed to get sent mail for {user_id}: {e}")
             raise
-        finally:
-            conn.close()
+
+    @staticmethod
+    def _fetch_page(
+        conn: sqlite3.Connection,
+        where: str,
+        params: tuple,
+        limit: int,
+        older_than: Optional[MailCursor],
+        newer_than: Optional[MailCursor],
+    ) -> List[MailSummary]:
+        params = list(params)
+        if newer_than is not None:
+            # Walk forward in time from the cursor, then restore newest-first order
+            where += " AND (sent_at, mail_id) > (?, ?)"
+            params.extend(newer_than)
+            order = "ASC"
+        else:
+            if older_than is not None:
+                where += " AND (sent_at, mail_id) < (?, ?)"
+                params.extend(older_than)
+            order = "DESC"
+
+        rows = list(map(MailSummary._make, conn.execute(
+            f"""
+            SELECT {SUMMARY_COLUMNS}
+            FROM mail
+            WHERE {where}
+            ORDER BY sent_at {order}, mail_id {order}
+            LIMIT ?
+            """,
+            (*params, limit)
+        )))
+        if newer_than is not None:
+            rows.reverse()
+        return rows
+
+    @staticmethod
+    def _fetch_mails(conn: sqlite3.Connection, query: str, params: tuple) -> List[Mail]:
+        rows = conn.execute(query, params).fetchall()
+        return [_row_to_mail(row) for row in rows]
 
     async def get_mail_by_id(self, mail_id: int, user_id: str) -> Optional[Mail]:
         """
@@ -195,52 +364,33 @@ class MailService:
         Returns:
             Mail object or None if not found or not authorized
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                SELECT mail_id, sender_id, sender_handle, recipient_id,
-                       subject, body, sent_at, read_at, is_read,
-                       is_deleted_by_sender, is_deleted_by_recipient
-                FROM mail
-                WHERE mail_id = ? AND (sender_id = ? OR recipient_id = ?)
-                """,
-                (mail_id, user_id, user_id)
-            )
-            row = cursor.fetchone()
-
-            if not row:
-                return None
-
-            # Check if deleted
-            if row[3] == user_id and row[10]:  # recipient deleted
-                return None
-            if row[1] == user_id and row[9]:  # sender deleted
-                return None
-
-            mail = Mail(
-                mail_id=row[0],
-                sender_id=row[1],
-                sender_handle=row[2],
-                recipient_id=row[3],
-                subject=row[4],
-                body=row[5],
-                sent_at=datetime.fromisoformat(row[6]),
-                read_at=datetime.fromisoformat(row[7]) if row[7] else None,
-                is_read=bool(row[8]),
-                is_deleted_by_sender=bool(row[9]),
-                is_deleted_by_recipient=bool(row[10])
-            )
-
-            return mail
-
+            row = await self.db.run(self._fetch_mail_row, mail_id, user_id)
         except sqlite3.Error as e:
             logger.error(f"Failed to get mail {mail_id}: {e}")
             raise
-        finally:
-            conn.close()
+
+        if not row:
+            return None
+
+        # Check if deleted
+        if row[3] == user_id and row[10]:  # recipient deleted
+            return None
+        if row[1] == user_id and row[9]:  # sender deleted
+            return None
+
+        return _row_to_mail(row)
+
+    @staticmethod
+    def _fetch_mail_row(conn: sqlite3.Connection, mail_id: int, user_id: str) -> Optional[tuple]:
+        return conn.execute(
+            f"""
+            SELECT {MAIL_COLUMNS}
+            FROM mail
+            WHERE mail_id = ? AND (sender_id = ? OR recipient_id = ?)
+            """,
+            (mail_id, user_id, user_id)
+        ).fetchone()
 
     async def mark_as_read(self, mail_id: int, user_id: str) -> bool:
         """
@@ -253,33 +403,29 @@ class MailService:
         Returns:
             True if successful, False otherwise
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                UPDATE mail
-                SET is_read = 1, read_at = ?
-                WHERE mail_id = ? AND recipient_id = ? AND is_read = 0
-                """,
-                (datetime.now().isoformat(), mail_id, user_id)
-            )
-
-            success = cursor.rowcount > 0
-            conn.commit()
-
-            if success:
-                logger.info(f"Mail {mail_id} marked as read by {user_id}")
-
-            return success
-
+            success = await self.db.run(self._mark_as_read, mail_id, user_id)
         except sqlite3.Error as e:
-            conn.rollback()
             logger.error(f"Failed to mark mail {mail_id} as read: {e}")
             raise
-        finally:
-            conn.close()
+
+        if success:
+            logger.info(f"Mail {mail_id} marked as read by {user_id}")
+        return success
+
+    @staticmethod
+    def _mark_as_read(conn: sqlite3.Connection, mail_id: int, user_id: str) -> bool:
+        cursor = conn.execute(
+            """
+            UPDATE mail
+            SET is_read = 1, read_at = ?
+            WHERE mail_id = ? AND recipient_id = ? AND is_read = 0
+            """,
+            (datetime.now().isoformat(), mail_id, user_id)
+        )
+        success = cursor.rowcount > 0
+        conn.commit()
+        return success
 
     async def delete_mail(self, mail_id: int, user_id: str) -> bool:
         """
@@ -292,57 +438,56 @@ class MailService:
         Returns:
             True if successful, False otherwise
         """
-        conn = get_connection(self.db_path)
+        try:
+            return await self.db.run(self._delete_mail, mail_id, user_id)
+        except sqlite3.Error as e:
+            logger.error(f"Failed to delete mail {mail_id}: {e}")
+            raise
+
+    @staticmethod
+    def _delete_mail(conn: sqlite3.Connection, mail_id: int, user_id: str) -> bool:
         cursor = conn.cursor()
 
-        try:
-            # Check if user is sender or recipient
+        # Check if user is sender or recipient
+        cursor.execute(
+            """
+            SELECT sender_id, recipient_id, is_deleted_by_sender, is_deleted_by_recipient
+            FROM mail
+            WHERE mail_id = ?
+            """,
+            (mail_id,)
+        )
+        row = cursor.fetchone()
+
+        if not row:
+            return False
+
+        sender_id, recipient_id, deleted_by_sender, deleted_by_recipient = row
+
+        # Determine which flag to set
+        if user_id == sender_id:
             cursor.execute(
-                """
-                SELECT sender_id, recipient_id, is_deleted_by_sender, is_deleted_by_recipient
-                FROM mail
-                WHERE mail_id = ?
-                """,
+                "UPDATE mail SET is_deleted_by_sender = 1 WHERE mail_id = ?",
                 (mail_id,)
             )
-            row = cursor.fetchone()
-
-            if not row:
-                return False
-
-            sender_id, recipient_id, deleted_by_sender, deleted_by_recipient = row
-
-            # Determine which flag to set
-            if user_id == sender_id:
-                cursor.execute(
-                    "UPDATE mail SET is_deleted_by_sender = 1 WHERE mail_id = ?",
-                    (mail_id,)
-                )
-            elif user_id == recipient_id:
-                cursor.execute(
-                    "UPDATE mail SET is_deleted_by_recipient = 1 WHERE mail_id = ?",
-                    (mail_id,)
-                )
-            else:
-                return False
-
-            # If both deleted, physically delete
-            if (user_id == sender_id and deleted_by_recipient) or \
-               (user_id == recipient_id and deleted_by_sender):
-                cursor.execute("DELETE FROM mail WHERE mail_id = ?", (mail_id,))
-                logger.info(f"Mail {mail_id} physically deleted")
-            else:
-                logger.info(f"Mail {mail_id} soft deleted by {user_id}")
-
-            conn.commit()
-            return True
+        elif user_id == recipient_id:
+            cursor.execute(
+                "UPDATE mail SET is_deleted_by_recipient = 1 WHERE mail_id = ?",
+                (mail_id,)
+            )
+        else:
+            return False
 
-        except sqlite3.Error as e:
-            conn.rollback()
-            logger.error(f"Failed to delete mail {mail_id}: {e}")
-            raise
-        finally:
-            conn.close()
+        # If both deleted, physically delete
+        if (user_id == sender_id and deleted_by_recipient) or \
+           (user_id == recipient_id and deleted_by_sender):
+            cursor.execute("DELETE FROM mail WHERE mail_id = ?", (mail_id,))
+            logger.info(f"Mail {mail_id} physically deleted")
+        else:
+            logger.info(f"Mail {mail_id} soft deleted by {user_id}")
+
+        conn.commit()
+        return True
 
     async def get_unread_count(self, user_id: str) -> int:
         """
@@ -354,51 +499,19 @@ class MailService:
         Returns:
             Number of unread messages
         """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
-
         try:
-            cursor.execute(
-                """
-                SELECT COUNT(*)
-                FROM mail
-                WHERE recipient_id = ? AND is_read = 0 AND is_deleted_by_recipient = 0
-                """,
-                (user_id,)
-            )
-            count = cursor.fetchone()[0]
-            return count
-
+            return await self.db.run(self._unread_count, user_id)
         except sqlite3.Error as e:
             logger.error(f"Failed to get unread count for {user_id}: {e}")
             return 0
-        finally:
-            conn.close()
-
-    async def get_all_users_for_mail(self) -> List[tuple]:
-        """
-        Get list of all users (for recipient selection)
-
-        Returns:
-            List of (user_id, handle_name) tuples
-        """
-        conn = get_connection(self.db_path)
-        cursor = conn.cursor()
-
-        try:
-            cursor.execute(
-                """
-                SELECT user_id, handle_name
-                FROM users
-                WHERE user_id != 'guest'
-                ORDER BY user_id
-                """
-            )
-            users = cursor.fetchall()
-            return users
 
-        except sqlite3.Error as e:
-            logger.error(f"Failed to get user list: {e}")
-            return []
-        finally:
-            conn.close()
+    @staticmethod
+    def _unread_count(conn: sqlite3.Connection, user_id: str) -> int:
+        return conn.execute(
+            """
+            SELECT COUNT(*)
+            FROM mail
+            WHERE recipient_id = ? AND is_read = 0 AND is_deleted_by_recipient = 0
+            """,
+            (user_id,)
+        ).fetchone()[0]
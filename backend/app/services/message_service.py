@@ -2,10 +2,17 @@
 """
 Message Service - System Message Management
 """
-from typing import List, Optional
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional
 from sqlalchemy import select
 from app.models.system_message import SystemMessage
+from app.core.config import settings
 from app.core.database import async_session
+from app.services.cache_sync import notify_messages
+from app.utils.message_template import CompiledTemplate, TemplateError
+from app.protocols.telnet_output import encode_text
 from app.resources.messages_ja import (
     MAIN_MENU, FILE_MENU, READ_MENU, INSTALL_MENU, CHAT_MENU, SYSOP_MENU,
     OPENING_MESSAGE, LOGIN_MESSAGE, LOGOUT_MESSAGE, HELP_MESSAGE,
@@ -13,6 +20,98 @@ from app.resources.messages_ja import (
     MTBBS_VERSION
 )
 
+logger = logging.getLogger(__name__)
+
+
+class SystemMessageCache:
+    """Process-wide cache of system message rows keyed by message_key
+
+    The whole table (a few dozen rows) is loaded with one SELECT and served
+    from memory until invalidated by an edit or, if ttl > 0, until it expires.
+    Each row's content is compiled into a CompiledTemplate at load time.
+    """
+
+    def __init__(self, ttl: int = 0):
+        self.ttl = ttl
+        self._messages: Dict[str, SystemMessage] = {}
+        self._templates: Dict[str, CompiledTemplate] = {}
+        self._template_errors: Dict[str, str] = {}
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def is_valid(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        if self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl:
+            return False
+        return True
+
+    def invalidate(self) -> None:
+        """Drop cached rows; the next lookup reloads the table"""
+        self._loaded_at = None
+
+    async def load(self) -> int:
+        """(Re)load all system messages from the database"""
+        async with async_session() as session:
+            result = await session.execute(select(SystemMessage))
+            messages = {m.message_key: m for m in result.scalars().all()}
+
+        templates = {}
+        errors = {}
+        for key, message in messages.items():
+            try:
+                template = CompiledTemplate(message.content, message.variables)
+            except TemplateError as e:
+                logger.warning(f"System message {key} has an invalid template: {e}")
+                errors[key] = str(e)
+                continue
+            if template.undeclared:
+                logger.warning(
+                    f"System message {key} uses undeclared variable(s): "
+                    f"{', '.join(sorted(template.undeclared))}"
+                )
+            templates[key] = template
+
+        self._messages = messages
+        self._templates = templates
+        self._template_errors = errors
+        self._loaded_at = time.monotonic()
+        return len(messages)
+
+    async def get(self, message_key: str) -> Optional[SystemMessage]:
+        """Get a message row, reloading the cache first if it is stale"""
+        await self._ensure_loaded()
+        return self._messages.get(message_key)
+
+    async def get_template(self, message_key: str) -> Optional[CompiledTemplate]:
+        """Get the compiled template for a message, None if missing or invalid"""
+        await self._ensure_loaded()
+        return self._templates.get(message_key)
+
+    def get_template_error(self, message_key: str) -> Optional[str]:
+        """Compile error recorded for a message at load time"""
+        return self._template_errors.get(message_key)
+
+    async def _ensure_loaded(self) -> None:
+        if not self.is_valid:
+            if self._lock is None:
+                self._lock = asyncio.Lock()
+            async with self._lock:
+                # Another task may have reloaded while we waited
+                if not self.is_valid:
+                    count = await self.load()
+                    logger.debug(f"System message cache loaded: {count} message(s)")
+
+
+# グローバルキャッシュインスタンス
+_message_cache = SystemMessageCache(ttl=settings.SYSTEM_MESSAGE_CACHE_TTL)
+
+
+def get_message_cache() -> SystemMessageCache:
+    """Get the global system message cache"""
+    return _message_cache
+
 
 class MessageService:
     """Service for managing system messages"""
@@ -46,6 +145,8 @@ class MessageService:
             session.add(message)
             await session.commit()
             await session.refresh(message)
+            _message_cache.invalidate()
+            notify_messages()
             return message
 
     async def update_message(self, message_key: str, message_data: dict) -> Optional[SystemMessage]:
@@ -65,6 +166,8 @@ class MessageService:
 
             await session.commit()
             await session.refresh(message)
+            _message_cache.invalidate()
+            notify_messages()
             return message
 
     async def delete_message(self, message_key: str) -> bool:
@@ -80,6 +183,8 @@ class MessageService:
 
             await session.delete(message)
             await session.commit()
+            _message_cache.invalidate()
+            notify_messages()
             return True
 
     async def initialize_default_messages(self) -> int:
@@ -239,6 +344,9 @@ class MessageService:
                     count += 1
 
             await session.commit()
+            if count:
+                _message_cache.invalidate()
+                notify_messages()
             return count
 
     async def get_message_content(self, message_key: str, **kwargs) -> str:
@@ -254,13 +362,33 @@ class MessageService:
         # Extract default value if provided
         default_value = kwargs.pop('default', None)
 
-        message = await self.get_message_by_key(message_key)
+        message = await _message_cache.get(message_key)
         if not message or not message.is_active:
             if default_value is not None:
                 return default_value
             return f"[Message {message_key} not found]"
 
+        template = await _message_cache.get_template(message_key)
+        if template is None:
+            error = _message_cache.get_template_error(message_key)
+            return f"[Message {message_key} - Invalid template: {error}]"
+
         try:
-            return message.content.format(**kwargs)
+            return template.render(kwargs)
         except KeyError as e:
             return f"[Message {message_key} - Missing variable: {e}]"
+        except TemplateError as e:
+            return f"[Message {message_key} - Invalid template: {e}]"
+
+    async def get_message_bytes(self, message_key: str, **kwargs) -> bytes:
+        """Get message content as CP932 bytes with CR+LF line endings
+
+        Messages without variables return bytes encoded once at cache load.
+        """
+        template = await _message_cache.get_template(message_key)
+        if template is not None and template.is_static:
+            message = await _message_cache.get(message_key)
+            if message.is_active:
+                return template.static_bytes
+
+        return encode_text(await self.get_message_content(message_key, **kwargs))
@@ -1,43 +1,298 @@
 """
 User Service - Business logic for user operations
 """
-from typing import Optional, List
+import asyncio
+import bisect
+import hashlib
+import hmac
+import logging
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, List, Tuple
 from datetime import datetime
-from sqlalchemy import select, update, func
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession
-import bcrypt
 
 from app.models.user import User
+from app.core.config import settings
 from app.core.database import async_session
+from app.core.password_hasher import get_password_hasher
+from app.services.cache_sync import notify_user
+from app.services.counter_service import get_access_counter
+
+logger = logging.getLogger(__name__)
+
+# Accounts that never appear as mail recipients
+_DIRECTORY_EXCLUDED = {"guest"}
+
+
+def _like_prefix(prefix: str) -> str:
+    """Escape LIKE wildcards and append % for a prefix match"""
+    return prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class UserDirectory:
+    """In-memory sorted directory of active users for recipient lookup
+
+    Holds (user_id, handle_name) pairs in two case-insensitively sorted key
+    lists, so prefix searches are two bisects instead of a table scan. Loaded
+    once at startup; UserService keeps it current on create/update/delete,
+    and other processes' changes arrive through refresh() (cache_sync). With
+    ttl > 0 it is also reloaded after that many seconds.
+    """
+
+    def __init__(self, ttl: int = 0):
+        self.ttl = ttl
+        self._handles = {}  # user_id -> handle_name
+        self._id_keys: List[Tuple[str, str]] = []  # (user_id.lower(), user_id)
+        self._handle_keys: List[Tuple[str, str]] = []  # (handle_name.lower(), user_id)
+        self._loaded_at: Optional[float] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    @property
+    def is_loaded(self) -> bool:
+        return self._loaded_at is not None
+
+    @property
+    def is_valid(self) -> bool:
+        if self._loaded_at is None:
+            return False
+        if self.ttl > 0 and time.monotonic() - self._loaded_at > self.ttl:
+            return False
+        return True
+
+    async def load(self) -> int:
+        """(Re)load all active users"""
+        async with async_session() as session:
+            result = await session.execute(
+                select(User.user_id, User.handle_name).where(User.is_active == True)
+            )
+            rows = result.all()
+
+        self._handles = {
+            user_id: handle_name for user_id, handle_name in rows
+            if user_id not in _DIRECTORY_EXCLUDED
+        }
+        self._id_keys = sorted((user_id.lower(), user_id) for user_id in self._handles)
+        self._handle_keys = sorted(
+            (handle_name.lower(), user_id) for user_id, handle_name in self._handles.items()
+        )
+        self._loaded_at = time.monotonic()
+        logger.debug(f"User directory loaded: {len(self._handles)} user(s)")
+        return len(self._handles)
+
+    async def _ensure_loaded(self) -> None:
+        if self.is_valid:
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if not self.is_valid:
+                await self.load()
+
+    async def refresh(self, user_id: str) -> None:
+        """Re-read one user after another process changed it"""
+        if not self.is_loaded:
+            return
+        async with async_session() as session:
+            result = await session.execute(select(User).where(User.user_id == user_id))
+            user = result.scalar_one_or_none()
+        if user is None:
+            self.remove(user_id)
+        else:
+            self.put(user)
+
+    def put(self, user: User) -> None:
+        """Add, update or (if inactive) remove a user"""
+        if not self.is_loaded:
+            return
+        self.remove(user.user_id)
+        if user.is_active and user.user_id not in _DIRECTORY_EXCLUDED:
+            self._handles[user.user_id] = user.handle_name
+            bisect.insort(self._id_keys, (user.user_id.lower(), user.user_id))
+            bisect.insort(self._handle_keys, (user.handle_name.lower(), user.user_id))
+
+    def remove(self, user_id: str) -> None:
+        handle_name = self._handles.pop(user_id, None)
+        if handle_name is None:
+            return
+        for keys, key in (
+            (self._id_keys, (user_id.lower(), user_id)),
+            (self._handle_keys, (handle_name.lower(), user_id)),
+        ):
+            idx = bisect.bisect_left(keys, key)
+            if idx < len(keys) and keys[idx] == key:
+                del keys[idx]
+
+    @staticmethod
+    def _prefix_range(keys: List[Tuple[str, str]], prefix: str) -> List[Tuple[str, str]]:
+        start = bisect.bisect_left(keys, (prefix,))
+        end = bisect.bisect_left(keys, (prefix + "\U0010ffff",))
+        return keys[start:end]
+
+    async def search(self, prefix: str, limit: int = 20) -> List[Tuple[str, str]]:
+        """
+        Find users whose ID or handle starts with prefix (case-insensitive)
+
+        Returns:
+            Up to ``limit`` (user_id, handle_name) tuples: an exact ID match
+            first, then ID prefix matches, then handle prefix matches
+        """
+        await self._ensure_loaded()
+        key = prefix.strip().lower()
+        if not key:
+            return []
+
+        found: List[str] = []
+        seen = set()
+        for keys in (self._id_keys, self._handle_keys):
+            for _, user_id in self._prefix_range(keys, key):
+                if user_id not in seen:
+                    seen.add(user_id)
+                    found.append(user_id)
+
+        found.sort(key=lambda user_id: user_id.lower() != key)  # exact ID first (stable)
+        return [(user_id, self._handles[user_id]) for user_id in found[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+_user_directory = UserDirectory()
+
+
+class AuthCache:
+    """Short-lived cache of verified passwords (memory only)
+
+    A repeat login with the same password within the TTL skips the bcrypt
+    check. Keys are the user ID plus an HMAC of the password under a
+    per-process random key, so plaintext passwords are never stored.
+
+    Each process has its own cache and invalidate() only reaches this one, so
+    an entry never stands in for the user row: every login still reads the
+    row (active and not banned), and a cached entry only counts while the
+    row's password hash is still the one that was verified. Password changes,
+    bans and deactivations made by any process apply to the next login.
+    """
+
+    def __init__(self, ttl: int = 300, max_size: int = 1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._key = os.urandom(32)
+        self._entries: "OrderedDict[Tuple[str, bytes], Tuple[float, str]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _cache_key(self, user_id: str, password: str) -> Tuple[str, bytes]:
+        digest = hmac.new(
+            self._key, f"{user_id}\0{password}".encode('utf-8'), hashlib.sha256
+        ).digest()
+        return (user_id, digest)
+
+    def check(self, user: User, password: str) -> bool:
+        """True if this password was verified against the user's current hash"""
+        if self.ttl <= 0:
+            return False
+        key = self._cache_key(user.user_id, password)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic() or entry[1] != user.password_hash:
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return False
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return True
+
+    def put(self, user_id: str, password: str, password_hash: str) -> None:
+        if self.ttl <= 0:
+            return
+        key = self._cache_key(user_id, password)
+        self._entries[key] = (time.monotonic() + self.ttl, password_hash)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str) -> None:
+        """Forget every cached login of a user"""
+        for key in [key for key in self._entries if key[0] == user_id]:
+            del self._entries[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+
+_auth_cache = AuthCache(ttl=settings.AUTH_CACHE_TTL, max_size=settings.AUTH_CACHE_SIZE)
+
+
+def get_auth_cache() -> AuthCache:
+    """Get the global login cache"""
+    return _auth_cache
+
+
+def get_user_directory() -> UserDirectory:
+    """Get the global user directory"""
+    return _user_directory
 
 
 class UserService:
     """User service for authentication and user management"""
 
     @staticmethod
-    def hash_password(password: str) -> str:
-        """Hash password"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    async def hash_password(password: str) -> str:
+        """Hash password (on the password hasher pool)"""
+        return await get_password_hasher().hash(password)
 
     @staticmethod
-    def verify_password(plain_password: str, hashed_password: str) -> bool:
-        """Verify password"""
-        return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(plain_password: str, hashed_password: str) -> bool:
+        """Verify password (on the password hasher pool)"""
+        return await get_password_hasher().verify(plain_password, hashed_password)
 
     async def authenticate(self, user_id: str, password: str) -> Optional[User]:
-        """Authenticate user"""
+        """Authenticate an active, non-banned user (a recently verified
+        password skips bcrypt, see AuthCache)"""
         async with async_session() as session:
             result = await session.execute(
-                select(User).where(User.user_id == user_id, User.is_active == True)
+                select(User).where(
+                    User.user_id == user_id,
+                    User.is_active == True,
+                    User.is_banned.isnot(True),
+                )
             )
             user = result.scalar_one_or_none()
 
-            if user and self.verify_password(password, user.password_hash):
-                return user
-
+        if not user:
+            return None
+        if _auth_cache.check(user, password):
+            return user
+        if not await self.verify_password(password, user.password_hash):
             return None
 
+        if get_password_hasher().needs_rehash(user.password_hash):
+            await self._rehash_password(user, password)
+
+        _auth_cache.put(user_id, password, user.password_hash)
+        return user
+
+    async def _rehash_password(self, user: User, password: str) -> None:
+        """Re-hash with the configured bcrypt cost (we only see the plaintext at login)"""
+        new_hash = await self.hash_password(password)
+        async with async_session() as session:
+            # Only if the password wasn't changed meanwhile
+            result = await session.execute(
+                update(User)
+                .where(User.id == user.id, User.password_hash == user.password_hash)
+                .values(password_hash=new_hash)
+            )
+            await session.commit()
+        if result.rowcount:
+            user.password_hash = new_hash
+            logger.info(f"Password hash upgraded for user: {user.user_id}")
+
     async def create_user(
         self,
         user_id: str,
@@ -49,6 +304,9 @@ class UserService:
         must_change_password_on_next_login: bool = False,
     ) -> User:
         """Create new user or reactivate deleted user"""
+        # Hash before opening the session so no connection is held while queued
+        password_hash = await self.hash_password(password)
+
         async with async_session() as session:
             # Check if user already exists (including inactive ones)
             result = await session.execute(select(User).where(User.user_id == user_id))
@@ -56,7 +314,7 @@ class UserService:
 
             if existing_user:
                 # Reactivate deleted user with new data
-                existing_user.password_hash = self.hash_password(password)
+                existing_user.password_hash = password_hash
                 existing_user.handle_name = handle_name
                 existing_user.email = email
                 existing_user.level = level
@@ -66,12 +324,15 @@ class UserService:
                 existing_user.updated_at = datetime.now()
                 await session.commit()
                 await session.refresh(existing_user)
+                _user_directory.put(existing_user)
+                _auth_cache.invalidate(user_id)
+                notify_user(user_id)
                 return existing_user
             else:
                 # Create new user
                 user = User(
                     user_id=user_id,
-                    password_hash=self.hash_password(password),
+                    password_hash=password_hash,
                     handle_name=handle_name,
                     email=email,
                     level=level,
@@ -81,6 +342,8 @@ class UserService:
                 session.add(user)
                 await session.commit()
                 await session.refresh(user)
+                _user_directory.put(user)
+                notify_user(user_id)
                 return user
 
     async def get_user(self, user_id: str) -> Optional[User]:
@@ -97,6 +360,36 @@ class UserService:
             )
             return list(result.scalars().all())
 
+    async def search_users(self, prefix: str, limit: int = 20) -> List[User]:
+        """Find active users whose ID or handle starts with prefix (case-insensitive)
+
+        Uses the NOCASE indexes on user_id / handle_name, so only matching
+        index ranges are read.
+        """
+        pattern = _like_prefix(prefix.strip())
+        async with async_session() as session:
+            by_id = await session.execute(
+                select(User)
+                .where(User.user_id.like(pattern, escape="\\"), User.is_active == True)
+                .order_by(User.user_id.collate("NOCASE"))
+                .limit(limit)
+            )
+            users = list(by_id.scalars().all())
+            if len(users) < limit:
+                by_handle = await session.execute(
+                    select(User)
+                    .where(User.handle_name.like(pattern, escape="\\"), User.is_active == True)
+                    .order_by(User.handle_name.collate("NOCASE"))
+                    .limit(limit)
+                )
+                seen = {user.id for user in users}
+                users.extend(user for user in by_handle.scalars() if user.id not in seen)
+            return users[:limit]
+
+    async def find_recipients(self, prefix: str, limit: int = 20) -> List[Tuple[str, str]]:
+        """Mail recipient lookup by ID or prefix from the in-memory directory"""
+        return await _user_directory.search(prefix, limit)
+
     async def get_recent_users(self, limit: int = 20) -> List[User]:
         """Get recently logged in users"""
         async with async_session() as session:
@@ -122,6 +415,9 @@ class UserService:
                 user.updated_at = datetime.now()
                 await session.commit()
                 await session.refresh(user)
+                _user_directory.put(user)
+                _auth_cache.invalidate(user_id)
+                notify_user(user_id)
 
             return user
 
@@ -141,10 +437,8 @@ class UserService:
         pass
 
     async def get_access_count(self) -> int:
-        """Get total access count"""
-        async with async_session() as session:
-            result = await session.execute(select(func.count()).select_from(User))
-            return result.scalar() or 0
+        """Get total access count (in-memory counter, no query)"""
+        return get_access_counter().value
 
     async def is_user_id_available(self, user_id: str) -> bool:
         """Check if user ID is available for registration"""
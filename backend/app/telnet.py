@@ -0,0 +1,246 @@
+"""
+Standalone Telnet Server (python -m app.telnet)
+
+Runs the telnet BBS without the web API, in TELNET_WORKERS processes. A small
+supervisor forks the workers; each binds TELNET_PORT with SO_REUSEPORT so the
+kernel spreads new connections across them, and each accepts its share of
+TELNET_MAX_CONNECTIONS. Workers and the API see each other's chat, sessions
+and cache invalidations over the message bus (with MESSAGE_BUS=auto, a Unix
+socket next to the database). Run the API with TELNET_EMBEDDED=false so it
+doesn't bind the telnet port as well.
+
+SIGTERM/SIGINT to the supervisor drains the workers: they stop accepting and
+give open sessions TELNET_DRAIN_TIMEOUT seconds to log out. A second signal
+kills them at once. Workers that die are restarted.
+"""
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict, List
+
+from app.core.bus import close_bus, resolve_bus_spec
+from app.core.config import settings
+from app.core.database import engine, init_db
+from app.protocols.telnet_server import TelnetServer
+from app.utils.loop_monitor import get_loop_monitor, install_event_loop
+
+# Import models to ensure tables are created
+from app.models.user import User
+from app.models.board import Board, Message
+from app.models.system_message import SystemMessage
+from app.models.counter import Counter
+
+logger = logging.getLogger("app.telnet")
+
+KILL_GRACE = 10  # seconds past the drain timeout before workers are killed
+RESTART_DELAY = 1.0  # seconds between restarts of a worker that keeps dying
+
+
+def split_connections(total: int, workers: int) -> List[int]:
+    """Per-worker connection limits that add up to total"""
+    base, extra = divmod(total, workers)
+    return [base + (1 if i < extra else 0) for i in range(workers)]
+
+
+async def prepare() -> None:
+    """One-time setup in the supervisor, before any worker starts"""
+    await init_db()
+
+    from app.services.message_service import MessageService
+    count = await MessageService().initialize_default_messages()
+    if count > 0:
+        logger.info(f"Initialized {count} default system messages")
+
+    from app.services.board_service import check_search_index
+    await check_search_index()
+
+    # Workers must not inherit open connections (or a bus with this process's node ID)
+    await close_bus()
+    await engine.dispose()
+
+
+async def run_worker(index: int, max_connections: int, reuse_port: bool) -> None:
+    """One worker: serve telnet until SIGTERM, then drain"""
+    from app.services.board_service import get_board_registry
+    from app.services.cache_sync import start_cache_sync
+    from app.services.counter_service import get_access_counter
+    from app.services.message_service import get_message_cache
+    from app.services.user_service import get_user_directory
+
+    loop_monitor = get_loop_monitor()
+    loop_monitor.start()
+
+    await get_message_cache().load()
+    await get_board_registry().load()
+    await get_user_directory().load()
+    await start_cache_sync()
+    access_counter = get_access_counter()
+    await access_counter.load()
+    access_counter.start()
+
+    server = TelnetServer(
+        host=settings.TELNET_HOST,
+        port=settings.TELNET_PORT,
+        max_connections=max_connections,
+        reuse_port=reuse_port,
+    )
+    server_task = asyncio.create_task(server.start())
+    logger.info(f"Worker {index} serving up to {max_connections} connection(s)")
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    loop.add_signal_handler(signal.SIGTERM, stop.set)
+    await asyncio.wait(
+        [asyncio.ensure_future(stop.wait()), server_task],
+        return_when=asyncio.FIRST_COMPLETED,
+    )
+
+    try:
+        if server_task.done():
+            server_task.result()  # start() failed, e.g. the port is taken
+        await server.drain(settings.TELNET_DRAIN_TIMEOUT)
+    finally:
+        server_task.cancel()
+        try:
+            await server_task
+        except (asyncio.CancelledError, Exception):
+            pass
+
+        try:
+            await access_counter.stop()
+        except Exception as e:
+            logger.error(f"Failed to save access counter: {e}")
+
+        await close_bus()
+        from app.services.mail_service import close_mail_databases
+        close_mail_databases()
+        await engine.dispose()
+
+        from app.core.password_hasher import shutdown_password_hasher
+        shutdown_password_hasher()
+        await loop_monitor.stop()
+    logger.info(f"Worker {index} stopped")
+
+
+class Supervisor:
+    """Forks the workers, restarts the ones that die, drains them on SIGTERM"""
+
+    def __init__(self, workers: int):
+        self.limits = split_connections(settings.TELNET_MAX_CONNECTIONS, workers)
+        self.reuse_port = workers > 1
+        self.children: Dict[int, int] = {}  # pid -> worker index
+        self.started: Dict[int, float] = {}  # worker index -> start time
+        self.stopping = False
+        self.kill_at = None
+
+    def spawn(self, index: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            # Worker: SIGINT from the terminal goes to the whole process group,
+            # but only the supervisor's SIGTERM should start the drain
+            signal.signal(signal.SIGINT, signal.SIG_IGN)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                asyncio.run(run_worker(index, self.limits[index], self.reuse_port))
+            except Exception:
+                logger.exception(f"Worker {index} failed")
+                code = 1
+            finally:
+                logging.shutdown()
+                os._exit(code)
+
+        self.children[pid] = index
+        self.started[index] = time.monotonic()
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def on_signal(self, signum, frame) -> None:
+        if self.stopping:
+            logger.warning("Second signal; killing workers")
+            self.signal_children(signal.SIGKILL)
+            return
+        logger.info(f"Draining workers (up to {settings.TELNET_DRAIN_TIMEOUT}s)")
+        self.stopping = True
+        self.kill_at = time.monotonic() + settings.TELNET_DRAIN_TIMEOUT + KILL_GRACE
+        self.signal_children(signal.SIGTERM)
+
+    def signal_children(self, signum: int) -> None:
+        for pid in list(self.children):
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.on_signal)
+        signal.signal(signal.SIGINT, self.on_signal)
+        for index in range(len(self.limits)):
+            self.spawn(index)
+
+        while self.children:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                if self.kill_at and time.monotonic() > self.kill_at:
+                    logger.warning("Workers did not drain in time; killing them")
+                    self.signal_children(signal.SIGKILL)
+                    self.kill_at = None
+                time.sleep(0.2)
+                continue
+
+            index = self.children.pop(pid, None)
+            if index is None:
+                continue
+            code = os.waitstatus_to_exitcode(status)
+            if self.stopping:
+                logger.info(f"Worker {index} (pid {pid}) exited ({code})")
+                continue
+
+            logger.error(f"Worker {index} (pid {pid}) exited unexpectedly ({code}); restarting")
+            if time.monotonic() - self.started[index] < RESTART_DELAY:
+                time.sleep(RESTART_DELAY)
+            self.spawn(index)
+
+        logger.info("All workers stopped")
+        return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=settings.TELNET_HOST)
+    parser.add_argument("--port", type=int, default=settings.TELNET_PORT)
+    parser.add_argument("--workers", type=int, default=settings.TELNET_WORKERS)
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.INFO if settings.DEBUG else logging.WARNING,
+        format="%(asctime)s - [%(process)d] %(name)s - %(levelname)s - %(message)s",
+    )
+    logger.setLevel(logging.INFO)
+
+    settings.TELNET_HOST = args.host
+    settings.TELNET_PORT = args.port
+    settings.TELNET_EMBEDDED = False  # telnet runs here, apart from the API
+    settings.MESSAGE_BUS = resolve_bus_spec(settings.MESSAGE_BUS)
+    workers = max(1, min(args.workers, settings.TELNET_MAX_CONNECTIONS))
+    if workers > 1:
+        if not hasattr(socket, "SO_REUSEPORT"):
+            parser.error("--workers > 1 needs SO_REUSEPORT, which this platform lacks")
+        if settings.MESSAGE_BUS == "local":
+            parser.error("--workers > 1 needs a shared MESSAGE_BUS (auto, unix:// or redis), not local")
+
+    event_loop = install_event_loop(settings.EVENT_LOOP)  # inherited by the workers
+    asyncio.run(prepare())
+    logger.info(
+        f"Telnet on {args.host}:{args.port}: {workers} worker(s), "
+        f"{settings.TELNET_MAX_CONNECTIONS} connection(s), bus {settings.MESSAGE_BUS}, loop {event_loop}"
+    )
+    return Supervisor(workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
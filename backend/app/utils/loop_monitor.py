@@ -0,0 +1,273 @@
+"""
+イベントループ監視ユーティリティ
+
+イベントループ実装の選択（uvloop / asyncio）と、ループ遅延の計測を提供します。
+サンプラータスクが一定間隔で起床し、予定時刻からの遅れ（スケジューリング遅延）を
+記録します。監視スレッドはループが止まったまま LOOP_SLOW_CALLBACK_MS を過ぎると、
+その時点でループ上で実行中のタスクとコルーチンを記録します。asyncio のデバッグ
+モードと違い常時有効にできる負荷で、uvloop でも動作します。
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+EVENT_LOOPS = ("auto", "uvloop", "asyncio")
+STACK_DEPTH = 6  # 停止レポートに残すフレーム数
+APP_DIR = f"{os.sep}app{os.sep}"
+
+
+def resolve_event_loop(kind: str) -> str:
+    """
+    使用するイベントループ実装を決定
+
+    Args:
+        kind: "auto"（uvloop があれば使用）、"uvloop"、"asyncio"
+
+    Returns:
+        "uvloop" または "asyncio"
+    """
+    if kind not in EVENT_LOOPS:
+        raise ValueError(f"Unknown EVENT_LOOP: {kind}")
+    if kind == "asyncio":
+        return "asyncio"
+    try:
+        import uvloop  # noqa: F401
+    except ImportError:
+        if kind == "uvloop":
+            logger.warning("EVENT_LOOP=uvloop but uvloop is not installed; using asyncio")
+        return "asyncio"
+    return "uvloop"
+
+
+def install_event_loop(kind: str) -> str:
+    """
+    イベントループポリシーを設定（asyncio.run() の前に呼び出す）
+
+    Args:
+        kind: "auto"、"uvloop"、"asyncio"
+
+    Returns:
+        使用する実装名
+    """
+    implementation = resolve_event_loop(kind)
+    if implementation == "uvloop":
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return implementation
+
+
+def _short_path(filename: str) -> str:
+    index = filename.rfind(APP_DIR)
+    return filename[index + 1:] if index >= 0 else os.path.basename(filename)
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    return values[min(len(values) - 1, int(len(values) * pct / 100))]
+
+
+class LoopMonitor:
+    """イベントループ遅延の計測と、停止時に実行中だったコルーチンの記録"""
+
+    def __init__(self, interval: float = 0.1, slow_callback_ms: int = 100,
+                 window: int = 600, max_reports: int = 50):
+        """
+        初期化
+
+        Args:
+            interval: サンプリング間隔（秒）
+            slow_callback_ms: この時間以上ループが止まったらレポートを記録
+            window: パーセンタイル計算に使う直近のサンプル数
+            max_reports: 保持する停止レポート数
+        """
+        self.interval = interval
+        self.slow_callback = slow_callback_ms / 1000
+        self.samples: Deque[float] = deque(maxlen=window)  # 遅延 (ms)
+        self.slow_callbacks: Deque[dict] = deque(maxlen=max_reports)
+        self.sample_count = 0
+        self.slow_count = 0
+        self.max_lag_ms = 0.0
+        self.implementation: Optional[str] = None
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._last_tick = 0.0  # サンプラーが最後に起床した時刻 (time.monotonic)
+        self._stalled: Optional[dict] = None  # 監視スレッドが記録した停止中のレポート
+
+    def start(self) -> None:
+        """サンプラータスクと監視スレッドを開始（イベントループ上で呼び出す）"""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._thread_id = threading.get_ident()
+        self.implementation = type(self._loop).__module__.split(".")[0]
+        self._last_tick = time.monotonic()
+        self._stop.clear()
+        self._task = self._loop.create_task(self._sample(), name="loop-monitor")
+        self._watchdog = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._watchdog.start()
+        logger.info(f"Loop monitor started ({self.implementation}, every {self.interval}s)")
+
+    async def stop(self) -> None:
+        """サンプラータスクと監視スレッドを停止"""
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        # uvloop の loop.time() は反復ごとにキャッシュされるため time.monotonic() で測る
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            previous_tick, self._last_tick = self._last_tick, now
+            self._record(max(0.0, now - expected), previous_tick)
+
+    def _record(self, lag: float, previous_tick: float) -> None:
+        lag_ms = lag * 1000
+        self.samples.append(lag_ms)
+        self.sample_count += 1
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+        if lag < self.slow_callback:
+            return
+
+        # 監視スレッドがこの停止中に記録したレポートがあれば使う
+        report = self._stalled
+        self._stalled = None
+        if report is None or report.pop("_tick") != previous_tick:
+            report = {"at": datetime.now().isoformat(), "task": None, "coroutine": None,
+                      "where": None, "stack": []}
+        report["lag_ms"] = round(lag_ms, 1)
+        self.slow_callbacks.append(report)
+        self.slow_count += 1
+        logger.warning(
+            f"Event loop blocked for {lag_ms:.0f}ms"
+            f" in {report['coroutine'] or 'unknown'} ({report['where'] or 'not captured'})"
+        )
+
+    def _watch(self) -> None:
+        """監視スレッド: ループが止まっていれば実行中のフレームを記録"""
+        reported = None
+        while not self._stop.wait(self.slow_callback / 2):
+            tick = self._last_tick
+            if tick == reported or time.monotonic() - tick < self.interval + self.slow_callback:
+                continue
+            frame = sys._current_frames().get(self._thread_id)
+            if frame is None:
+                continue
+            self._stalled = {"_tick": tick, **self._describe(frame)}
+            reported = tick
+
+    def _describe(self, frame) -> dict:
+        """ループスレッドのフレームから実行中のタスク・コルーチン・位置を取り出す"""
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+
+        coroutine = None
+        where = None
+        stack = []
+        while frame is not None:
+            code = frame.f_code
+            name = getattr(code, "co_qualname", code.co_name)
+            location = f"{_short_path(code.co_filename)}:{frame.f_lineno}"
+            if len(stack) < STACK_DEPTH:
+                stack.append(f"{name} ({location})")
+            if where is None and APP_DIR in code.co_filename:
+                where = f"{location} in {name}"
+            if coroutine is None and code.co_flags & inspect.CO_COROUTINE:
+                coroutine = name
+            frame = frame.f_back
+
+        return {
+            "at": datetime.now().isoformat(),
+            "task": task.get_name() if task else None,
+            "coroutine": coroutine,
+            "where": where or (stack[0] if stack else None),
+            "stack": stack,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        ループ遅延の統計
+
+        Returns:
+            直近ウィンドウのパーセンタイル (ms)、停止レポートなど
+        """
+        values = sorted(self.samples)
+        lag = {}
+        if values:
+            lag = {
+                "p50": round(_percentile(values, 50), 2),
+                "p90": round(_percentile(values, 90), 2),
+                "p99": round(_percentile(values, 99), 2),
+                "max": round(values[-1], 2),
+                "max_since_start": round(self.max_lag_ms, 2),
+            }
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "implementation": self.implementation,
+            "interval_ms": int(self.interval * 1000),
+            "samples": self.sample_count,
+            "lag_ms": lag,
+            "slow_callback_threshold_ms": int(self.slow_callback * 1000),
+            "slow_callbacks": self.slow_count,
+            "recent_slow_callbacks": list(self.slow_callbacks)[-10:],
+        }
+
+    def health(self, warn_ms: float) -> Dict[str, Any]:
+        """
+        ヘルスチェック結果（直近の p99 遅延が warn_ms 未満なら正常）
+
+        Args:
+            warn_ms: 警告閾値 (ms)
+
+        Returns:
+            healthy フラグ付きの統計
+        """
+        stats = self.stats()
+        p99 = stats["lag_ms"].get("p99", 0.0)
+        return {"healthy": p99 < warn_ms, "warning_threshold_ms": warn_ms, **stats}
+
+
+# グローバルループモニター
+_loop_monitor: Optional[LoopMonitor] = None
+
+
+def get_loop_monitor() -> LoopMonitor:
+    """
+    グローバルループモニターを取得
+
+    Returns:
+        LoopMonitor インスタンス（start() は呼び出し側で行う）
+    """
+    global _loop_monitor
+    if _loop_monitor is None:
+        _loop_monitor = LoopMonitor(
+            interval=settings.LOOP_MONITOR_INTERVAL,
+            slow_callback_ms=settings.LOOP_SLOW_CALLBACK_MS,
+        )
+    return _loop_monitor
@@ -0,0 +1,152 @@
+"""
+システムメッセージテンプレートのコンパイル
+
+メッセージ本文を一度だけ解析してリテラル/プレースホルダのセグメントに分割し、
+描画時は str.format の再解析を行わずにセグメントを連結します。
+属性・添字参照（{user.name}、{items[0]}）や入れ子の書式指定を含む本文は
+従来どおり str.format で描画します。
+"""
+
+import re
+import string
+from typing import Any, FrozenSet, List, Optional, Tuple
+
+from app.protocols.telnet_output import encode_text
+
+_formatter = string.Formatter()
+_ROOT_NAME = re.compile(r"[^.\[]*")
+
+
+class TemplateError(ValueError):
+    """テンプレート解析・描画エラー"""
+    pass
+
+
+class CompiledTemplate:
+    """コンパイル済みメッセージテンプレート"""
+
+    __slots__ = ("segments", "placeholders", "declared", "static_text", "_static_bytes", "_format_text")
+
+    def __init__(self, content: str, variables: Optional[str] = None):
+        """
+        テンプレートをコンパイル
+
+        Args:
+            content: メッセージ本文（str.format 形式）
+            variables: 宣言済み変数のカンマ区切りリスト
+
+        Raises:
+            TemplateError: 本文の書式が不正な場合
+        """
+        # (literal, field_name, conversion, format_spec)
+        segments: List[Tuple[str, Optional[str], Optional[str], str]] = []
+        names = set()
+        simple = True
+        try:
+            for literal, field_name, format_spec, conversion in _formatter.parse(content):
+                if field_name is not None:
+                    names.update(_field_names(field_name, format_spec))
+                    if not field_name.isidentifier() or "{" in (format_spec or ""):
+                        simple = False
+                segments.append((literal, field_name, conversion, format_spec or ""))
+        except ValueError as e:
+            raise TemplateError(str(e)) from e
+
+        self.segments = segments
+        # 単純なプレースホルダのみならセグメント連結、それ以外は str.format
+        self._format_text: Optional[str] = None if simple else content
+        self.placeholders: FrozenSet[str] = frozenset(names)
+        self.declared: FrozenSet[str] = parse_variables(variables)
+
+        # 変数なしメッセージは描画結果と送信バイト列を事前に確定
+        if self.placeholders:
+            self.static_text = None
+        else:
+            self.static_text = "".join(literal for literal, _, _, _ in segments)
+        self._static_bytes: Optional[bytes] = None
+
+    @property
+    def is_static(self) -> bool:
+        return self.static_text is not None
+
+    @property
+    def undeclared(self) -> FrozenSet[str]:
+        """variables カラムに宣言されていないプレースホルダ"""
+        return self.placeholders - self.declared
+
+    @property
+    def static_bytes(self) -> Optional[bytes]:
+        """変数なしメッセージの CP932/CRLF エンコード済みバイト列"""
+        if self.static_text is None:
+            return None
+        if self._static_bytes is None:
+            self._static_bytes = encode_text(self.static_text)
+        return self._static_bytes
+
+    def render(self, values: dict) -> str:
+        """
+        テンプレートを描画
+
+        Raises:
+            KeyError: 必要な変数が values にない場合
+            TemplateError: 属性・添字参照や書式指定が値に合わない場合
+        """
+        if self.static_text is not None:
+            return self.static_text
+        if self._format_text is not None:
+            try:
+                return self._format_text.format(**values)
+            except KeyError:
+                raise
+            except (AttributeError, IndexError, TypeError, ValueError) as e:
+                raise TemplateError(str(e)) from e
+
+        parts = []
+        for literal, field_name, conversion, format_spec in self.segments:
+            if literal:
+                parts.append(literal)
+            if field_name is None:
+                continue
+            value: Any = values[field_name]
+            if conversion:
+                value = _formatter.convert_field(value, conversion)
+            parts.append(format(value, format_spec))
+        return "".join(parts)
+
+
+def _field_names(field_name: str, format_spec: Optional[str]) -> List[str]:
+    """プレースホルダ（入れ子の書式指定を含む）が参照する変数名"""
+    name = _ROOT_NAME.match(field_name).group()
+    if not name.isidentifier():
+        raise TemplateError(f"Unsupported placeholder '{{{field_name}}}'")
+    names = [name]
+    if format_spec and "{" in format_spec:
+        for _, nested, nested_spec, _ in _formatter.parse(format_spec):
+            if nested is not None:
+                names.extend(_field_names(nested, nested_spec))
+    return names
+
+
+def parse_variables(variables: Optional[str]) -> FrozenSet[str]:
+    """カンマ区切りの変数宣言を集合に変換"""
+    if not variables:
+        return frozenset()
+    return frozenset(v.strip() for v in variables.split(",") if v.strip())
+
+
+def validate_template(content: str, variables: Optional[str]) -> List[str]:
+    """
+    テンプレート検証
+
+    Returns:
+        問題点のリスト（空なら問題なし）
+    """
+    try:
+        template = CompiledTemplate(content, variables)
+    except TemplateError as e:
+        return [f"Invalid template: {e}"]
+
+    return [
+        f"Undeclared variable: {name}"
+        for name in sorted(template.undeclared)
+    ]
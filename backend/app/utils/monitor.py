@@ -13,6 +13,12 @@ from typing import Dict, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+from app.core.config import settings
+from app.core.database import get_connection
+from app.core.password_hasher import get_password_hasher
+from app.services.user_service import get_auth_cache
+from app.utils.loop_monitor import get_loop_monitor
+
 logger = logging.getLogger(__name__)
 
 
@@ -44,11 +50,12 @@ class SystemMonitor:
             'sessions': await self.check_sessions(),
             'disk_space': await self.check_disk_space(),
             'memory': await self.check_memory(),
+            'event_loop': await self.check_event_loop(),
             'timestamp': datetime.now().isoformat()
         }
 
         # 異常があればログに記録
-        if not all(checks[k]['healthy'] for k in ['database', 'sessions', 'disk_space', 'memory']):
+        if not all(checks[k]['healthy'] for k in ['database', 'sessions', 'disk_space', 'memory', 'event_loop']):
             logger.warning(f"Health check failed: {checks}")
 
         return checks
@@ -73,7 +80,7 @@ class SystemMonitor:
             db_size = os.path.getsize(self.db_path)
 
             # 整合性チェック（軽量版）
-            conn = sqlite3.connect(self.db_path, timeout=5.0)
+            conn = get_connection(self.db_path)
             cursor = conn.cursor()
 
             # クイックチェック（PRAGMA quick_check は高速）
@@ -228,6 +235,18 @@ class SystemMonitor:
                 'error': str(e)
             }
 
+    async def check_event_loop(self) -> Dict[str, Any]:
+        """
+        イベントループ遅延チェック
+
+        Returns:
+            ループ遅延のパーセンタイルと停止レポート
+        """
+        result = get_loop_monitor().health(settings.LOOP_LAG_WARN_MS)
+        if not result['healthy']:
+            logger.warning(f"High event loop lag: p99={result['lag_ms']['p99']}ms")
+        return result
+
     def register_session(self, client_id: str, user_id: Optional[str] = None, state: str = "connected"):
         """
         セッション登録
@@ -278,7 +297,9 @@ class SystemMonitor:
         metrics = {
             'timestamp': datetime.now().isoformat(),
             'health': await self.check_health(),
-            'uptime': self._get_uptime()
+            'uptime': self._get_uptime(),
+            'password_hasher': get_password_hasher().stats(),
+            'auth_cache': get_auth_cache().stats()
         }
 
         # 履歴に追加（最大100件保持）
@@ -406,7 +427,8 @@ async def periodic_metrics_collection_task(interval: int = 600):
             await asyncio.sleep(interval)
             metrics = await monitor.collect_metrics()
             logger.info(f"Metrics collected: sessions={metrics['health']['sessions']['active_sessions']}, "
-                       f"disk_free={metrics['health']['disk_space']['free_gb']}GB")
+                       f"disk_free={metrics['health']['disk_space']['free_gb']}GB, "
+                       f"loop_lag_p99={metrics['health']['event_loop']['lag_ms'].get('p99')}ms")
 
         except Exception as e:
             logger.error(f"Periodic metrics collection failed: {e}")
@@ -0,0 +1,156 @@
+"""
+Benchmark for chat fan-out with one stalled client
+Connects real loopback sockets, one of which never reads (its TCP window and
+transport buffer fill up), and broadcasts chat lines to all of them. Compares
+the old sequential broadcast (await write + drain per member) with
+ChatHub, reporting how long the sender is held up and the delivery
+latency seen by the clients that do read.
+"""
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.protocols.chat_fanout import POLICIES
+from app.protocols.chat_hub import ChatHub
+from app.protocols.telnet_output import TelnetOutputBuffer, encode_text
+
+SOCKET_BUFFER = 16384
+
+
+class ChatMember:
+    """Server side of one connection, with the fields ChatHub uses"""
+
+    def __init__(self, client_id: str, writer: asyncio.StreamWriter):
+        self.client_id = client_id
+        self.user_id = client_id
+        self.handle_name = client_id
+        self.output = TelnetOutputBuffer(writer)
+
+
+async def connect_members(count: int):
+    """Open count loopback connections; returns server-side members and client readers"""
+    accepted: asyncio.Queue = asyncio.Queue()
+
+    async def on_connect(reader, writer):
+        sock = writer.get_extra_info("socket")
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER)
+        await accepted.put(writer)
+
+    server = await asyncio.start_server(on_connect, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    members, readers, client_writers = [], [], []
+    for i in range(count):
+        sock = socket.socket()
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER)
+        sock.connect(("127.0.0.1", port))
+        sock.setblocking(False)
+        reader, writer = await asyncio.open_connection(sock=sock)
+        readers.append(reader)
+        client_writers.append(writer)  # keep referenced or the transport is closed
+        members.append(ChatMember(f"member{i}", await accepted.get()))
+    return server, members, readers, client_writers
+
+
+async def receive(reader: asyncio.StreamReader, expected: int, latencies: list) -> None:
+    """Read chat lines ("<send time> <seq> ...") and record their latency"""
+    received = 0
+    while received < expected:
+        line = await reader.readline()
+        if not line:
+            return
+        parts = line.split()
+        if len(parts) >= 2 and parts[1].isdigit():
+            latencies.append((time.perf_counter() - float(parts[0])) * 1000)
+            received += 1
+
+
+async def run(mode: str, args) -> None:
+    server, members, readers, client_writers = await connect_members(args.members)
+    fast = readers[1:]
+    client_writers[0].transport.pause_reading()  # member0 never reads
+
+    fanout = ChatHub(room_count=1, queue_size=args.queue_size, policy=args.policy)
+    for member in members:
+        fanout.join(member.client_id, member)
+
+    latencies: list = []
+    receivers = [asyncio.create_task(receive(r, args.messages, latencies)) for r in fast]
+    padding = "x" * args.line_size
+
+    async def sender() -> list:
+        waits = []
+        for seq in range(args.messages):
+            text = f"{time.perf_counter():.6f} {seq} {padding}\r\n"
+            start = time.perf_counter()
+            if mode == "legacy":
+                data = encode_text.__wrapped__(text)
+                for member in members:
+                    await member.output.write(data)
+                    await member.output.flush()
+            else:
+                fanout.broadcast(text)
+            waits.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(args.interval / 1000)
+        return waits
+
+    try:
+        waits = await asyncio.wait_for(sender(), timeout=args.timeout)
+        await asyncio.wait_for(asyncio.gather(*receivers), timeout=args.timeout)
+        outcome = "completed"
+    except asyncio.TimeoutError:
+        waits = []
+        outcome = f"STALLED (gave up after {args.timeout}s)"
+
+    delivered = len(latencies)
+    expected = args.messages * len(fast)
+    print(f"{mode:<7} {outcome}: {delivered}/{expected} lines delivered to readers")
+    if waits:
+        print(f"        sender wait per line: median={statistics.median(waits):.3f}ms max={max(waits):.3f}ms")
+    if latencies:
+        latencies.sort()
+        p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+        print(f"        delivery latency: median={statistics.median(latencies):.2f}ms p99={p99:.2f}ms")
+    if mode == "fanout":
+        stats = fanout.get_stats()
+        room = stats["rooms"][0]["latency"]
+        stalled = fanout.participants.get("member0")
+        print(
+            f"        room histogram: p50<={room['p50_ms']}ms p99<={room['p99_ms']}ms  "
+            f"dropped consumers={stats['dropped']}  "
+            f"lines skipped for member0={stalled.skipped if stalled else 'n/a'}"
+        )
+
+    for task in receivers:
+        task.cancel()
+    for member in list(fanout.participants):
+        fanout.leave(member)
+    for writer in client_writers + [member.output.writer for member in members]:
+        writer.transport.abort()
+    server.close()
+
+
+async def main(args) -> None:
+    print(f"{args.members} member(s), {args.messages} line(s) of {args.line_size} bytes, member0 stalled")
+    print("=" * 70)
+    for mode in ("legacy", "fanout"):
+        await run(mode, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--members", type=int, default=50)
+    parser.add_argument("--messages", type=int, default=500)
+    parser.add_argument("--line-size", type=int, default=300, help="Bytes of padding per line")
+    parser.add_argument("--interval", type=float, default=2.0, help="ms between lines")
+    parser.add_argument("--queue-size", type=int, default=64)
+    parser.add_argument("--policy", choices=POLICIES, default="coalesce")
+    parser.add_argument("--timeout", type=float, default=10.0)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,121 @@
+"""
+Benchmark for ChatHub with many rooms
+Puts 500 participants into 20 rooms and measures join/leave/room-change
+throughput, then has everyone talk in their room and compares the cost of
+routing each line through the per-room member index with walking one flat
+member dict (the old single-room layout). Reports per-room delivery latency
+from the hub's histograms.
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.protocols.chat_fanout import chat_item
+from app.protocols.chat_hub import ChatHub
+
+
+class CountingOutput:
+    """Session output stand-in: counts bytes, yields on flush like a transport"""
+
+    def __init__(self):
+        self.bytes = 0
+
+    async def write(self, data: bytes) -> None:
+        self.bytes += len(data)
+
+    async def flush(self) -> None:
+        await asyncio.sleep(0)
+
+
+class ChatMember:
+    def __init__(self, i: int):
+        self.client_id = f"127.0.0.1:{10000 + i}"
+        self.user_id = f"user{i}"
+        self.handle_name = f"User{i}"
+        self.output = CountingOutput()
+
+
+def flat_broadcast(hub: ChatHub, room: int, text: str, exclude: str) -> int:
+    """Old layout: one dict of everyone in chat, filtered per line"""
+    item = chat_item(text)
+    queued = 0
+    for client_id, participant in hub.participants.items():
+        if participant.room == room and client_id != exclude:
+            participant.offer(item)
+            queued += 1
+    return queued
+
+
+async def main(args) -> None:
+    hub = ChatHub(room_count=args.rooms, queue_size=args.queue_size)
+    members = [ChatMember(i) for i in range(args.participants)]
+    print(f"{args.participants} participant(s) in {args.rooms} room(s)")
+    print("=" * 70)
+
+    start = time.perf_counter()
+    for i, member in enumerate(members):
+        hub.join(member.client_id, member, i % args.rooms + 1)
+    elapsed = time.perf_counter() - start
+    print(f"join         {args.participants / elapsed:>12,.0f} ops/s")
+
+    start = time.perf_counter()
+    moves = 0
+    for _ in range(args.moves // len(members) + 1):
+        for i, member in enumerate(members):
+            hub.join(member.client_id, member, (i + moves) % args.rooms + 1)
+            moves += 1
+    elapsed = time.perf_counter() - start
+    print(f"room change  {moves / elapsed:>12,.0f} ops/s")
+    for i, member in enumerate(members):
+        hub.join(member.client_id, member, i % args.rooms + 1)
+
+    lines = [
+        (member, i % args.rooms + 1, f"\r\n{member.handle_name}> message {n}\r\n")
+        for n in range(args.lines)
+        for i, member in enumerate(members)
+    ]
+
+    for mode in ("flat", "indexed"):
+        routing = 0.0
+        start = time.perf_counter()
+        for count, (member, room, text) in enumerate(lines, 1):
+            t = time.perf_counter()
+            if mode == "flat":
+                flat_broadcast(hub, room, text, member.client_id)
+            else:
+                hub.broadcast(text, room=room, exclude_client_id=member.client_id)
+            routing += time.perf_counter() - t
+            if count % args.rooms == 0:
+                await asyncio.sleep(0)  # let writer tasks run
+        elapsed = time.perf_counter() - start
+        await asyncio.sleep(0.1)
+        print(f"{mode:<12} {len(lines) / elapsed:>12,.0f} lines/s  "
+              f"routing {routing / len(lines) * 1e6:.1f} us/line (sender side)")
+
+    p50 = [room.latency.percentile(50) for room in hub.rooms.values() if room.latency.count]
+    p99 = [room.latency.percentile(99) for room in hub.rooms.values() if room.latency.count]
+    print(f"latency      per-room p50 <= {statistics.median(p50)}ms, worst room p99 <= {max(p99)}ms")
+    delivered = sum(member.output.bytes for member in members)
+    print(f"delivered    {delivered / 1024 / 1024:.1f} MB, dropped={hub.dropped_total}")
+
+    start = time.perf_counter()
+    for member in members:
+        hub.leave(member.client_id)
+    elapsed = time.perf_counter() - start
+    print(f"leave        {args.participants / elapsed:>12,.0f} ops/s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--participants", type=int, default=500)
+    parser.add_argument("--rooms", type=int, default=20)
+    parser.add_argument("--lines", type=int, default=20, help="Lines sent per participant")
+    parser.add_argument("--moves", type=int, default=20000, help="Room changes to time")
+    parser.add_argument("--queue-size", type=int, default=256)
+    asyncio.run(main(parser.parse_args()))
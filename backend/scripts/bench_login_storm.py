@@ -0,0 +1,135 @@
+"""
+Login storm load test
+Fires a burst of concurrent logins against a scratch database while a ticker
+task (standing in for chat delivery to the other sessions) measures how late
+the event loop wakes it up. Compares the old inline bcrypt check with
+UserService.authenticate on the password hasher pool, and fails unless every
+pooled login succeeds with the p99 lag under --max-lag-ms and at least
+--min-rate logins per second.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/storm.db"
+os.environ["DEBUG"] = "false"
+
+import bcrypt
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import async_session, engine, init_db
+from app.core.password_hasher import get_password_hasher, shutdown_password_hasher
+from app.models.user import User
+from app.services.user_service import UserService
+from scripts.bench_mail_responsiveness import lag_p99, ticker
+
+PASSWORD = "storm-password"
+
+
+async def legacy_authenticate(user_id: str, password: str):
+    """The previous UserService.authenticate: bcrypt.checkpw on the event loop"""
+    async with async_session() as session:
+        result = await session.execute(
+            select(User).where(User.user_id == user_id, User.is_active == True)
+        )
+        user = result.scalar_one_or_none()
+        if user and bcrypt.checkpw(password.encode('utf-8'), user.password_hash.encode('utf-8')):
+            return user
+        return None
+
+
+async def run(mode: str, users: int, logins: int) -> dict:
+    """One storm; returns failures, login rate and p99 loop lag (ms)"""
+    service = UserService()
+    authenticate = legacy_authenticate if mode == "inline" else service.authenticate
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(
+        authenticate(f"user{i % users}", PASSWORD) for i in range(logins)
+    ))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+
+    failed = sum(1 for user in results if user is None)
+    p99 = lag_p99(lags)
+    print(
+        f"{mode:<7} {logins} login(s) in {elapsed:.2f}s ({failed} failed)  "
+        f"ticks={len(lags)}  lag median={statistics.median(lags):.1f}ms "
+        f"p99={p99:.1f}ms max={lags[-1]:.1f}ms"
+    )
+    if mode == "pooled":
+        stats = get_password_hasher().stats()
+        print(
+            f"        hasher: {stats['mode']} x{stats['workers']}  max queued={stats['max_queued']}  "
+            f"avg wait={stats['avg_wait_ms']}ms  avg run={stats['avg_run_ms']}ms"
+        )
+    return {"failed": failed, "rate": logins / elapsed, "p99": p99}
+
+
+async def main(args) -> bool:
+    settings.PASSWORD_HASH_EXECUTOR = args.executor
+    settings.PASSWORD_HASH_WORKERS = args.workers
+
+    await init_db()
+    service = UserService()
+    print(f"Creating {args.users} user(s)...")
+    await asyncio.gather(*(
+        service.create_user(f"user{i}", PASSWORD, f"User {i}") for i in range(args.users)
+    ))
+    print("=" * 70)
+
+    try:
+        for mode in ("inline", "pooled"):
+            shutdown_password_hasher()  # fresh metrics for the storm
+            result = await run(mode, args.users, args.logins)
+    finally:
+        shutdown_password_hasher()
+        await engine.dispose()
+
+    print("=" * 70)
+    checks = [
+        (result["failed"] == 0, f"{args.logins - result['failed']}/{args.logins} pooled logins succeeded"),
+        (result["p99"] < args.max_lag_ms,
+         f"loop lag p99 {result['p99']:.1f}ms (limit {args.max_lag_ms}ms)"),
+        (result["rate"] >= args.min_rate,
+         f"{result['rate']:.1f} logins/s (minimum {args.min_rate})"),
+    ]
+    for ok, label in checks:
+        print(f"{'✓' if ok else '❌'} {label}")
+    ok = all(ok for ok, _ in checks)
+    print("✅ Login storm passed" if ok else "❌ Login storm failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--logins", type=int, default=40, help="Concurrent logins in the storm")
+    parser.add_argument("--executor", choices=("thread", "process"), default="thread")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--max-lag-ms", type=float, default=settings.LOOP_LAG_WARN_MS,
+                        help="Fail if the pooled storm's p99 loop lag reaches this")
+    parser.add_argument("--min-rate", type=float, default=1.0,
+                        help="Fail below this many pooled logins per second")
+    try:
+        ok = asyncio.run(main(parser.parse_args()))
+    finally:
+        _tmp.cleanup()
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,120 @@
+"""
+Event loop lag benchmark
+Runs a loopback echo workload (telnet-style small writes on many connections)
+on each available event loop implementation (asyncio, and uvloop if installed)
+with the LoopMonitor sampling, and reports round trips per second and the
+scheduling delay percentiles. Then blocks the loop from a named coroutine and
+checks that the slow-callback report points at it.
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.utils.loop_monitor import LoopMonitor, resolve_event_loop
+
+LINE = b"x" * 80 + b"\r\n"
+
+
+async def echo(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            writer.write(line)
+            await writer.drain()
+    finally:
+        writer.close()
+
+
+async def client(port: int, stop: asyncio.Event, counter: list) -> None:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    while not stop.is_set():
+        writer.write(LINE)
+        await writer.drain()
+        await reader.readline()
+        counter[0] += 1
+    writer.close()
+
+
+async def echo_workload(args) -> None:
+    monitor = LoopMonitor(interval=args.interval / 1000, slow_callback_ms=args.slow_ms)
+    monitor.start()
+    server = await asyncio.start_server(echo, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+
+    stop = asyncio.Event()
+    counter = [0]
+    clients = [asyncio.create_task(client(port, stop, counter)) for _ in range(args.connections)]
+    await asyncio.sleep(args.duration)
+    stop.set()
+    await asyncio.gather(*clients, return_exceptions=True)
+    server.close()
+    await monitor.stop()
+
+    stats = monitor.stats()
+    lag = stats["lag_ms"]
+    print(f"{stats['implementation']:<8} {counter[0] / args.duration:>10,.0f} round trips/s  "
+          f"lag p50={lag['p50']}ms p99={lag['p99']}ms max={lag['max']}ms  "
+          f"slow callbacks={stats['slow_callbacks']}")
+
+
+async def inline_password_check() -> None:
+    """Stands in for a blocking call on the loop (e.g. bcrypt without the hasher pool)"""
+    time.sleep(0.3)
+
+
+async def blocking_check(args) -> bool:
+    monitor = LoopMonitor(interval=args.interval / 1000, slow_callback_ms=args.slow_ms)
+    monitor.start()
+    await asyncio.sleep(0.3)
+    await asyncio.create_task(inline_password_check(), name="login-127.0.0.1:4242")
+    await asyncio.sleep(0.3)
+    await monitor.stop()
+
+    reports = monitor.stats()["recent_slow_callbacks"]
+    report = reports[-1] if reports else {}
+    ok = report.get("coroutine") == "inline_password_check" and report.get("task") == "login-127.0.0.1:4242"
+    print(f"{'✓' if ok else '❌'} blocked {report.get('lag_ms')}ms: task={report.get('task')} "
+          f"coroutine={report.get('coroutine')}")
+    for frame in report.get("stack", []):
+        print(f"    {frame}")
+    return ok
+
+
+def main(args) -> bool:
+    implementations = ["asyncio"]
+    if resolve_event_loop("auto") == "uvloop":
+        implementations.append("uvloop")
+    else:
+        print("uvloop is not installed; measuring asyncio only")
+
+    print(f"{args.connections} connection(s), {args.duration}s per loop, sampling every {args.interval}ms")
+    print("=" * 70)
+    for implementation in implementations:
+        if implementation == "uvloop":
+            import uvloop
+            loop = uvloop.new_event_loop()
+        else:
+            loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(echo_workload(args))
+        finally:
+            loop.close()
+
+    print("=" * 70)
+    return asyncio.run(blocking_check(args))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--connections", type=int, default=200)
+    parser.add_argument("--duration", type=float, default=3.0, help="Seconds per loop implementation")
+    parser.add_argument("--interval", type=float, default=100, help="Sampling interval (ms)")
+    parser.add_argument("--slow-ms", type=int, default=100, help="Slow callback threshold (ms)")
+    sys.exit(0 if main(parser.parse_args()) else 1)
@@ -0,0 +1,72 @@
+"""
+Benchmark for mail list views
+Compares the full-row inbox (Pydantic Mail per row, body included) with the
+paged summary listing the telnet mail list uses (get_inbox_page: MailSummary
+namedtuples, no body) for a large inbox: one page, and every page walked with
+the keyset cursor. Reports time and peak memory per load
+"""
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("DEBUG", "false")
+
+from app.services.mail_service import MailService, close_mail_databases
+from scripts.bench_mail_responsiveness import build_database
+
+
+async def measure(name: str, load, repeat: int) -> None:
+    await load()  # warm up the worker connection
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        mails = await load()
+    elapsed = (time.perf_counter() - start) / repeat
+
+    tracemalloc.start()
+    mails = await load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{name:<10} {len(mails)} rows  {elapsed * 1000:8.1f} ms/load  peak {peak / 1024 / 1024:6.1f} MB")
+
+
+async def walk_pages(service: MailService, user_id: str, page_size: int) -> list:
+    """Every page of the inbox, following the cursor of each page's last row"""
+    mails, cursor = [], None
+    while True:
+        page = await service.get_inbox_page(user_id, page_size, older_than=cursor)
+        mails.extend(page)
+        if len(page) < page_size:
+            return mails
+        cursor = page[-1].cursor
+
+
+async def main(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "mail.db")
+        build_database(db_path, args.mails, args.body_size)
+        service = MailService(db_path)
+
+        print("=" * 70)
+        await measure("full", lambda: service.get_inbox("alice"), args.repeat)
+        await measure("page", lambda: service.get_inbox_page("alice", args.page_size), args.repeat)
+        await measure("all pages", lambda: walk_pages(service, "alice", args.page_size), args.repeat)
+        close_mail_databases()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mails", type=int, default=5000, help="Mails in the inbox")
+    parser.add_argument("--body-size", type=int, default=500, help="Characters per body")
+    parser.add_argument("--page-size", type=int, default=20, help="Rows per page")
+    parser.add_argument("--repeat", type=int, default=10)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,151 @@
+"""
+Responsiveness test for MailService
+Loads a large inbox repeatedly while a ticker task (standing in for the other
+telnet sessions) measures how late the event loop wakes it up. Compares the
+old pattern (sqlite3 on the event loop) with the pooled MailService, and fails
+if the pooled run's p99 lag reaches --max-lag-ms.
+"""
+import argparse
+import asyncio
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ.setdefault("DEBUG", "false")
+
+from app.core.config import settings
+from app.services.mail_service import MailService, MAIL_COLUMNS, _row_to_mail, close_mail_databases
+from scripts.migrate_add_mail_table import migrate_add_mail_table
+
+TICK_INTERVAL = 0.005  # seconds
+
+
+def build_database(db_path: str, mails: int, body_size: int) -> None:
+    """Create users + mail tables and fill one user's inbox"""
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE users (user_id TEXT PRIMARY KEY, handle_name TEXT)")
+    conn.executemany(
+        "INSERT INTO users VALUES (?, ?)", [("alice", "Alice"), ("bob", "Bob")]
+    )
+    conn.commit()
+    conn.close()
+
+    migrate_add_mail_table(db_path)
+
+    body = ("メール本文テスト。" * body_size)[:body_size]
+    start = datetime(2024, 1, 1)
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        """
+        INSERT INTO mail (sender_id, sender_handle, recipient_id, subject, body, sent_at)
+        VALUES ('bob', 'Bob', 'alice', ?, ?, ?)
+        """,
+        [
+            (f"件名 {i}", body, (start + timedelta(minutes=i)).isoformat())
+            for i in range(mails)
+        ],
+    )
+    conn.commit()
+    conn.close()
+
+
+async def legacy_get_inbox(db_path: str, user_id: str) -> list:
+    """The previous MailService.get_inbox: blocking sqlite3 on the event loop"""
+    conn = sqlite3.connect(db_path)
+    try:
+        rows = conn.execute(
+            f"""
+            SELECT {MAIL_COLUMNS} FROM mail
+            WHERE recipient_id = ? AND is_deleted_by_recipient = 0
+            ORDER BY sent_at DESC
+            """,
+            (user_id,),
+        ).fetchall()
+        return [_row_to_mail(row) for row in rows]
+    finally:
+        conn.close()
+
+
+async def ticker(stop: asyncio.Event, lags: list) -> None:
+    """Sleep for TICK_INTERVAL repeatedly and record how late each wake-up is"""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        expected = loop.time() + TICK_INTERVAL
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append((loop.time() - expected) * 1000)
+
+
+def lag_p99(lags: list) -> float:
+    """99th percentile of the ticker lags (sorts in place)"""
+    lags.sort()
+    return lags[min(len(lags) - 1, int(len(lags) * 0.99))] if lags else 0.0
+
+
+async def run(mode: str, db_path: str, loads: int, concurrent: int) -> float:
+    """One run; returns the p99 loop lag (ms)"""
+    service = MailService(db_path)
+
+    async def load_inbox():
+        for _ in range(loads):
+            if mode == "legacy":
+                mails = await legacy_get_inbox(db_path, "alice")
+            else:
+                mails = await service.get_inbox("alice")
+        return len(mails)
+
+    lags: list = []
+    stop = asyncio.Event()
+    tick_task = asyncio.create_task(ticker(stop, lags))
+    await asyncio.sleep(0.05)
+
+    start = time.perf_counter()
+    counts = await asyncio.gather(*(load_inbox() for _ in range(concurrent)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await tick_task
+
+    p99 = lag_p99(lags)
+    print(
+        f"{mode:<7} {concurrent * loads} inbox load(s) of {counts[0]} in {elapsed:.2f}s  "
+        f"ticks={len(lags)}  lag median={statistics.median(lags):.1f}ms "
+        f"p99={p99:.1f}ms max={lags[-1]:.1f}ms"
+    )
+    return p99
+
+
+async def main(args) -> bool:
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "mail.db")
+        build_database(db_path, args.mails, args.body_size)
+        print("=" * 70)
+        await run("legacy", db_path, args.loads, args.concurrent)
+        p99 = await run("pooled", db_path, args.loads, args.concurrent)
+        close_mail_databases()
+
+    print("=" * 70)
+    ok = p99 < args.max_lag_ms
+    if ok:
+        print(f"✅ Loop lag p99 {p99:.1f}ms stayed under {args.max_lag_ms}ms while loading mail")
+    else:
+        print(f"❌ Loop lag p99 {p99:.1f}ms reached the {args.max_lag_ms}ms limit while loading mail")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--mails", type=int, default=20000, help="Mails in the inbox")
+    parser.add_argument("--body-size", type=int, default=500, help="Characters per body")
+    parser.add_argument("--loads", type=int, default=3, help="Inbox loads per reader")
+    parser.add_argument("--concurrent", type=int, default=2, help="Concurrent readers")
+    parser.add_argument("--max-lag-ms", type=float, default=settings.LOOP_LAG_WARN_MS,
+                        help="Fail if the pooled run's p99 loop lag reaches this")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
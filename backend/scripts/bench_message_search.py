@@ -0,0 +1,162 @@
+"""
+Benchmark for message search
+Fills a scratch SQLite database with generated Japanese messages and compares
+the legacy LIKE scan with the messages_fts (FTS5 trigram) index, reporting
+index build time and per-query latency at each size
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import create_engine
+
+from app.core.database import Base
+from app.models import user  # noqa: F401  (register users table for foreign keys)
+from app.models import board  # noqa: F401  (messages + messages_fts DDL)
+
+# Frequent everyday words plus a long tail of generated katakana words, so the
+# vocabulary has a realistic mix of common and rare terms
+COMMON_WORDS = [
+    "パソコン", "通信", "掲示板", "電子メール", "チャット", "です", "ました",
+    "質問", "回答", "ありがとう", "よろしく", "お願いします",
+]
+KANA = "アイウエオカキクケコサシスセソタチツテトナニヌネノハヒフヘホマミムメモヤユヨラリルレロワン"
+
+# Common, medium, rare, ASCII and missing terms (all >= 3 characters)
+QUERIES = ["お願いします", "アマチュア無線", "ハードディスク", "MS-DOS", "存在しない語句"]
+RARE_WORDS = {"アマチュア無線": 200, "ハードディスク": 2000, "MS-DOS": 5000}
+
+LIKE_SQL = """
+    SELECT id FROM messages
+    WHERE board_id = ? AND deleted = 0
+      AND (title LIKE '%' || ? || '%' OR body LIKE '%' || ? || '%')
+    ORDER BY created_at DESC LIMIT 50
+"""
+
+FTS_SQL = """
+    SELECT messages.id FROM messages
+    JOIN messages_fts ON messages_fts.rowid = messages.id
+    WHERE messages.board_id = ? AND messages.deleted = 0
+      AND messages_fts MATCH ?
+    ORDER BY bm25(messages_fts, 10.0, 1.0), messages.created_at DESC LIMIT 50
+"""
+
+
+def build_vocabulary(rng: random.Random, size: int) -> list:
+    return [
+        "".join(rng.choice(KANA) for _ in range(rng.randint(3, 6)))
+        for _ in range(size)
+    ]
+
+
+def sentence(rng: random.Random, vocabulary: list, index: int, words: int) -> str:
+    """Mix common words and long-tail words; RARE_WORDS appear every N messages"""
+    parts = []
+    for _ in range(words):
+        if rng.random() < 0.3:
+            parts.append(rng.choice(COMMON_WORDS))
+        else:
+            parts.append(vocabulary[min(int(rng.paretovariate(1.0)) - 1, len(vocabulary) - 1)])
+    for word, every in RARE_WORDS.items():
+        if index % every == 0:
+            parts.insert(rng.randrange(len(parts) + 1), word)
+    return "".join(parts)
+
+
+def populate(db_path: str, count: int, boards: int, seed: int) -> float:
+    """Create the schema (with FTS triggers) and insert messages; returns seconds"""
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(seed)
+    vocabulary = build_vocabulary(rng, 20000)
+    rng.shuffle(vocabulary)
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("INSERT INTO users (user_id, handle_name, password_hash, level) VALUES ('bench', 'bench', '', 1)")
+    conn.executemany(
+        "INSERT INTO boards (board_id, name, message_count, last_message_no) VALUES (?, ?, 0, 0)",
+        [(b, f"Board {b}") for b in range(1, boards + 1)],
+    )
+
+    start = time.perf_counter()
+    batch = []
+    for i in range(count):
+        board_no = i % boards + 1
+        batch.append((
+            i // boards + 1, board_no, "bench", "bench",
+            sentence(rng, vocabulary, i, 3), sentence(rng, vocabulary, i, 40), 1 if i % 50 == 7 else 0,
+            f"2024-01-01 00:00:{i % 60:02d}",
+        ))
+        if len(batch) >= 10000:
+            _insert(conn, batch)
+    _insert(conn, batch)
+    conn.commit()
+    conn.close()
+    return time.perf_counter() - start
+
+
+def _insert(conn: sqlite3.Connection, batch: list) -> None:
+    conn.executemany(
+        "INSERT INTO messages (message_no, board_id, user_id, handle_name, title, body, deleted, created_at) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        batch,
+    )
+    batch.clear()
+
+
+def time_query(conn: sqlite3.Connection, sql: str, params: tuple, repeat: int) -> tuple:
+    """Run one query ``repeat`` times, return (median ms, hits)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = conn.execute(sql, params).fetchall()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(rows)
+
+
+def bench(sizes: list, boards: int, repeat: int, seed: int):
+    print(f"Boards: {boards}, median of {repeat} run(s), LIMIT 50 on board 1")
+    print("=" * 70)
+
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = str(Path(tmp) / "bench.db")
+            insert_secs = populate(db_path, size, boards, seed)
+            print(f"\n{size:,} messages (insert + index {insert_secs:.2f}s)")
+            print(f"  {'keyword':<16}  {'LIKE ms':>9}  {'FTS ms':>9}  {'speedup':>8}  hits")
+
+            conn = sqlite3.connect(db_path)
+            for keyword in QUERIES:
+                like_ms, like_hits = time_query(conn, LIKE_SQL, (1, keyword, keyword), repeat)
+                fts_ms, fts_hits = time_query(conn, FTS_SQL, (1, f'"{keyword}"'), repeat)
+                speedup = like_ms / fts_ms if fts_ms else 0
+                print(
+                    f"  {keyword:<16}  {like_ms:>9.2f}  {fts_ms:>9.2f}  "
+                    f"{speedup:>7.1f}x  {like_hits}/{fts_hits}"
+                )
+            conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes", default="10000,100000,1000000",
+        help="Comma-separated message counts",
+    )
+    parser.add_argument("--boards", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    bench([int(s) for s in args.sizes.split(",")], args.boards, args.repeat, args.seed)
@@ -0,0 +1,132 @@
+"""
+Microbenchmark for Telnet line input
+Compares the legacy byte-at-a-time reader with the chunked TelnetLineReader
+and reports input throughput (bytes/sec) per session
+"""
+import argparse
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.protocols.telnet_input import TelnetLineReader
+
+
+class NullWriter:
+    """StreamWriter stand-in that counts writes and drains"""
+
+    def __init__(self):
+        self.writes = 0
+        self.drains = 0
+        self.bytes = 0
+
+    def write(self, data: bytes):
+        self.writes += 1
+        self.bytes += len(data)
+
+    async def drain(self):
+        self.drains += 1
+        # Yield like a real transport would
+        await asyncio.sleep(0)
+
+
+def build_payload(lines: int, line_length: int) -> bytes:
+    """Build a pasted message body (CP932, CR+LF, with some IAC noise)"""
+    line = ("テスト本文ABC" * line_length)[:line_length].encode("cp932")
+    naws = bytes([0xFF, 0xFA, 31, 0, 80, 0, 24, 0xFF, 0xF0])
+    out = bytearray()
+    for i in range(lines):
+        if i % 50 == 0:
+            out += naws
+        out += line + b"\r\n"
+    out += b".\r\n"
+    return bytes(out)
+
+
+async def legacy_read_line(reader, writer, echo: bool = True) -> bytes:
+    """Byte-at-a-time reader equivalent to the original receive_line"""
+    raw_bytes = bytearray()
+    while True:
+        data = await reader.read(1)
+        if not data:
+            raise ConnectionError("Connection closed")
+        byte_val = data[0]
+        if byte_val == 0xFF:
+            cmd = (await reader.read(1))[0]
+            if cmd in [0xFB, 0xFC, 0xFD, 0xFE, 0xFA]:
+                await reader.read(1)
+                if cmd == 0xFA:
+                    while True:
+                        sb_data = await reader.read(1)
+                        if sb_data[0] == 0xFF:
+                            se_data = await reader.read(1)
+                            if se_data[0] == 0xF0:
+                                break
+            continue
+        if byte_val in (0x0D, 0x0A):
+            if raw_bytes:
+                if echo:
+                    writer.write(b"\r\n")
+                    await writer.drain()
+                return bytes(raw_bytes)
+            continue
+        if byte_val == 0x00:
+            continue
+        raw_bytes.append(byte_val)
+        if echo:
+            writer.write(bytes([byte_val]))
+            await writer.drain()
+
+
+async def run_session(payload: bytes, mode: str, chunk_size: int) -> tuple:
+    """Read a whole pasted body through one session, return (seconds, writer)"""
+    reader = asyncio.StreamReader()
+    reader.feed_data(payload)
+    reader.feed_eof()
+    writer = NullWriter()
+
+    start = time.perf_counter()
+    if mode == "legacy":
+        while await legacy_read_line(reader, writer) != b".":
+            pass
+    else:
+        line_reader = TelnetLineReader(reader, writer, chunk_size=chunk_size)
+        while await line_reader.read_line() != b".":
+            pass
+    return time.perf_counter() - start, writer
+
+
+async def bench(sessions: int, lines: int, line_length: int, chunk_size: int):
+    payload = build_payload(lines, line_length)
+    print(f"Payload: {len(payload)} bytes/session, {sessions} concurrent session(s)")
+    print("=" * 70)
+
+    for mode in ("legacy", "chunked"):
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_session(payload, mode, chunk_size) for _ in range(sessions))
+        )
+        wall = time.perf_counter() - start
+
+        per_session = [len(payload) / secs for secs, _ in results]
+        writes = sum(w.writes for _, w in results) // sessions
+        drains = sum(w.drains for _, w in results) // sessions
+        print(
+            f"{mode:<8} wall={wall:.3f}s  "
+            f"bytes/sec/session={sum(per_session) / len(per_session):,.0f}  "
+            f"writes/session={writes}  drains/session={drains}"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sessions", type=int, default=100)
+    parser.add_argument("--lines", type=int, default=200)
+    parser.add_argument("--line-length", type=int, default=70)
+    parser.add_argument("--chunk-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    asyncio.run(bench(args.sessions, args.lines, args.line_length, args.chunk_size))
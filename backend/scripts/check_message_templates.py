@@ -0,0 +1,65 @@
+"""
+Migration check for compiled system message templates
+Compiles every stored system message the way the message cache does at
+startup and reports rows that will render as "[Invalid template]" (positional
+placeholders such as {} or {0}, malformed braces) or use variables missing
+from their variables column. Attribute/index placeholders ({user.name},
+{items[0]}) and nested format specs are rendered with str.format and pass.
+Run after upgrading; the admin API applies the same check when a message is
+saved.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+
+from app.core.database import async_session, engine
+from app.models.system_message import SystemMessage
+from app.utils.message_template import validate_template
+
+
+async def check_templates() -> bool:
+    """Validate every stored system message; True if none is invalid"""
+    print("Checking system message templates")
+    print("=" * 70)
+
+    async with async_session() as session:
+        result = await session.execute(
+            select(SystemMessage).order_by(SystemMessage.message_key)
+        )
+        messages = result.scalars().all()
+
+    invalid = 0
+    for message in messages:
+        problems = validate_template(message.content, message.variables)
+        if not problems:
+            print(f"   ✓ {message.message_key}")
+            continue
+        if any(problem.startswith("Invalid template") for problem in problems):
+            invalid += 1
+            status = "❌"
+        else:
+            status = "⚠"
+        print(f"   {status} {message.message_key}: {'; '.join(problems)}")
+
+    print("=" * 70)
+    if invalid:
+        print(f"❌ {invalid} of {len(messages)} message(s) need to be fixed in the admin UI")
+    else:
+        print(f"✅ All {len(messages)} message(s) compile")
+    return invalid == 0
+
+
+async def main() -> bool:
+    try:
+        return await check_templates()
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if asyncio.run(main()) else 1)
@@ -15,6 +15,22 @@ project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 
 
+def create_paging_indexes(cursor: sqlite3.Cursor):
+    """
+    Add indexes for paged inbox / sent mail listings
+
+    Listings page on (sent_at, mail_id) per user; mail_id is the rowid, so
+    it is implicitly the last key of each index.
+    """
+    print("Creating paging indexes...")
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mail_recipient_sent ON mail(recipient_id, sent_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_mail_sender_sent ON mail(sender_id, sent_at)"
+    )
+
+
 def migrate_add_mail_table(db_path: str):
     """
     Add mail table to database
@@ -34,7 +50,9 @@ def migrate_add_mail_table(db_path: str):
             "SELECT name FROM sqlite_master WHERE type='table' AND name='mail'"
         )
         if cursor.fetchone():
-            print("⚠️  Mail table already exists. Skipping migration.")
+            print("⚠️  Mail table already exists. Skipping table creation.")
+            create_paging_indexes(cursor)
+            conn.commit()
             return
 
         # Create mail table
@@ -70,6 +88,7 @@ def migrate_add_mail_table(db_path: str):
         cursor.execute(
             "CREATE INDEX idx_mail_sent_at ON mail(sent_at)"
         )
+        create_paging_indexes(cursor)
 
         conn.commit()
         print("✅ Mail table created successfully")
@@ -0,0 +1,88 @@
+"""
+Migration script for denormalized board counters
+Adds message_count / last_message_no columns to boards and backfills them
+from the messages table. Safe to re-run: the backfill recomputes counters.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+async def migrate_board_counters():
+    """Add and backfill board counter columns"""
+    print("Starting migration: Board counters")
+    print("=" * 70)
+
+    async with engine.begin() as conn:
+        print("\n1. Adding columns to boards table...")
+        for column in ("message_count", "last_message_no"):
+            try:
+                await conn.execute(text(
+                    f"ALTER TABLE boards ADD COLUMN {column} INTEGER NOT NULL DEFAULT 0"
+                ))
+                print(f"   ✓ Added '{column}' column")
+            except Exception as e:
+                print(f"   ⚠ '{column}' column may already exist: {e}")
+
+        print("\n2. Backfilling counters from messages...")
+        result = await conn.execute(text(
+            """
+            UPDATE boards SET
+                message_count = (
+                    SELECT COUNT(*) FROM messages
+                    WHERE messages.board_id = boards.id AND messages.deleted = 0
+                ),
+                last_message_no = (
+                    SELECT COALESCE(MAX(message_no), 0) FROM messages
+                    WHERE messages.board_id = boards.id
+                )
+            """
+        ))
+        print(f"   ✓ Updated {result.rowcount} board(s)")
+
+
+async def verify_migration():
+    """Compare stored counters with live counts"""
+    print("\nVerifying migration...")
+
+    async with engine.connect() as conn:
+        result = await conn.execute(text(
+            """
+            SELECT b.board_id, b.message_count, b.last_message_no,
+                   (SELECT COUNT(*) FROM messages m WHERE m.board_id = b.id AND m.deleted = 0),
+                   (SELECT COALESCE(MAX(message_no), 0) FROM messages m WHERE m.board_id = b.id)
+            FROM boards b ORDER BY b.board_id
+            """
+        ))
+        ok = True
+        for board_id, count, last_no, live_count, live_last in result:
+            status = "✓" if (count, last_no) == (live_count, live_last) else "❌"
+            if status != "✓":
+                ok = False
+            print(f"   {status} Board {board_id}: {count} message(s), last #{last_no}")
+
+    if ok:
+        print("\n✅ All counters match")
+    return ok
+
+
+async def main():
+    try:
+        await migrate_board_counters()
+        ok = await verify_migration()
+        print("\nNext steps:")
+        print("  1. Restart the backend server")
+        return ok
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    result = asyncio.run(main())
+    sys.exit(0 if result else 1)
@@ -0,0 +1,107 @@
+"""
+Migration script for per-board message number sequences
+Adds the unique (board_id, message_no) index on messages. Duplicate numbers
+left behind by the old max()+1 allocation are renumbered first (the later
+message gets a new number at the end of its board), and boards.last_message_no
+is raised to at least the highest number in use. Safe to re-run.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+
+async def migrate_message_numbers():
+    """Fix duplicates, sync sequences and create the unique index"""
+    print("Starting migration: Message number sequences")
+    print("=" * 70)
+
+    async with engine.begin() as conn:
+        print("\n1. Syncing boards.last_message_no with messages...")
+        await conn.execute(text(
+            """
+            UPDATE boards SET last_message_no = MAX(
+                last_message_no,
+                (SELECT COALESCE(MAX(message_no), 0) FROM messages
+                 WHERE messages.board_id = boards.id)
+            )
+            """
+        ))
+        print("   ✓ Sequences synced")
+
+        print("\n2. Renumbering duplicate message numbers...")
+        duplicates = (await conn.execute(text(
+            """
+            SELECT m.id, m.board_id, m.message_no FROM messages m
+            WHERE EXISTS (
+                SELECT 1 FROM messages d
+                WHERE d.board_id = m.board_id AND d.message_no = m.message_no AND d.id < m.id
+            )
+            ORDER BY m.id
+            """
+        ))).all()
+        for message_id, board_pk, old_no in duplicates:
+            new_no = (await conn.execute(
+                text(
+                    "UPDATE boards SET last_message_no = last_message_no + 1 "
+                    "WHERE id = :id RETURNING last_message_no"
+                ),
+                {"id": board_pk},
+            )).scalar_one()
+            await conn.execute(
+                text("UPDATE messages SET message_no = :no WHERE id = :id"),
+                {"no": new_no, "id": message_id},
+            )
+            print(f"   ⚠ Message id {message_id}: #{old_no} -> #{new_no}")
+        if not duplicates:
+            print("   ✓ No duplicates found")
+
+        print("\n3. Creating unique index...")
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_messages_board_message_no "
+            "ON messages (board_id, message_no)"
+        ))
+        print("   ✓ uq_messages_board_message_no")
+
+
+async def verify_migration():
+    """Check that no board's sequence is behind its messages"""
+    print("\nVerifying migration...")
+
+    async with engine.connect() as conn:
+        behind = (await conn.execute(text(
+            """
+            SELECT b.board_id FROM boards b
+            WHERE b.last_message_no < (
+                SELECT COALESCE(MAX(message_no), 0) FROM messages m WHERE m.board_id = b.id
+            )
+            """
+        ))).scalars().all()
+
+    if behind:
+        print(f"   ❌ Sequence behind messages on board(s): {behind}")
+        return False
+    print("   ✓ All sequences are ahead of existing messages")
+    print("\n✅ Migration complete")
+    return True
+
+
+async def main():
+    try:
+        await migrate_message_numbers()
+        ok = await verify_migration()
+        print("\nNext steps:")
+        print("  1. Restart the backend server")
+        return ok
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    result = asyncio.run(main())
+    sys.exit(0 if result else 1)
@@ -0,0 +1,71 @@
+"""
+Migration script for recipient prefix search
+Adds case-insensitive indexes on users.user_id and users.handle_name so that
+prefix lookups (LIKE 'abc%') read an index range instead of scanning the
+table. Safe to re-run.
+"""
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import text
+from app.core.database import engine
+
+INDEXES = {
+    "ix_users_user_id_nocase": "user_id",
+    "ix_users_handle_name_nocase": "handle_name",
+}
+
+
+async def migrate_user_search_indexes():
+    """Create the NOCASE indexes"""
+    print("Starting migration: User search indexes")
+    print("=" * 70)
+
+    async with engine.begin() as conn:
+        for name, column in INDEXES.items():
+            await conn.execute(text(
+                f"CREATE INDEX IF NOT EXISTS {name} ON users ({column} COLLATE NOCASE)"
+            ))
+            print(f"   ✓ {name}")
+
+
+async def verify_migration():
+    """Check that a prefix lookup uses the new index"""
+    print("\nVerifying migration...")
+
+    ok = True
+    async with engine.connect() as conn:
+        for name, column in INDEXES.items():
+            plan = (await conn.execute(
+                text(f"EXPLAIN QUERY PLAN SELECT * FROM users WHERE {column} LIKE 'a%' ESCAPE '\\'")
+            )).all()
+            detail = " ".join(str(row[-1]) for row in plan)
+            if name in detail:
+                print(f"   ✓ {column} prefix search uses {name}")
+            else:
+                print(f"   ❌ {column} prefix search does not use {name}: {detail}")
+                ok = False
+
+    if ok:
+        print("\n✅ Migration complete")
+    return ok
+
+
+async def main():
+    try:
+        await migrate_user_search_indexes()
+        ok = await verify_migration()
+        print("\nNext steps:")
+        print("  1. Restart the backend server")
+        return ok
+    finally:
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    result = asyncio.run(main())
+    sys.exit(0 if result else 1)
@@ -0,0 +1,129 @@
+"""
+Concurrency stress test for message number allocation
+Several processes (each posting concurrently from many tasks, like telnet
+sessions and /api/bbs/messages in one server) post to the same board of a
+scratch database. Checks that message numbers are unique and gap-free and
+that the board counters match.
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+def _setup_env(db_path: str) -> None:
+    """Point the app at the scratch database before importing it"""
+    os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{db_path}"
+    os.environ["DEBUG"] = "false"
+
+
+async def _prepare(db_path: str) -> None:
+    _setup_env(db_path)
+    from app.core.database import async_session, engine, init_db
+    from app.models.user import User
+    from app.models.board import Board
+
+    await init_db()
+    async with async_session() as session:
+        session.add(User(user_id="stress", password_hash="", handle_name="stress", level=1))
+        session.add(Board(board_id=1, name="Stress"))
+        await session.commit()
+    await engine.dispose()
+
+
+async def _post_many(db_path: str, worker: int, posts: int, tasks: int) -> int:
+    _setup_env(db_path)
+    from app.core.database import engine
+    from app.models import user  # noqa: F401
+    from app.services.board_service import BoardService
+
+    service = BoardService()
+    failures = 0
+
+    async def poster(task: int):
+        nonlocal failures
+        for i in range(task, posts, tasks):
+            try:
+                await service.create_message(
+                    1, "stress", "stress", f"w{worker} #{i}", "stress test body"
+                )
+            except Exception as e:
+                failures += 1
+                print(f"   ❌ worker {worker} post {i}: {e}")
+
+    await asyncio.gather(*(poster(t) for t in range(tasks)))
+    await engine.dispose()
+    return failures
+
+
+def _worker(args: tuple) -> int:
+    return asyncio.run(_post_many(*args))
+
+
+async def _verify(db_path: str, expected: int) -> bool:
+    _setup_env(db_path)
+    from sqlalchemy import text
+    from app.core.database import engine
+
+    async with engine.connect() as conn:
+        numbers = (await conn.execute(
+            text("SELECT message_no FROM messages WHERE board_id = 1 ORDER BY message_no")
+        )).scalars().all()
+        count, last_no = (await conn.execute(
+            text("SELECT message_count, last_message_no FROM boards WHERE id = 1")
+        )).one()
+    await engine.dispose()
+
+    checks = [
+        ("messages stored", len(numbers) == expected, len(numbers)),
+        ("numbers unique", len(set(numbers)) == len(numbers), len(set(numbers))),
+        ("numbers gap-free", numbers == list(range(1, len(numbers) + 1)), numbers[-1] if numbers else 0),
+        ("message_count", count == expected, count),
+        ("last_message_no", last_no == expected, last_no),
+    ]
+    ok = True
+    for name, passed, value in checks:
+        ok = ok and passed
+        print(f"   {'✓' if passed else '❌'} {name}: {value}")
+    return ok
+
+
+def main() -> bool:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--tasks", type=int, default=10, help="Concurrent posters per process")
+    parser.add_argument("--posts", type=int, default=200, help="Posts per process")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = str(Path(tmp) / "stress.db")
+        asyncio.run(_prepare(db_path))
+
+        expected = args.processes * args.posts
+        print(f"Posting {expected} messages: {args.processes} process(es) x {args.tasks} task(s)")
+        print("=" * 70)
+
+        start = time.perf_counter()
+        with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+            failures = sum(pool.map(
+                _worker,
+                [(db_path, w, args.posts, args.tasks) for w in range(args.processes)],
+            ))
+        elapsed = time.perf_counter() - start
+        print(f"   {expected} post(s) in {elapsed:.2f}s ({expected / elapsed:,.0f}/s), {failures} failure(s)")
+
+        ok = asyncio.run(_verify(db_path, expected - failures)) and failures == 0
+
+    print("\n✅ Allocation is consistent" if ok else "\n❌ Allocation problems found")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,231 @@
+"""
+Two-process message bus integration test
+Starts two telnet server processes on a shared scratch database, joined by the
+Unix-socket message bus, logs sysop into one and bob into the other, and checks
+that Who, chat lines, whispers, room lists, telegrams and kicks work across the
+process boundary.
+"""
+import argparse
+import asyncio
+import os
+import re
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{_tmp.name}/cluster.db")
+os.environ.setdefault("MESSAGE_BUS", f"unix://{_tmp.name}/bus.sock")
+os.environ["DEBUG"] = "false"
+
+from app.core.database import engine, init_db
+from app.protocols.telnet_server import TelnetServer
+from app.services.message_service import MessageService
+from app.services.user_service import UserService
+
+ENCODING = "cp932"
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def serve(port: int) -> None:
+    """Child process: one telnet server until SIGTERM"""
+    server = TelnetServer("127.0.0.1", port)
+    task = asyncio.create_task(server.start())
+    stop = asyncio.Event()
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+    await stop.wait()
+    await server.stop()
+    task.cancel()
+    await engine.dispose()
+
+
+class Client:
+    """Telnet client that keeps everything the server sent"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.data = b""
+        self.closed = False
+
+    async def connect(self, port: int) -> None:
+        for _ in range(50):
+            try:
+                self.reader, self.writer = await asyncio.open_connection("127.0.0.1", port)
+                break
+            except ConnectionRefusedError:
+                await asyncio.sleep(0.1)
+        self._task = asyncio.create_task(self._read())
+
+    async def _read(self) -> None:
+        while True:
+            chunk = await self.reader.read(65536)
+            if not chunk:
+                self.closed = True
+                return
+            self.data += chunk
+
+    @property
+    def text(self) -> str:
+        return self.data.decode(ENCODING, errors="replace")
+
+    async def send(self, line: str, pause: float = 0.3) -> None:
+        self.writer.write(line.encode(ENCODING) + b"\r\n")
+        await self.writer.drain()
+        await asyncio.sleep(pause)
+
+    async def expect(self, pattern: str, timeout: float = 3.0, since: int = 0) -> bool:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if re.search(pattern, self.text[since:]):
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    def close(self) -> None:
+        self._task.cancel()
+        self.writer.close()
+
+
+async def setup_database() -> None:
+    await init_db()
+    await MessageService().initialize_default_messages()
+    users = UserService()
+    await users.create_user("sysop", "sysop-pw", "Sysop", level=9)
+    await users.create_user("bob", "bob-pw", "Bob")
+    await engine.dispose()
+
+
+async def run_checks(port_a: int, port_b: int) -> bool:
+    a, b = Client("sysop@A"), Client("bob@B")
+    await a.connect(port_a)
+    await b.connect(port_b)
+    await asyncio.sleep(0.5)
+    await a.send("sysop")
+    await a.send("sysop-pw")
+    await b.send("bob")
+    await b.send("bob-pw")
+
+    results = []
+    if not (await a.expect("Main Menu") and await b.expect("Main Menu")):
+        print("❌ login failed")
+        return False
+
+    async def check(label: str, client: Client, pattern: str, since: int = 0) -> None:
+        ok = await client.expect(pattern, since=since)
+        results.append(ok)
+        print(f"{'✓' if ok else '❌'} {label}")
+
+    mark = len(a.text)
+    await a.send("W")
+    await check("Who on A lists bob (on B)", a, r"Bob\s+bob[\s\S]*Press Enter", mark)
+    await a.send(".")  # "Press Enter to continue" skips blank lines
+
+    await a.send("C")
+    await b.send("C")
+    await b.send("hello from B")
+    await check("chat line from B reaches A", a, r"Bob> hello from B")
+    await a.send("hello from A")
+    await check("chat line from A reaches B", b, r"Sysop> hello from A")
+
+    await a.send("/w bob psst")
+    await check("whisper A -> B", b, r"\(Sysop からのささやき\) psst")
+
+    mark = len(b.text)
+    await b.send("/l")
+    await check("room list on B counts both members", b, r"\*\s+1\s+2人", mark)
+
+    mark = len(b.text)
+    await b.send("/who")
+    await check("/who on B lists sysop (on A)", b, r"sysop \(Sysop\)", mark)
+
+    await a.send("/t bob ping")
+    await check("telegram A -> B", b, r"電報 from Sysop: ping")
+
+    await b.send("/j 3")
+    mark = len(a.text)
+    await b.send("only room three")
+    await asyncio.sleep(0.5)
+    ok = "only room three" not in a.text[mark:]
+    results.append(ok)
+    print(f"{'✓' if ok else '❌'} lines in room 3 stay out of the lobby")
+
+    await a.send("//")
+    mark = len(a.text)
+    await a.send("@")
+    await a.send("K")
+    match = None
+    if await a.expect(r"(\d+)\. Bob \(bob\)", since=mark):
+        match = re.search(r"(\d+)\. Bob \(bob\)", a.text[mark:])
+    if match:
+        await a.send(match.group(1))
+        await a.send("Y")
+        await check("kick from A disconnects bob on B", b, r"disconnected by SYSOP")
+        for _ in range(30):
+            if b.closed:
+                break
+            await asyncio.sleep(0.1)
+        results.append(b.closed)
+        print(f"{'✓' if b.closed else '❌'} bob's connection closed")
+    else:
+        results.append(False)
+        print("❌ kick list on A does not show bob")
+
+    a.close()
+    b.close()
+    return all(results)
+
+
+async def main(args) -> bool:
+    await setup_database()
+    port_a, port_b = free_port(), free_port()
+    env = dict(os.environ)
+    print(f"bus={env['MESSAGE_BUS']}  A=:{port_a}  B=:{port_b}")
+    print("=" * 70)
+
+    nodes = [
+        subprocess.Popen(
+            [sys.executable, __file__, "--serve", str(port)], env=env,
+            stdout=subprocess.DEVNULL if not args.verbose else None,
+            stderr=subprocess.DEVNULL if not args.verbose else None,
+        )
+        for port in (port_a, port_b)
+    ]
+    try:
+        await asyncio.sleep(args.startup)
+        ok = await run_checks(port_a, port_b)
+    finally:
+        for node in nodes:
+            node.send_signal(signal.SIGTERM)
+        for node in nodes:
+            try:
+                node.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                node.kill()
+
+    print("=" * 70)
+    print("✅ All cross-process checks passed" if ok else "❌ Some checks failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--serve", type=int, metavar="PORT", help=argparse.SUPPRESS)
+    parser.add_argument("--startup", type=float, default=2.0, help="Seconds to wait for the servers")
+    parser.add_argument("--verbose", action="store_true", help="Show server logs")
+    args = parser.parse_args()
+    if args.serve:
+        asyncio.run(serve(args.serve))
+    else:
+        sys.exit(0 if asyncio.run(main(args)) else 1)
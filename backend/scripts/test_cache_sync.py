@@ -0,0 +1,173 @@
+"""
+Cross-process cache invalidation test
+Runs `python -m app.telnet` with two workers on a scratch database while this
+script plays the API process (TELNET_EMBEDDED=false, MESSAGE_BUS=auto, so both
+meet on the Unix socket next to the database). Writes made here must reach the
+workers' caches: a new post updates the board's message count, an edited
+system message shows up in the menu, a new user can be picked as a mail
+recipient and a changed password stops the old one at once. The admin chat
+view here must list a member and line from a worker's chat room.
+"""
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/cache.db"
+os.environ["TELNET_EMBEDDED"] = "false"
+os.environ["DEBUG"] = "false"
+
+os.environ["MESSAGE_BUS"] = "auto"
+
+from app.core.bus import close_bus, get_bus
+from app.core.database import engine, init_db
+from app.protocols.chat_monitor import get_chat_monitor
+from app.services.board_service import BoardService
+from app.services.cache_sync import start_cache_sync
+from app.services.message_service import MessageService
+from app.services.user_service import UserService
+from scripts.test_bus_cluster import Client, free_port
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+async def setup_database() -> None:
+    await init_db()
+    await MessageService().initialize_default_messages()
+    await UserService().create_user("bob", "bob-pw", "Bob")
+    await BoardService().create_board(board_id=1, name="general", read_level=0, write_level=1)
+    await engine.dispose()
+
+
+async def wait_for_port(port: int, timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return True
+        except ConnectionRefusedError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def login(port: int, user_id: str, password: str) -> Client:
+    client = Client(user_id)
+    await client.connect(port)
+    await asyncio.sleep(0.5)
+    await client.send(user_id)
+    await client.send(password)
+    return client
+
+
+async def run_checks(port: int) -> bool:
+    results = []
+
+    def report(ok: bool, label: str) -> None:
+        results.append(ok)
+        print(f"{'✓' if ok else '❌'} {label}")
+
+    bob = await login(port, "bob", "bob-pw")
+    if not await bob.expect("Main Menu"):
+        print("❌ login failed")
+        return False
+
+    # Board counters: the worker's registry must pick up a post made here
+    await bob.send("R1")
+    report(await bob.expect(r"Total: 0 messages"), "board 1 starts empty")
+    await bob.send("Q")
+    await BoardService().create_message(1, "bob", "Bob", "hello", "posted by the API process")
+    await asyncio.sleep(0.5)
+    mark = len(bob.text)
+    await bob.send("R1")
+    report(await bob.expect(r"Total: 1 messages", since=mark), "post from another process updates the count")
+    await bob.send("Q")
+
+    # System messages: an edit here reloads the worker's message cache
+    message = await MessageService().get_message_by_key("MAIN_MENU")
+    await MessageService().update_message("MAIN_MENU", {"content": message.content + "\r\nCACHE-SYNC-MARK"})
+    await asyncio.sleep(0.5)
+    mark = len(bob.text)
+    await bob.send("_")
+    report(await bob.expect("CACHE-SYNC-MARK", since=mark), "edited system message is shown")
+
+    # Admin chat view: members and lines come from the workers over the bus
+    await bob.send("C")
+    await bob.send("seen by the API")
+    await asyncio.sleep(0.5)
+    lobby = get_chat_monitor().room_info(1)
+    report([m["user_id"] for m in lobby["members"]] == ["bob"], "chat member listed in the API process")
+    report(any("seen by the API" in text for _, text in get_chat_monitor().hub.get_room(1).scrollback),
+           "chat line recorded in the API process")
+    await bob.send("//")
+
+    # User directory: a user created here can be picked as a mail recipient
+    await UserService().create_user("carol", "carol-pw", "Carol")
+    await asyncio.sleep(0.5)
+    mark = len(bob.text)
+    await bob.send("M")
+    await bob.send("S")
+    await bob.send("carol")
+    report(await bob.expect(r"To: carol \(Carol\)", since=mark), "new user appears in the recipient picker")
+    bob.close()
+
+    # Login cache: a password changed here stops the old one right away
+    again = await login(port, "bob", "bob-pw")
+    report(await again.expect("Main Menu"), "second login (cached)")
+    again.close()
+    users = UserService()
+    await users.update_user("bob", password_hash=await users.hash_password("new-pw"))
+    await asyncio.sleep(0.5)
+    stale = await login(port, "bob", "bob-pw")
+    report(await stale.expect("Invalid user ID or password"), "old password refused after the change")
+    stale.close()
+
+    return all(results)
+
+
+async def main(args) -> bool:
+    await setup_database()
+    port = free_port()
+    print(f"2 workers on :{port}, bus {get_bus().get_stats().get('path')}")
+    print("=" * 70)
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.telnet", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        cwd=BACKEND_DIR, env={**os.environ, "MESSAGE_BUS": "auto"},
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        if not await wait_for_port(port):
+            print("❌ workers did not start")
+            return False
+        await start_cache_sync()
+        await get_chat_monitor().start()
+        await asyncio.sleep(1.0)  # both workers connected to the bus
+        ok = await run_checks(port)
+    finally:
+        proc.terminate()
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, proc.wait, 15)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+        await close_bus()
+        await engine.dispose()
+
+    print("=" * 70)
+    print("✅ All cache sync checks passed" if ok else "❌ Some checks failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verbose", action="store_true", help="Show server logs")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)
@@ -0,0 +1,171 @@
+"""
+Multi-worker telnet integration test
+Runs `python -m app.telnet` with two workers on a scratch database and checks
+that the workers share the port and together accept exactly
+TELNET_MAX_CONNECTIONS sessions, and that SIGTERM drains them: the listener
+closes, logged-in sessions keep working until they log out, idle sessions are
+cut off after TELNET_DRAIN_TIMEOUT and the supervisor exits cleanly.
+"""
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+_tmp = tempfile.TemporaryDirectory()
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{_tmp.name}/workers.db"
+os.environ.pop("MESSAGE_BUS", None)  # auto: Unix socket next to the database
+os.environ["DEBUG"] = "false"
+
+from app.core.database import engine, init_db
+from app.services.user_service import UserService
+from scripts.test_bus_cluster import Client, free_port
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+
+async def setup_database() -> None:
+    await init_db()
+    await UserService().create_user("bob", "bob-pw", "Bob")
+    await engine.dispose()
+
+
+async def wait_for_port(port: int, timeout: float = 15.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.close()
+            return True
+        except ConnectionRefusedError:
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def first_reply(port: int):
+    """Connect; returns the client and what the server says first"""
+    client = Client("probe")
+    await client.connect(port)
+    await client.expect(r"Server full|\S{8,}", timeout=3)
+    return client, client.text
+
+
+async def check_limits(port: int, limit: int, attempts: int) -> bool:
+    clients, accepted = [], 0
+    for _ in range(attempts):
+        client, text = await first_reply(port)
+        clients.append(client)
+        if "Server full" not in text:
+            accepted += 1
+    for client in clients:
+        client.close()
+
+    ok = accepted == limit
+    print(f"{'✓' if ok else '❌'} {accepted}/{attempts} connection(s) accepted (limit {limit} over 2 workers)")
+    return ok
+
+
+async def check_drain(port: int, proc: subprocess.Popen, drain_timeout: int) -> bool:
+    await asyncio.sleep(0.5)  # let the workers notice the closed probes
+    user, idle = Client("bob"), Client("idle")
+    await user.connect(port)
+    await idle.connect(port)
+    await asyncio.sleep(0.5)
+    await user.send("bob")
+    await user.send("bob-pw")
+    if not await user.expect("Main Menu"):
+        print("❌ login failed")
+        return False
+
+    results = []
+
+    def report(ok: bool, label: str) -> None:
+        results.append(ok)
+        print(f"{'✓' if ok else '❌'} {label}")
+
+    started = time.monotonic()
+    proc.send_signal(signal.SIGTERM)
+    report(await user.expect("まもなくサーバーを停止します"), "logged-in session is told about the shutdown")
+
+    try:
+        _, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.close()
+        report(False, "listener closed during drain")
+    except ConnectionRefusedError:
+        report(True, "listener closed during drain")
+
+    mark = len(user.text)
+    await user.send("W")
+    report(await user.expect("Online Users", since=mark), "session still works while draining")
+    await user.send(".")
+    await user.send("Q")
+    for _ in range(30):
+        if user.closed:
+            break
+        await asyncio.sleep(0.1)
+    report(user.closed, "session logs out normally")
+
+    for _ in range((drain_timeout + 5) * 10):
+        if idle.closed:
+            break
+        await asyncio.sleep(0.1)
+    elapsed = time.monotonic() - started
+    report(idle.closed and elapsed >= drain_timeout - 0.5,
+           f"idle session disconnected after the drain timeout ({elapsed:.1f}s)")
+
+    try:
+        code = await asyncio.get_running_loop().run_in_executor(None, proc.wait, 15)
+    except subprocess.TimeoutExpired:
+        code = None
+    report(code == 0, f"supervisor exited cleanly (exit code {code})")
+    return all(results)
+
+
+async def main(args) -> bool:
+    await setup_database()
+    port = free_port()
+    env = dict(
+        os.environ,
+        TELNET_MAX_CONNECTIONS=str(args.limit),
+        TELNET_DRAIN_TIMEOUT=str(args.drain_timeout),
+    )
+    print(f"2 workers on :{port}, TELNET_MAX_CONNECTIONS={args.limit}, drain {args.drain_timeout}s")
+    print("=" * 70)
+
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "app.telnet", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+        cwd=BACKEND_DIR, env=env,
+        stdout=None if args.verbose else subprocess.DEVNULL,
+        stderr=None if args.verbose else subprocess.DEVNULL,
+    )
+    try:
+        if not await wait_for_port(port):
+            print("❌ workers did not start")
+            return False
+        await asyncio.sleep(1.0)  # both workers listening
+        ok = await check_limits(port, args.limit, args.attempts)
+        ok = await check_drain(port, proc, args.drain_timeout) and ok
+    finally:
+        if proc.poll() is None:
+            proc.kill()
+            proc.wait()
+
+    print("=" * 70)
+    print("✅ All worker checks passed" if ok else "❌ Some checks failed")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--limit", type=int, default=4, help="TELNET_MAX_CONNECTIONS for the run")
+    parser.add_argument("--attempts", type=int, default=16, help="Connections opened to probe the limit")
+    parser.add_argument("--drain-timeout", type=int, default=3)
+    parser.add_argument("--verbose", action="store_true", help="Show server logs")
+    sys.exit(0 if asyncio.run(main(parser.parse_args())) else 1)